@@ -0,0 +1,62 @@
+"""
+REST calls and request weight per bot tick, measured by replaying NEAR candles through
+live_engine (the near_bot.py strategy) against sim_exchange.SimExchange (no network,
+no orders). Compares the old behaviour (every balance read hits fetch_balance) with
+the per-tick ExchangeSnapshot.
+
+Run from the repo root:  python -m benchmarks.bench_bot_calls
+"""
+import contextlib
+import io
+import logging
+import os
+
+from sim_exchange import TF_MS, SimExchange, candles_from_file
+from candle_feeds import ReplayFeed
+from exchange_state import ExchangeSnapshot
+from live_engine import LiveEngine
+
+DATA_FILE = os.path.join('fetch_data', 'Results', 'NEAR_USDT_5m_full.csv')
+SYMBOL = 'NEAR/USDT'
+TICKS = 2000
+RTT = 0.15                  # Seconds per REST round trip assumed for the busiest-tick latency
+
+
+def replay(candles, ttl):
+    """
+    Fresh engine on a fresh fake exchange, seeded like run_bot() and fed TICKS candles
+    one at a time (each tick finishes before the clock moves on).
+    """
+    start = len(candles) - TICKS
+    exchange = SimExchange({SYMBOL: candles})
+    exchange.now = candles[start][0]
+    engine = LiveEngine(exchange, [SYMBOL])
+    engine.account = ExchangeSnapshot(exchange, ttl=ttl, clock=lambda: exchange.now / 1000)
+
+    busiest = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.seed()
+        for symbol, candle in ReplayFeed({SYMBOL: candles[start:]}):
+            exchange.now = candle[0] + TF_MS
+            before = sum(exchange.calls.values())
+            engine.submit(symbol, candle).result()
+            busiest = max(busiest, sum(exchange.calls.values()) - before)
+    return exchange, busiest
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    candles = candles_from_file(DATA_FILE)
+
+    print(f"{'mode':<18}{'calls':>8}{'balance':>9}{'orders':>8}{'weight':>8}"
+          f"{'calls/tick':>12}{'weight/tick':>13}{'max calls':>11}{'max ms':>8}")
+    for label, ttl in [('fetch every read', -1), ('tick snapshot', 5.0)]:
+        ex, busiest = replay(candles, ttl)
+        calls = sum(ex.calls.values())
+        orders = ex.calls.get('create_market_buy_order', 0) + ex.calls.get('create_market_sell_order', 0)
+        print(f"{label:<18}{calls:>8}{ex.calls.get('fetch_balance', 0):>9}{orders:>8}{ex.weight:>8}"
+              f"{calls / TICKS:>12.2f}{ex.weight / TICKS:>13.1f}{busiest:>11}{busiest * RTT * 1000:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
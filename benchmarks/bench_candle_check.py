@@ -0,0 +1,138 @@
+"""
+candle_check.py and fetch_data/ohlcv_store.repair_store(). Measures:
+- the cost of the integrity pass on real pairs and on long synthetic histories;
+- a damaged NEAR store (dropped pages, a re-appended page) repaired against
+  sim_exchange, checked against the original with only the gap pages refetched;
+- complete=True boxes compared with the live DailyBox.
+
+Run from the repo root:  python -m benchmarks.bench_candle_check
+"""
+import contextlib
+import glob
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_suite import synthetic_frame
+from box_engine import load_candles, previous_period_box
+from candle_check import check_candles, validate
+from daily_box import DailyBox
+from sim_exchange import TF_MS, SimExchange, candles_from_file
+
+# fetch_data scripts import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fetch_data'))
+from ohlcv_store import limit, repair_store  # noqa: E402
+
+DATA_GLOB = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+NEAR_FILE = os.path.join('fetch_data', 'Results', 'NEAR_USDT_5m_full.csv')
+SYMBOL = 'NEAR/USDT'
+DROPPED = [(1000, 1600), (2500, 2510)]      # Candle rows lost to failed pages
+REAPPENDED = (3000, 3100)                   # A page written twice
+
+
+def best(fn, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def check_cost():
+    paths = sorted(glob.glob(DATA_GLOB))
+    frames = [load_candles(p) for p in paths]
+    load = best(lambda: [load_candles(p) for p in paths], repeat=3)
+    check = best(lambda: [validate(df, p) for p, df in zip(paths, frames)])
+    print(f"📊 {len(paths)} pairs: load_candles {load * 1000:.1f} ms, "
+          f"integrity pass {check * 1000:.2f} ms ({check / load * 100:.1f}% of the load)")
+
+    for symbols, days in [(10, 365), (100, 90)]:
+        ts = [synthetic_frame(days, seed=i)['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+              for i in range(symbols)]
+        clean = best(lambda: [check_candles(t) for t in ts])
+        damaged = [np.r_[t[: len(t) // 2], t[len(t) // 2 + 100:], t[-500:]] for t in ts]
+        dirty = best(lambda: [check_candles(t) for t in damaged])
+        report = check_candles(damaged[0])
+        print(f"   {symbols} x {days} days ({symbols * len(ts[0]):,} candles): {clean * 1000:.1f} ms clean, "
+              f"{dirty * 1000:.1f} ms damaged (per series: {report['gaps']} gap, {report['missing']} missing, "
+              f"{report['duplicates']} duplicates, {len(report['incomplete_days'])} incomplete days)")
+
+
+def raw_timestamps(path):
+    """
+    A CSV store's timestamps in file order (load_candles() would already dedupe them).
+    """
+    return pd.to_datetime(pd.read_csv(path)['timestamp']).values.astype('datetime64[ms]').astype(np.int64)
+
+
+def damage(src, dst):
+    df = pd.read_csv(src)
+    keep = np.ones(len(df), dtype=bool)
+    for a, b in DROPPED:
+        keep[a:b] = False
+    pd.concat([df[keep], df.iloc[REAPPENDED[0]:REAPPENDED[1]]]).to_csv(dst, index=False)
+
+
+def repair_check():
+    candles = candles_from_file(NEAR_FILE)
+    exchange = SimExchange({SYMBOL: candles})
+    exchange.rateLimit = 0
+    exchange.now = candles[-1][0] + TF_MS
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'NEAR_USDT_5m_full.csv')
+        damage(NEAR_FILE, path)
+        before = check_candles(raw_timestamps(path))
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            fixed = repair_store(exchange, SYMBOL, '5m', path)
+        elapsed = time.perf_counter() - start
+        requests = sum(exchange.calls.values())
+        after = check_candles(load_candles(path)['timestamp'].values)
+        same = load_candles(path).equals(load_candles(NEAR_FILE))
+        shutil.copy(path, os.path.join(tmp, 'again.csv'))
+        exchange.calls = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            again = repair_store(exchange, SYMBOL, '5m', os.path.join(tmp, 'again.csv'))
+
+    pages = sum(-(-(b - a) // limit) for a, b in DROPPED)
+    print(f"\n📥 Damaged store: {before['missing']} missing, {before['duplicates']} duplicates, "
+          f"{before['unsorted']} out of order")
+    print(f"   repair_store: {fixed} in {elapsed * 1000:.0f} ms, {requests} requests ({pages} gap pages)")
+    print(f"   after: {after['missing']} missing, {after['duplicates']} duplicates; second run {again}, "
+          f"{sum(exchange.calls.values())} requests")
+    ok = same and fixed['filled'] == before['missing'] and requests == pages and not exchange.calls
+    print(f"{'✅' if ok else '❌'} Repaired store {'matches' if same else 'differs from'} the original")
+
+
+def box_check():
+    df = load_candles(NEAR_FILE)
+    ts, h, l = df['timestamp'].values, df['high'].values, df['low'].values
+    live = DailyBox()
+    ready = []
+    for candle in df[['timestamp', 'open', 'high', 'low', 'close', 'volume']].values.tolist():
+        live.update([int(candle[0]), *candle[1:]])
+        ready.append(live.ready)
+    ready = np.array(ready)
+
+    print(f"\n{'box':<16}{'bars with box':>15}{'vs DailyBox':>13}")
+    for label, complete in [('all days', False), ('complete days', True)]:
+        high_box, _ = previous_period_box(ts, h, l, complete=complete)
+        has_box = ~np.isnan(high_box)
+        print(f"{label:<16}{int(has_box.sum()):>15}{int((has_box != ready).sum()):>13}")
+
+
+def main():
+    check_cost()
+    repair_check()
+    box_check()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Parity and timing check of box_engine against the original loops of
+box_theory_5m.py (iterrows) and box_theory_backtest.py (iloc per day).
+
+Run from the repo root:  python -m benchmarks.bench_engine
+"""
+import glob
+import os
+import time
+
+import pandas as pd
+
+from box_engine import backtest_5m, backtest_daily, load_candles, to_daily_candles
+
+DATA_GLOB = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+top_threshold = 0.9
+bottom_threshold = 0.1
+trade_size = 1
+
+
+# --- ORIGINAL LOOPS (reference implementations) ---
+def legacy_backtest_5m(df):
+    df = df.copy()
+    daily_boxes = df.resample('1D').agg({'high': 'max', 'low': 'min'})
+    daily_boxes['date'] = daily_boxes.index.date
+    box_lookup = daily_boxes.shift(1).dropna().set_index('date')
+
+    df['date'] = df.index.date
+    df = df[df['date'].isin(box_lookup.index)]
+    df = df.join(box_lookup, on='date', rsuffix='_box')
+    df.dropna(subset=['high_box', 'low_box'], inplace=True)
+
+    trades = []
+    in_position = False
+
+    for i, row in df.iterrows():
+        open_price = row['open']
+        close_price = row['close']
+        high_box = row['high_box']
+        low_box = row['low_box']
+        range_ = high_box - low_box
+
+        top = low_box + top_threshold * range_
+        bottom = low_box + bottom_threshold * range_
+
+        pnl = 0.0
+
+        if not in_position:
+            if open_price >= top:
+                entry_price = open_price
+                in_position = 'SHORT'
+            elif open_price <= bottom:
+                entry_price = open_price
+                in_position = 'LONG'
+        else:
+            if in_position == 'LONG':
+                pnl = close_price - entry_price
+            elif in_position == 'SHORT':
+                pnl = entry_price - close_price
+
+            trades.append({
+                'Timestamp': i,
+                'Signal': in_position,
+                'Entry': entry_price,
+                'Exit': close_price,
+                'P&L': pnl
+            })
+            in_position = False
+
+    return pd.DataFrame(trades, columns=['Timestamp', 'Signal', 'Entry', 'Exit', 'P&L'])
+
+
+def legacy_backtest_daily(df):
+    trades = []
+    cumulative_pl = 0.0
+
+    for i in range(1, len(df)):
+        prev_day = df.iloc[i - 1]
+        today = df.iloc[i]
+
+        box_high = prev_day['high']
+        box_low = prev_day['low']
+        box_range = box_high - box_low
+
+        open_price = today['open']
+        close_price = today['close']
+        date_str = today.name.strftime('%Y-%m-%d')
+
+        threshold_sell = box_low + top_threshold * box_range
+        threshold_buy = box_low + bottom_threshold * box_range
+
+        pl = 0.0
+        if open_price >= threshold_sell:
+            signal = 'SELL'
+            pl = (open_price - close_price) * trade_size
+        elif open_price <= threshold_buy:
+            signal = 'BUY'
+            pl = (close_price - open_price) * trade_size
+        else:
+            signal = 'NO TRADE'
+
+        cumulative_pl += pl
+        trades.append({
+            'Date': date_str,
+            'Signal': signal,
+            'Entry': open_price,
+            'Exit': close_price,
+            'Daily P&L': pl
+        })
+
+    return pd.DataFrame(trades), cumulative_pl
+
+
+def timed(fn, *args, repeat=3, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    paths = sorted(glob.glob(DATA_GLOB))
+    if not paths:
+        print(f"❌ No files match {DATA_GLOB}")
+        return
+
+    print(f"{'file':<24}{'rows':>7}{'trades':>8}{'loop 5m':>11}{'vec 5m':>10}{'x':>7}"
+          f"{'loop 1d':>11}{'vec 1d':>10}{'x':>7}")
+    total_loop = total_vec = 0.0
+    for path in paths:
+        df = load_candles(path)
+        daily = to_daily_candles(df)
+
+        ref_5m, t_loop_5m = timed(legacy_backtest_5m, df, repeat=1)
+        new_5m, t_vec_5m = timed(backtest_5m, df, top_threshold, bottom_threshold, same_day=True)
+        pd.testing.assert_frame_equal(ref_5m, new_5m, check_exact=True)
+
+        (ref_1d, ref_pl), t_loop_1d = timed(legacy_backtest_daily, daily, repeat=1)
+        (new_1d, new_pl), t_vec_1d = timed(backtest_daily, daily, top_threshold, bottom_threshold, trade_size)
+        pd.testing.assert_frame_equal(ref_1d, new_1d, check_exact=True)
+        assert ref_pl == new_pl, (ref_pl, new_pl)
+
+        total_loop += t_loop_5m
+        total_vec += t_vec_5m
+        print(f"{os.path.basename(path):<24}{len(df):>7}{len(new_5m):>8}"
+              f"{t_loop_5m * 1000:>9.1f}ms{t_vec_5m * 1000:>8.1f}ms{t_loop_5m / t_vec_5m:>6.0f}x"
+              f"{t_loop_1d * 1000:>9.1f}ms{t_vec_1d * 1000:>8.1f}ms{t_loop_1d / t_vec_1d:>6.0f}x")
+
+    print(f"\n✅ Trade lists identical for {len(paths)} files. "
+          f"5m total: loop {total_loop:.2f}s vs vectorized {total_vec:.3f}s ({total_loop / total_vec:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+execution.py over every bundled pair: the near_bot.py rules backtested frictionless
+(fills at the exact close/level, no fees), with fees and slippage, and with TP/SL from
+closes only like the live bot. Reports the cost of each run and how far the
+frictionless numbers are from the realistic ones.
+
+Run from the repo root:  python -m benchmarks.bench_execution
+"""
+import glob
+import os
+import time
+
+from box_engine import load_candles
+from execution import backtest_near_bot, start_balance
+
+DATA_GLOB = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+MODES = [
+    ('frictionless', dict(fee_rate=0.0, slippage=0.0, intrabar=True)),
+    ('fees+slippage', dict(intrabar=True)),
+    ('close exits', dict(intrabar=False)),
+]
+
+
+def main():
+    paths = sorted(glob.glob(DATA_GLOB))
+    if not paths:
+        print(f"❌ No files match {DATA_GLOB}")
+        return
+    frames = [(os.path.basename(p).replace('_5m_full.csv', ''), load_candles(p)) for p in paths]
+
+    print(f"{'mode':<16}{'trades':>8}{'skipped':>9}{'TP':>6}{'SL':>6}{'fees':>10}"
+          f"{'net P&L':>11}{'end balance':>13}{'ms':>8}")
+    for label, kwargs in MODES:
+        trades = skipped = tp = sl = 0
+        fees = pnl = 0.0
+        start = time.perf_counter()
+        for name, df in frames:
+            result, _ = backtest_near_bot(df, **kwargs)
+            filled = result[result['Qty'] > 0]
+            trades += len(filled)
+            skipped += len(result) - len(filled)
+            tp += int((filled['Reason'] == 'Take Profit').sum())
+            sl += int((filled['Reason'] == 'Stop Loss').sum())
+            fees += filled['Fees'].sum()
+            pnl += filled['P&L'].sum()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<16}{trades:>8}{skipped:>9}{tp:>6}{sl:>6}{fees:>10.2f}{pnl:>11.2f}"
+              f"{start_balance * len(frames) + pnl:>13.2f}{elapsed * 1000:>8.1f}")
+
+    print(f"\n✅ {len(frames)} pairs, {start_balance:.0f} USDT each")
+
+
+if __name__ == '__main__':
+    main()
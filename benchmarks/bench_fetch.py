@@ -0,0 +1,121 @@
+"""
+Offline check of fetch_data/async_fetcher.py against a fake exchange that serves the
+bundled candles with network latency, a server-side rate limit and random timeouts.
+Compares one request in flight (the old serial loop) with the concurrent pipeline and
+asserts that every rebuilt store matches the source candles.
+
+Run from the repo root:  python -m benchmarks.bench_fetch
+"""
+import asyncio
+import glob
+import os
+import random
+import sys
+import tempfile
+import time
+
+import ccxt
+import pandas as pd
+
+from box_engine import load_candles
+
+# fetch_data scripts import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fetch_data'))
+import async_fetcher  # noqa: E402
+from async_fetcher import RateBudget, update_all  # noqa: E402
+from ohlcv_store import store_path  # noqa: E402
+
+DATA_GLOB = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+LATENCY = 0.1               # Seconds per simulated HTTP round trip
+SERVER_LIMIT = 40           # Requests the fake server accepts per second before answering 429
+TIMEOUT_RATE = 0.03         # Share of requests that fail with a transient timeout
+async_fetcher.backoff = 0.1  # Scaled down with the fake latency
+
+
+class FakeExchange:
+    """
+    Minimal async ccxt stand-in: parse_timeframe(), milliseconds(), fetch_ohlcv(), close().
+    """
+    rateLimit = 50
+
+    def __init__(self, candles, seed=0):
+        self.candles = candles
+        self.now = max(c[-1][0] for c in candles.values()) + 5 * 60 * 1000 + 1
+        self.rng = random.Random(seed)
+        self.recent = []
+        self.calls = self.rate_limited = self.timeouts = 0
+
+    def parse_timeframe(self, timeframe):
+        return ccxt.Exchange.parse_timeframe(timeframe)
+
+    def milliseconds(self):
+        return self.now
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        self.calls += 1
+        clock = time.monotonic()
+        self.recent = [t for t in self.recent if clock - t < 1.0] + [clock]
+        if len(self.recent) > SERVER_LIMIT:
+            self.rate_limited += 1
+            raise ccxt.RateLimitExceeded('429 Too Many Requests')
+        await asyncio.sleep(LATENCY)
+        if self.rng.random() < TIMEOUT_RATE:
+            self.timeouts += 1
+            raise ccxt.RequestTimeout('timed out')
+        rows = self.candles[symbol]
+        return [list(r) for r in rows if r[0] >= since][:limit]
+
+    async def close(self):
+        pass
+
+
+def canned_candles(paths):
+    candles = {}
+    for path in paths:
+        df = load_candles(path)
+        symbol = os.path.basename(path).replace('_5m_full.csv', '').replace('_', '/')
+        prices = df[['open', 'high', 'low', 'close', 'volume']].values.tolist()
+        candles[symbol] = [[int(ts), *row] for ts, row in zip(df['timestamp'].values, prices)]
+    return candles
+
+
+def refresh(candles, root, in_flight):
+    exchange = FakeExchange(candles)
+    budget = RateBudget(weight_per_minute=60 * 2 * SERVER_LIMIT, max_in_flight=in_flight)
+    start = time.perf_counter()
+    results = asyncio.run(update_all(exchange, list(candles), '5m', budget, lookback_days=14, root=root))
+    return results, time.perf_counter() - start, exchange
+
+
+def check(candles, root):
+    for symbol, rows in candles.items():
+        got = pd.read_csv(store_path(symbol, '5m', root))
+        ts = pd.to_datetime(got['timestamp']).values.astype('datetime64[ms]').astype('int64')
+        ref = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        ref = ref[ref['timestamp'] >= ts[0]].drop_duplicates('timestamp')
+        assert (ts == ref['timestamp'].values).all(), symbol
+        assert (got[['open', 'high', 'low', 'close', 'volume']].values == ref.values[:, 1:]).all(), symbol
+
+
+def main():
+    paths = sorted(glob.glob(DATA_GLOB))
+    if not paths:
+        print(f"❌ No files match {DATA_GLOB}")
+        return
+    candles = canned_candles(paths)
+
+    for label, in_flight in [('serial', 1), ('concurrent', 8)]:
+        with tempfile.TemporaryDirectory() as root:
+            results, elapsed, exchange = refresh(candles, root, in_flight)
+            failed = {s: r for s, r in results.items() if isinstance(r, Exception)}
+            assert not failed, failed
+            check(candles, root)
+            print(f"{label:<11} {len(candles)} symbols, {exchange.calls} requests "
+                  f"({exchange.rate_limited} rate-limited, {exchange.timeouts} timeouts retried) "
+                  f"in {elapsed:.2f}s")
+
+    print("\n✅ Every store matches the source candles.")
+
+
+if __name__ == '__main__':
+    main()
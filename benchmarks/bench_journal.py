@@ -0,0 +1,121 @@
+"""
+Position journal: cost of one journaled state change, restore time after a long
+history, and a crash test. The crash test replays NEAR through LiveEngine on
+sim_exchange, kills the engine while a position is open, restarts it from the journal
+and checks that the restarted run places exactly the orders of an uninterrupted run.
+
+Run from the repo root:  python -m benchmarks.bench_journal
+"""
+import contextlib
+import io
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from exchange_state import ExchangeSnapshot
+from live_engine import LiveEngine
+from position_journal import PositionJournal
+from sim_exchange import TF_MS, SimExchange, candles_from_file
+
+DATA_FILE = os.path.join('fetch_data', 'Results', 'NEAR_USDT_5m_full.csv')
+SYMBOL = 'NEAR/USDT'
+RECORDS = 2000              # State changes timed per mode
+HISTORY = 100_000           # Records written before the restore timing (50k trades)
+POSITION = {'entry_price': 2.5, 'qty': 120.0, 'entry_time': datetime(2025, 1, 1)}
+
+
+def time_records(path, sync):
+    journal = PositionJournal(path, sync=sync)
+    start = time.perf_counter()
+    for i in range(RECORDS):
+        journal.record(SYMBOL, POSITION if i % 2 == 0 else None, 'bench')
+    elapsed = time.perf_counter() - start
+    journal.close()
+    return elapsed / RECORDS
+
+
+def time_restore(path, compact_after):
+    journal = PositionJournal(path, sync=False, compact_after=compact_after)
+    for i in range(HISTORY):
+        journal.record(f"S{i % 50}/USDT", POSITION if i % 4 < 2 else None, 'bench')
+    journal.close()
+    start = time.perf_counter()
+    restored = PositionJournal(path, sync=False, compact_after=compact_after)
+    elapsed = time.perf_counter() - start
+    restored.close()
+    return elapsed, restored.restored_lines, len(restored.positions)
+
+
+# --- CRASH TEST ---
+def make_engine(exchange, journal):
+    engine = LiveEngine(exchange, [SYMBOL], journal=journal)
+    engine.account = ExchangeSnapshot(exchange, clock=lambda: exchange.now / 1000)
+    return engine
+
+
+def run(exchange, engine, candles, start, stop):
+    engine.seed()
+    for candle in candles[start:stop]:
+        exchange.now = candle[0] + TF_MS
+        engine.submit(SYMBOL, candle).result()
+
+
+def crash_test(candles, path):
+    """
+    Returns (orders of the uninterrupted run, orders of the crashed + restarted run,
+    candle index of the crash, reconcile calls).
+    """
+    start = 600                 # Two days of history for the first box
+    exchange = SimExchange({SYMBOL: candles})
+    exchange.now = candles[start][0]
+    engine = make_engine(exchange, None)
+    run(exchange, engine, candles, start, len(candles))
+    engine.close()
+    reference = [(o['side'], o['amount'], o['timestamp']) for o in exchange.orders]
+
+    # Crash right after the middle buy: its position is only in the journal
+    buys = [o['timestamp'] for o in exchange.orders if o['side'] == 'buy']
+    crash = next(i for i, c in enumerate(candles) if c[0] + TF_MS == buys[len(buys) // 2]) + 1
+    exchange = SimExchange({SYMBOL: candles})
+    exchange.now = candles[start][0]
+    engine = make_engine(exchange, PositionJournal(path))
+    run(exchange, engine, candles, start, crash)
+    engine.queues[SYMBOL].shutdown(wait=True)   # No close(): the process dies here
+
+    engine = make_engine(exchange, PositionJournal(path))
+    before = dict(exchange.calls)
+    engine.seed()
+    calls = {k: v - before.get(k, 0) for k, v in exchange.calls.items() if v != before.get(k, 0)}
+    run(exchange, engine, candles, crash, len(candles))
+    engine.close()
+    restarted = [(o['side'], o['amount'], o['timestamp']) for o in exchange.orders]
+    return reference, restarted, crash, calls
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'positions.jsonl')
+        print(f"📊 Per state change: {time_records(path, True) * 1e6:.0f} µs with fsync, "
+              f"{time_records(path, False) * 1e6:.0f} µs without")
+        for compact_after, label in [(1000, 'compacted'), (10**9, 'never compacted')]:
+            os.remove(path)
+            elapsed, lines, open_ = time_restore(path, compact_after)
+            print(f"   Restore after {HISTORY} records ({label}): {elapsed * 1000:.2f} ms, "
+                  f"{lines} lines read, {open_} open positions")
+
+        candles = candles_from_file(DATA_FILE)
+        os.remove(path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reference, restarted, crash, calls = crash_test(candles, path)
+    print(f"\n📥 Crash after candle {crash} of {len(candles)}; restart calls: {calls}")
+    if restarted == reference:
+        print(f"✅ Restarted run placed the same {len(reference)} orders as the uninterrupted run")
+    else:
+        print(f"❌ Orders differ: {len(reference)} uninterrupted vs {len(restarted)} restarted")
+
+
+if __name__ == '__main__':
+    main()
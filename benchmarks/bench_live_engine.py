@@ -0,0 +1,121 @@
+"""
+One LiveEngine for all bundled pairs versus one bot per pair, against
+sim_exchange.SimExchange with a simulated REST round trip.
+Reports startup calls and the wall time from a candle close until every symbol has
+been handled (the close-to-decision latency of the slowest pair).
+
+Run from the repo root:  python -m benchmarks.bench_live_engine
+"""
+import contextlib
+import glob
+import io
+import logging
+import os
+import time
+
+from sim_exchange import TF_MS, SimExchange, candles_from_file
+from exchange_state import ExchangeSnapshot
+from live_engine import LiveEngine
+
+DATA_GLOB = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+RTT = 0.02                  # Simulated seconds per REST call
+WAVES = 20                  # Candle closes to replay
+
+
+def load_universe():
+    candles = {}
+    for path in sorted(glob.glob(DATA_GLOB)):
+        name = os.path.basename(path).replace('_5m_full.csv', '')
+        base, _, quote = name.rpartition('_')
+        candles[f"{base}/{quote}"] = candles_from_file(path)
+    return candles
+
+
+def exchange_clock_snapshot(exchange):
+    # The snapshot TTL must follow the replayed clock, not the benchmark's wall clock
+    return ExchangeSnapshot(exchange, clock=lambda: exchange.now / 1000)
+
+
+def run_waves(handle_close, candles, exchanges):
+    """
+    Replays the last WAVES candle closes through handle_close(index).
+    Returns the mean and worst wall time per close.
+    """
+    n = min(len(c) for c in candles.values())
+    first = next(iter(candles.values()))
+    waves = []
+    for k in range(n - WAVES, n):
+        for exchange in exchanges:
+            exchange.now = first[k][0] + TF_MS
+        start = time.perf_counter()
+        handle_close(k)
+        waves.append(time.perf_counter() - start)
+    return sum(waves) / len(waves), max(waves)
+
+
+def one_bot_per_pair(candles, start_ts):
+    """
+    Today's setup: one client, load_markets() and bot per pair. On a shared CPU their
+    candle closes are handled back to back.
+    """
+    t0 = time.perf_counter()
+    bots = {}
+    for s, rows in candles.items():
+        exchange = SimExchange({s: rows}, usdt=1000.0 / len(candles), latency=RTT)
+        exchange.now = start_ts
+        bots[s] = LiveEngine(exchange, [s])
+        bots[s].account = exchange_clock_snapshot(exchange)
+        bots[s].seed()
+    startup = time.perf_counter() - t0
+    calls = sum(sum(b.exchange.calls.values()) for b in bots.values())
+
+    def handle_close(k):
+        for s, bot in bots.items():
+            bot.submit(s, candles[s][k]).result()
+
+    mean, worst = run_waves(handle_close, candles, [b.exchange for b in bots.values()])
+    return calls, startup, mean, worst
+
+
+def one_engine(candles, start_ts):
+    """
+    One LiveEngine: one client and load_markets(), symbols handled concurrently.
+    """
+    t0 = time.perf_counter()
+    exchange = SimExchange(candles, latency=RTT)
+    exchange.now = start_ts
+    engine = LiveEngine(exchange, list(candles))
+    engine.account = exchange_clock_snapshot(exchange)
+    engine.seed()
+    startup = time.perf_counter() - t0
+    calls = sum(exchange.calls.values())
+
+    def handle_close(k):
+        futures = [engine.submit(s, rows[k]) for s, rows in candles.items()]
+        for future in futures:
+            future.result()
+
+    mean, worst = run_waves(handle_close, candles, [exchange])
+    return calls, startup, mean, worst
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    candles = load_universe()
+    if not candles:
+        print(f"❌ No files match {DATA_GLOB}")
+        return
+    n = min(len(c) for c in candles.values())
+    candles = {s: rows[:n] for s, rows in candles.items()}
+    start_ts = next(iter(candles.values()))[n - WAVES][0]
+
+    print(f"{len(candles)} symbols, {RTT * 1000:.0f}ms per REST call, {WAVES} candle closes\n")
+    print(f"{'setup':<20}{'startup calls':>15}{'startup s':>11}{'mean ms/close':>15}{'worst ms':>10}")
+    for label, run in [('one bot per pair', one_bot_per_pair), ('one LiveEngine', one_engine)]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            calls, startup, mean, worst = run(candles, start_ts)
+        print(f"{label:<20}{calls:>15}{startup:>11.2f}{mean * 1000:>15.0f}{worst * 1000:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
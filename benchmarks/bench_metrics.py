@@ -0,0 +1,78 @@
+"""
+Cost of the live bot's latency metrics: replays stored NEAR candles through LiveEngine
+on sim_exchange with Metrics enabled and disabled, and reports the per-tick overhead,
+the cost of one span, and the recorded p50/p95 per span.
+
+Run from the repo root:  python -m benchmarks.bench_metrics
+"""
+import contextlib
+import io
+import logging
+import os
+import time
+
+from exchange_state import ExchangeSnapshot
+from live_engine import LiveEngine
+from metrics import Metrics
+from sim_exchange import TF_MS, SimExchange, candles_from_file
+
+DATA_FILE = os.path.join('fetch_data', 'Results', 'NEAR_USDT_5m_full.csv')
+SYMBOL = 'NEAR/USDT'
+REPEAT = 3
+SPAN_LOOPS = 200_000
+
+
+def replay_ticks(rows, metrics):
+    """
+    Replays every candle through a fresh engine; returns mean seconds per tick.
+    """
+    exchange = SimExchange({SYMBOL: rows})
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = LiveEngine(exchange, [SYMBOL], metrics=metrics)
+        engine.account = ExchangeSnapshot(exchange, clock=lambda: exchange.now / 1000, metrics=metrics)
+        engine.seed()
+        start = time.perf_counter()
+        for candle in rows:
+            exchange.now = candle[0] + TF_MS
+            engine.submit(SYMBOL, candle).result()
+        elapsed = time.perf_counter() - start
+        engine.close()
+    return elapsed / len(rows)
+
+
+def span_cost(metrics):
+    start = time.perf_counter()
+    for _ in range(SPAN_LOOPS):
+        with metrics.span('loop'):
+            pass
+    return (time.perf_counter() - start) / SPAN_LOOPS
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    rows = candles_from_file(DATA_FILE)
+    print(f"📥 {len(rows)} candles of {SYMBOL}")
+
+    off = min(replay_ticks(rows, Metrics(enabled=False)) for _ in range(REPEAT))
+    on, metrics = float('inf'), None
+    for _ in range(REPEAT):
+        m = Metrics()
+        t = replay_ticks(rows, m)
+        if t < on:
+            on, metrics = t, m
+    print(f"   per tick, metrics off: {off * 1e6:8.1f} µs")
+    print(f"   per tick, metrics on:  {on * 1e6:8.1f} µs  ({(on / off - 1) * 100:+.1f}%)")
+    print(f"   one span:              {span_cost(Metrics()) * 1e6:8.2f} µs "
+          f"(disabled: {span_cost(Metrics(enabled=False)) * 1e6:.2f} µs)")
+
+    snap = metrics.snapshot()
+    print(f"\n📊 Counters: {snap['counters']}")
+    print(f"   {'span':<14}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, s in sorted(snap['spans'].items()):
+        print(f"   {name:<14}{s['count']:>8}{s['p50'] * 1000:>10.3f}{s['p95'] * 1000:>10.3f}{s['max'] * 1000:>10.3f}")
+    text = metrics.prometheus()
+    print(f"\n✅ Prometheus export: {len(text.splitlines())} lines, JSON snapshot: {len(snap['spans'])} spans")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Tick-to-order latency of live_engine with e-mail alerts sent inline (near_bot.py's old
+send_email(): connect, STARTTLS, login and send for every alert) versus the queued
+notifier.Notifier, against a slow local SMTP stand-in and sim_exchange.SimExchange.
+
+Every wave all symbols close an entry candle at once (their orders queue on the shared
+order lock), then a take-profit candle; the run ends with a burst of exchange errors
+that each raise a "⚠️ Bot Error" alert.
+
+Run from the repo root:  python -m benchmarks.bench_notify
+"""
+import contextlib
+import io
+import logging
+import socketserver
+import threading
+import time
+
+import ccxt
+
+from sim_exchange import TF_MS, SimExchange
+from box_engine import DAY_MS
+from exchange_state import ExchangeSnapshot
+from live_engine import LiveEngine
+from notifier import EmailSender, Notifier
+
+SYMBOLS = ['AAA/USDT', 'BBB/USDT', 'CCC/USDT', 'DDD/USDT']
+CYCLES = 10                 # Entry + take-profit waves
+ERROR_WAVES = 10            # Waves where fetch_balance fails
+CONNECT_DELAY = 0.3         # Seconds for TCP + STARTTLS + login on a fresh SMTP connection
+SEND_DELAY = 0.05           # Seconds per message on an open connection
+
+
+# --- SLOW SMTP STAND-IN ---
+class SlowSMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        server = self.server
+        time.sleep(server.connect_delay)
+        with server.lock:
+            server.connections += 1
+        self.reply('220 localhost ESMTP stand-in')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if command == b'DATA':
+                self.reply('354 end with .')
+                while self.rfile.readline() not in (b'.\r\n', b''):
+                    pass
+                time.sleep(server.send_delay)
+                with server.lock:
+                    server.messages += 1
+                self.reply('250 queued')
+            elif command == b'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class SlowSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_delay=CONNECT_DELAY, send_delay=SEND_DELAY):
+        super().__init__(('127.0.0.1', 0), SlowSMTPHandler)
+        self.connect_delay = connect_delay
+        self.send_delay = send_delay
+        self.connections = 0
+        self.messages = 0
+        self.lock = threading.Lock()
+
+
+# --- MARKET ---
+class FlakyExchange(SimExchange):
+    """
+    SimExchange that records when each buy order arrives and can fail fetch_balance.
+    """
+
+    def __init__(self, candles, **kwargs):
+        super().__init__(candles, **kwargs)
+        self.failing = False
+        self.order_times = {}
+
+    def fetch_balance(self):
+        if self.failing:
+            self._count('fetch_balance')
+            raise ccxt.NetworkError('binance GET /api/v3/account 503 Service Unavailable')
+        return super().fetch_balance()
+
+    def create_market_buy_order(self, symbol, amount):
+        self.order_times[symbol] = time.perf_counter()
+        return super().create_market_buy_order(symbol, amount)
+
+
+def synthetic_candles(scale):
+    """
+    One flat day with a 100-110 box (times `scale`), then alternating entry candles in
+    the bottom 10% of the box and take-profit candles.
+    """
+    day0 = 20 * DAY_MS
+    candles = []
+    for i in range(DAY_MS // TF_MS):
+        h, l = (110, 100) if i == 0 else (105.2, 104.8)
+        candles.append([day0 + i * TF_MS, 105, h, l, 105, 1.0])
+    day1 = day0 + DAY_MS
+    for i in range(2 * CYCLES + ERROR_WAVES):
+        o, h, l, c = (100.5, 101.2, 100.4, 101) if i % 2 == 0 else (101.5, 102.6, 101.4, 102.5)
+        candles.append([day1 + i * TF_MS, o, h, l, c, 1.0])
+    return [[ts, *(p * scale for p in prices), v] for ts, *prices, v in candles]
+
+
+# --- RUN ---
+def run(notify):
+    candles = {s: synthetic_candles(1 + i / 10) for i, s in enumerate(SYMBOLS)}
+    exchange = FlakyExchange(candles, usdt=100000)
+    day1 = candles[SYMBOLS[0]][0][0] + DAY_MS
+    exchange.now = day1
+    engine = LiveEngine(exchange, SYMBOLS, notify=notify, risk_pct=0.001)
+    engine.account = ExchangeSnapshot(exchange, clock=lambda: exchange.now / 1000)
+    engine.seed()
+
+    to_order, ticks = [], []
+    for k in range(2 * CYCLES + ERROR_WAVES):
+        ts = day1 + k * TF_MS
+        exchange.now = ts + TF_MS
+        exchange.failing = k >= 2 * CYCLES
+        exchange.order_times.clear()
+        start = time.perf_counter()
+        futures = [engine.submit(s, next(c for c in candles[s] if c[0] == ts)) for s in SYMBOLS]
+        for future in futures:
+            future.result()
+        ticks.append(time.perf_counter() - start)
+        to_order += [t - start for t in exchange.order_times.values()]
+    return to_order, ticks
+
+
+def inline_sender(port):
+    # near_bot.py's old send_email(): a new logged-in connection for every alert
+    def send(subject, body):
+        sender = EmailSender('127.0.0.1', port, 'bot@localhost', None, 'me@localhost', starttls=False)
+        try:
+            sender.send(subject, body)
+            print("📧 Email sent.")
+        except Exception as e:
+            print(f"⚠️ Failed to send email: {e}")
+        finally:
+            sender.close()
+    return send
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    smtp = SlowSMTPServer()
+    threading.Thread(target=smtp.serve_forever, daemon=True).start()
+    port = smtp.server_address[1]
+
+    print(f"{len(SYMBOLS)} symbols, SMTP stand-in: {CONNECT_DELAY * 1000:.0f}ms connect+login, "
+          f"{SEND_DELAY * 1000:.0f}ms per message\n")
+    print(f"{'alerts':<18}{'orders':>7}{'to order ms':>13}{'worst':>8}"
+          f"{'tick ms':>9}{'worst':>8}{'mails':>7}{'conns':>7}{'drain s':>9}")
+    for label in ['none', 'inline SMTP', 'Notifier']:
+        notifier = None
+        if label == 'none':
+            notify = None
+        elif label == 'inline SMTP':
+            notify = inline_sender(port)
+        else:
+            sender = EmailSender('127.0.0.1', port, 'bot@localhost', None, 'me@localhost', starttls=False)
+            notifier = Notifier(sender)
+            notify = notifier.notify
+
+        before = smtp.messages, smtp.connections
+        with contextlib.redirect_stdout(io.StringIO()):
+            to_order, ticks = run(notify)
+            start = time.perf_counter()
+            if notifier:
+                notifier.close()
+            drain = time.perf_counter() - start
+        mails, conns = smtp.messages - before[0], smtp.connections - before[1]
+        print(f"{label:<18}{len(to_order):>7}{sum(to_order) / len(to_order) * 1000:>13.1f}"
+              f"{max(to_order) * 1000:>8.1f}{sum(ticks) / len(ticks) * 1000:>9.1f}"
+              f"{max(ticks) * 1000:>8.1f}{mails:>7}{conns:>7}{drain:>9.2f}")
+    smtp.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+portfolio.py checks and timings. Each local pair run alone with max_positions=1 must
+give the trades and final balance of execution.backtest_near_bot (the Balance column
+differs by design: cash at entry vs balance after the exit). Then simulate_portfolio
+is timed on synthetic pairs, scaled over symbol count and history length.
+
+Run from the repo root:  python -m benchmarks.bench_portfolio [--symbols 13 100] [--days 30 365]
+"""
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_suite import synthetic_frame
+from box_engine import load_candles
+from execution import backtest_near_bot
+from portfolio import simulate_portfolio, summarize
+from run_universe import symbol_from_path
+
+DATA_GLOB = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+
+
+def synthetic_candles(days, seed):
+    """
+    bench_suite's synthetic pair with load_candles' integer ms timestamps.
+    """
+    df = synthetic_frame(days, seed)
+    df['timestamp'] = df['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+    return df
+
+
+def check_single(path):
+    df = load_candles(path)
+    reference, balance = backtest_near_bot(df)
+    trades, equity = simulate_portfolio({symbol_from_path(path): df}, max_positions=1)
+    try:
+        pd.testing.assert_frame_equal(reference.reset_index(drop=True).drop(columns='Balance'),
+                                      trades.drop(columns=['Symbol', 'Balance']), check_exact=False)
+    except AssertionError:
+        return False
+    return np.isclose(balance, equity['Equity'].iloc[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio backtest benchmark")
+    parser.add_argument('--symbols', type=int, nargs='+', default=[13, 100])
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 365])
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(DATA_GLOB))
+    failed = [symbol_from_path(p) for p in paths if not check_single(p)]
+    if failed:
+        print(f"❌ Single-pair runs differ from backtest_near_bot: {', '.join(failed)}")
+    else:
+        print(f"✅ {len(paths)} pairs alone match backtest_near_bot trade for trade")
+
+    print(f"\n{'symbols':>8}{'days':>6}{'rows':>9}{'signals':>9}{'trades':>8}{'s':>8}{'max DD %':>10}")
+    for days in args.days:
+        for n in args.symbols:
+            frames = {f"S{i}/USDT": synthetic_candles(days, seed=i) for i in range(n)}
+            start = time.perf_counter()
+            trades, equity = simulate_portfolio(frames)
+            elapsed = time.perf_counter() - start
+            stats = summarize(trades, equity, 1000)
+            print(f"{n:>8}{days:>6}{len(equity):>9}{len(trades):>9}{stats['Trades']:>8}{elapsed:>8.2f}"
+                  f"{stats['Max Drawdown %']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
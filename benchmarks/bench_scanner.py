@@ -0,0 +1,82 @@
+"""
+scanner.py against running near_bot.py's box logic once per symbol, on synthetic
+pairs served by sim_exchange.SimExchange (no network): wall time, REST calls and
+request weight for the first scan (boxes built) and a repeat scan (boxes cached).
+Both must find the same entry zones.
+
+Run from the repo root:  python -m benchmarks.bench_scanner [--symbols 13 100 500]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_suite import synthetic_frame
+from daily_box import DAY_MS, DailyBox
+from execution import bottom_threshold
+from scanner import BoxCache, scan
+from sim_exchange import TF_MS, SimExchange
+
+DAYS = 3
+
+
+def make_exchange(symbols):
+    candles = {}
+    for i in range(symbols):
+        df = synthetic_frame(DAYS, seed=i)
+        candles[f"S{i}/USDT"] = [[int(t) // 10**6, o, h, l, c, v] for t, o, h, l, c, v in
+                                 zip(df['timestamp'].values.astype(np.int64), df['open'], df['high'],
+                                     df['low'], df['close'], df['volume'])]
+    exchange = SimExchange(candles)
+    exchange.now = next(iter(candles.values()))[-1][0]     # Late in the last day, its last candle forming
+    return exchange
+
+
+def per_symbol(exchange):
+    """
+    near_bot.py style: every pair fetches its 5m candles since yesterday and runs the
+    DailyBox over them. Returns {symbol: entry zone}.
+    """
+    since = (exchange.now // DAY_MS - 1) * DAY_MS
+    zones = {}
+    for symbol in exchange.candles:
+        box = DailyBox()
+        for candle in exchange.fetch_ohlcv(symbol, '5m', since=since, limit=1000):
+            if candle[0] + TF_MS <= exchange.now:
+                box.update(candle)
+        zones[symbol] = box.low + bottom_threshold * (box.high - box.low)
+    return zones
+
+
+def counted(exchange, fn, *args):
+    exchange.calls = {}
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start, sum(exchange.calls.values()), exchange.weight
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scanner benchmark")
+    parser.add_argument('--symbols', type=int, nargs='+', default=[13, 100, 500])
+    args = parser.parse_args()
+
+    print(f"{'symbols':>8}  {'mode':<22}{'ms':>9}{'calls':>8}{'weight':>8}")
+    for n in args.symbols:
+        exchange = make_exchange(n)
+        zones, t_loop, calls_loop, w_loop = counted(exchange, per_symbol, exchange)
+        cache = BoxCache(exchange, list(exchange.candles))
+        table, t_first, calls_first, w_first = counted(exchange, scan, exchange, cache)
+        _, t_again, calls_again, w_again = counted(exchange, scan, exchange, cache)
+        t_math = min(counted(exchange, scan, exchange, cache)[1] for _ in range(5))
+
+        for label, t, c, w in [('per-symbol 5m + box', t_loop, calls_loop, w_loop),
+                               ('scanner, first scan', t_first, calls_first, w_first),
+                               ('scanner, boxes cached', t_again, calls_again, w_again)]:
+            print(f"{n:>8}  {label:<22}{t * 1000:>9.1f}{c:>8}{w:>8}")
+        ref = np.array([zones[s] for s in table['Symbol']])
+        same = np.allclose(ref, table['Entry Zone'].values)
+        print(f"{'':>8}  {'✅' if same else '❌'} same entry zones; best cached scan {t_math * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
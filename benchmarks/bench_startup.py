@@ -0,0 +1,109 @@
+"""
+near_bot.py cold start: import time (no network, no ccxt, pandas or numpy) and the time from
+process start to the first handled tick, with an empty and with a warm market cache.
+Each run is a fresh interpreter; the exchange is sim_exchange.SimExchange with a
+simulated REST round trip and an assumed load_markets() download time.
+
+Run from the repo root:  python -m benchmarks.bench_startup
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+DATA_FILE = os.path.join('fetch_data', 'Results', 'NEAR_USDT_5m_full.csv')
+SYMBOL = 'NEAR/USDT'
+RTT = 0.05                  # Simulated seconds per REST call
+MARKETS_DOWNLOAD = 1.0      # Assumed seconds for load_markets() (Binance exchangeInfo is several MB)
+REPEAT = 3
+
+
+def child(cache_path):
+    """
+    Runs in a fresh interpreter: imports near_bot, then builds its engine on a
+    SimExchange and handles the latest candle. Prints the timings as JSON.
+    """
+    began = time.perf_counter()
+    import near_bot
+    imported = time.perf_counter()
+    heavy = sorted(m for m in ('ccxt', 'pandas', 'numpy') if m in sys.modules)
+    built = near_bot.exchange.built
+
+    import contextlib
+    import io
+    import logging
+
+    from live_engine import LiveEngine
+    from markets import LazyExchange, MarketCache
+    from sim_exchange import TF_MS, SimExchange, candles_from_file
+
+    class SlowMarkets(SimExchange):
+        def load_markets(self, reload=False):
+            time.sleep(MARKETS_DOWNLOAD)
+            return super().load_markets(reload)
+
+    logging.disable(logging.CRITICAL)
+    candles = candles_from_file(DATA_FILE)
+    loaded = time.perf_counter()        # Reading the CSV is a benchmark cost, not a bot cost
+
+    def factory():
+        exchange = SlowMarkets({SYMBOL: candles}, latency=RTT)
+        exchange.now = candles[-1][0] + TF_MS
+        return exchange
+
+    exchange = LazyExchange(factory, [SYMBOL], MarketCache(cache_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = LiveEngine(exchange, [SYMBOL])
+        engine.seed()
+        engine.submit(SYMBOL, candles[-1]).result()
+        engine.close()
+    done = time.perf_counter()
+    print(json.dumps({
+        'import': imported - began,
+        'first_tick': (done - loaded) + (imported - began),
+        'heavy': heavy,
+        'built_at_import': built,
+        'calls': exchange.calls,
+    }))
+    near_bot.notifier.close(timeout=1)
+
+
+def run_child(cache_path):
+    out = subprocess.run([sys.executable, '-m', 'benchmarks.bench_startup', '--child', cache_path],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="near_bot.py startup benchmark")
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, 'markets.json')
+        rows = []
+        for _ in range(REPEAT):
+            if os.path.exists(cache):
+                os.remove(cache)
+            rows.append(('cold cache', run_child(cache)))
+            rows.append(('warm cache', run_child(cache)))
+
+    first = rows[0][1]
+    print(f"📥 import near_bot: {min(r['import'] for _, r in rows) * 1000:.0f} ms, "
+          f"heavy modules loaded: {first['heavy'] or 'none'}, exchange built: {first['built_at_import']}")
+    print(f"   {RTT * 1000:.0f}ms per REST call, load_markets() download assumed {MARKETS_DOWNLOAD:.1f}s\n")
+    print(f"{'start':<12}{'first tick ms':>15}  calls")
+    for label in ('cold cache', 'warm cache'):
+        runs = [r for name, r in rows if name == label]
+        best = min(runs, key=lambda r: r['first_tick'])
+        print(f"{label:<12}{best['first_tick'] * 1000:>15.0f}  {best['calls']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Load-time and memory check of the '.candles' column store against the CSV path
+of load_candles(), on the bundled files and on a synthetic multi-month series.
+
+Run from the repo root:  python -m benchmarks.bench_storage
+"""
+import glob
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from box_engine import backtest_5m, load_candles, save_candle_columns
+
+DATA_GLOB = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+SYNTHETIC_DAYS = 180
+
+
+def timed(fn, *args, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def peak_alloc(fn, *args):
+    """
+    Peak Python-heap allocation (MB) while fn runs. Memory-mapped pages are not
+    heap allocations, which is the point of the column store.
+    """
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def synthetic_csv(df, days, path):
+    """
+    Tiles a 5m history (with shifted timestamps) until it covers `days` days.
+    """
+    span = df['timestamp'].values[-1] - df['timestamp'].values[0] + 5 * 60 * 1000
+    reps = int(np.ceil(days * 24 * 60 * 60 * 1000 / span))
+    big = pd.concat([df.assign(timestamp=df['timestamp'] + k * span) for k in range(reps)])
+    big['timestamp'] = pd.to_datetime(big['timestamp'], unit='ms')
+    big.to_csv(path, index=False)
+
+
+def compare(csv_path, bin_path):
+    ref, t_csv = timed(load_candles, csv_path)
+    save_candle_columns(ref, bin_path)
+    new, t_bin = timed(load_candles, bin_path)
+    pd.testing.assert_frame_equal(ref, new, check_exact=True)
+    pd.testing.assert_frame_equal(backtest_5m(ref), backtest_5m(new), check_exact=True)
+    return len(ref), t_csv, t_bin, peak_alloc(load_candles, csv_path), peak_alloc(load_candles, bin_path)
+
+
+def main():
+    paths = sorted(glob.glob(DATA_GLOB))
+    if not paths:
+        print(f"❌ No files match {DATA_GLOB}")
+        return
+
+    print(f"{'file':<24}{'rows':>8}{'csv':>10}{'npy':>9}{'x':>7}{'csv MB':>9}{'npy MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = os.path.join(tmp, f"SYNTH_{SYNTHETIC_DAYS}d_5m_full.csv")
+        synthetic_csv(load_candles(paths[0]), SYNTHETIC_DAYS, synthetic)
+
+        for path in paths + [synthetic]:
+            bin_path = os.path.join(tmp, os.path.basename(path).replace('.csv', '.candles'))
+            rows, t_csv, t_bin, m_csv, m_bin = compare(path, bin_path)
+            print(f"{os.path.basename(path):<24}{rows:>8}{t_csv * 1000:>8.1f}ms{t_bin * 1000:>7.2f}ms"
+                  f"{t_csv / t_bin:>6.0f}x{m_csv:>9.2f}{m_bin:>9.2f}")
+
+    print(f"\n✅ Frames and backtests identical for {len(paths) + 1} files.")
+
+
+if __name__ == '__main__':
+    main()
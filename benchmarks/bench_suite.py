@@ -0,0 +1,306 @@
+"""
+Stage-by-stage benchmark of the backtest pipeline and the live bot tick on synthetic
+5m candles, scaled over history length (days to years) and symbol count.
+Stages: CSV load, timestamp parsing, daily resample, daily box, box_theory_5m
+backtest, results CSV write, and one LiveEngine tick against sim_exchange.
+Each stage is timed --repeat times, in rounds that run every stage in turn next to a
+fixed reference workload. The JSON keeps the median seconds and the median of stage /
+reference ('relative', which cancels most of the machine's speed drift), each with its
+spread. --compare flags stages slower than a saved baseline by more than a threshold,
+an absolute floor and the noise of both sides (several baseline runs add their
+run-to-run spread), and re-measures them: only slowdowns seen twice are reported.
+
+Run from the repo root:  python -m benchmarks.bench_suite [--days 7 30 365] [--symbols 1 10 100]
+                         [--compare base1.json base2.json base3.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from box_engine import DAY_MS, box_frame, load_candles, to_daily_candles
+from box_theory_5m import run_backtest
+from exchange_state import ExchangeSnapshot
+from live_engine import LiveEngine
+from sim_exchange import TF_MS, SimExchange
+
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+START_DAY = 19800           # 2024-03-18, UTC day number of the first synthetic candle
+TICKS = 20                  # Bot ticks timed per run
+REPEAT = 7                  # Rounds per stage; the median is kept
+NOISE = 2                   # Spreads a slowdown must exceed to count in compare()
+REFERENCE_VALUES = np.random.default_rng(0).random(300_000)
+
+
+# --- SYNTHETIC DATA ---
+def synthetic_frame(days, seed):
+    """
+    `days` of 5m candles as a random walk, in the fetch_data CSV layout.
+    """
+    rng = np.random.default_rng(seed)
+    n = days * DAY_MS // TF_MS
+    ts = START_DAY * DAY_MS + np.arange(n, dtype=np.int64) * TF_MS
+    close = 10.0 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.001, n)) * close
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(ts, unit='ms'),
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.uniform(100, 1000, n),
+    })
+
+
+# --- TIMING ---
+def reference_work():
+    """
+    Fixed sort + rolling mean (a few ms) timed next to every sample: a stage's time over
+    the reference's in the same round barely moves when the whole machine slows down.
+    """
+    np.sort(REFERENCE_VALUES)
+    pd.Series(REFERENCE_VALUES).rolling(10).mean()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def summarize(samples, references):
+    """
+    Samples (seconds) and the reference time of the same rounds -> the result fields:
+    medians of seconds and of the relative time, each with its median absolute deviation.
+    """
+    out = {}
+    for key, values in (('seconds', np.asarray(samples)), ('relative', np.asarray(samples) / references)):
+        median = float(np.median(values))
+        out[key] = median
+        out[f"{key}_spread"] = float(np.median(np.abs(values - median)))
+    return out
+
+
+def interleaved(stages, repeat=REPEAT):
+    """
+    {stage: fn} -> {stage: summarize() fields}. Every round times the reference and then
+    each stage once, so a stage's samples span the whole measurement.
+    """
+    samples = {stage: [] for stage in stages}
+    references = []
+    for _ in range(repeat):
+        references.append(timed(reference_work))
+        for stage, fn in stages.items():
+            samples[stage].append(timed(fn))
+    return {stage: summarize(times, references) for stage, times in samples.items()}
+
+
+# --- STAGES ---
+def bench_pipeline(paths, out_dir, repeat=REPEAT):
+    """
+    Times every backtest stage summed over all symbol files; returns
+    ({stage: summarize() fields}, candle rows).
+    """
+    raw = [pd.read_csv(p) for p in paths]
+    frames = [load_candles(p) for p in paths]
+    trades = [run_backtest(df) for df in frames]
+    out = [os.path.join(out_dir, f"trades_{i}.csv") for i in range(len(paths))]
+    stages = interleaved({
+        'csv_load': lambda: [pd.read_csv(p) for p in paths],
+        'to_datetime': lambda: [pd.to_datetime(df['timestamp']) for df in raw],
+        'daily_resample': lambda: [to_daily_candles(df) for df in frames],
+        'daily_box': lambda: [box_frame(df, same_day=True) for df in frames],
+        'backtest': lambda: [run_backtest(df) for df in frames],
+        'write_results': lambda: [t.to_csv(p, index=False) for t, p in zip(trades, out)],
+    }, repeat)
+    return stages, sum(len(df) for df in frames)
+
+
+def bench_bot_tick(symbols, days):
+    """
+    Wall time of one candle close handled by a LiveEngine trading every symbol, over
+    TICKS closes (no simulated latency: the CPU cost of a tick), as summarize() fields.
+    """
+    history = min(days, 3)      # The bot only ever reads yesterday and today
+    candles = {}
+    for i in range(symbols):
+        df = synthetic_frame(history, seed=i)
+        candles[f"S{i}/USDT"] = [[int(t) // 10**6, o, h, l, c, v] for t, o, h, l, c, v in
+                                 zip(df['timestamp'].values.astype(np.int64), df['open'], df['high'],
+                                     df['low'], df['close'], df['volume'])]
+    n = len(next(iter(candles.values())))
+    exchange = SimExchange(candles, usdt=1000.0 * symbols)
+    exchange.now = candles['S0/USDT'][n - TICKS][0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = LiveEngine(exchange, list(candles))
+        engine.account = ExchangeSnapshot(exchange, clock=lambda: exchange.now / 1000)
+        engine.seed()
+        waves, references = [], []
+        for k in range(n - TICKS, n):
+            exchange.now = candles['S0/USDT'][k][0] + TF_MS
+            references.append(timed(reference_work))
+            start = time.perf_counter()
+            futures = [engine.submit(s, rows[k]) for s, rows in candles.items()]
+            for future in futures:
+                future.result()
+            waves.append(time.perf_counter() - start)
+        engine.close()
+    return summarize(waves, references)
+
+
+def measure(days, symbols, repeat=REPEAT):
+    """
+    Every stage for one (days, symbols) combination on fresh synthetic CSVs, as
+    {stage: result row}.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(symbols):
+            path = os.path.join(tmp, f"S{i}_USDT_5m_full.csv")
+            synthetic_frame(days, seed=i).to_csv(path, index=False)
+            paths.append(path)
+        stages, rows = bench_pipeline(paths, tmp, repeat)
+    stages['bot_tick'] = bench_bot_tick(symbols, days)
+    return {stage: {'stage': stage, 'days': days, 'symbols': symbols, 'rows': rows, **timing}
+            for stage, timing in stages.items()}
+
+
+# --- RESULTS ---
+def run_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def load_baseline(paths):
+    """
+    Saved runs -> {(stage, days, symbols): row}. With several runs (of the same code)
+    each row keeps their median, and its spreads become the larger of the runs' own
+    and the run-to-run median absolute deviation, which is the bigger noise on a busy
+    machine.
+    """
+    runs = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for r in json.load(f)['results']:
+                runs.setdefault((r['stage'], r['days'], r['symbols']), []).append(r)
+    baseline = {}
+    for key, rows in runs.items():
+        base = dict(rows[0])
+        for field in ('seconds', 'relative'):
+            if len(rows) < 2 or any(field not in r for r in rows):
+                continue
+            values = np.array([r[field] for r in rows])
+            median = float(np.median(values))
+            base[field] = median
+            base[f"{field}_spread"] = max(float(np.median(np.abs(values - median))),
+                                          float(np.median([r.get(f"{field}_spread", 0.0) for r in rows])))
+        baseline[key] = base
+    return baseline
+
+
+def compare(results, baseline, threshold, min_delta=0.002, noise=NOISE):
+    """
+    Returns the result rows slower than the same (stage, days, symbols) row of the
+    load_baseline() runs by more than `threshold` (fraction) and `noise` times the
+    summed spreads, measured on the relative time when both sides have it, and by more
+    than `min_delta` seconds. Baselines from before the relative time only get seconds.
+    """
+    slower = []
+    for r in results:
+        base = baseline.get((r['stage'], r['days'], r['symbols']))
+        if not base or not base['seconds']:
+            continue
+        key = 'relative' if 'relative' in base else 'seconds'
+        old, new = base[key], r[key]
+        floor = noise * (r[f"{key}_spread"] + base.get(f"{key}_spread", 0.0))
+        if new > old * (1 + threshold) and new - old > floor and r['seconds'] - base['seconds'] > min_delta:
+            slower.append({**r, 'baseline': base['seconds'], 'change %': (new / old - 1) * 100})
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for the backtest stages and the bot tick")
+    parser.add_argument('--days', type=int, nargs='+', default=[7, 30, 365])
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--max-symbol-days', type=int, default=3650,
+                        help="skip combinations larger than days x symbols (bounds run time and disk)")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="runs per stage (the median is kept)")
+    parser.add_argument('--output', default=None, help="JSON file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', nargs='+', default=None,
+                        help="saved JSON run(s) to flag regressions against; several runs of the baseline "
+                             "commit add their run-to-run noise to the floor")
+    parser.add_argument('--threshold', type=float, default=0.2, help="slowdown that counts as a regression")
+    parser.add_argument('--min-ms', type=float, default=2.0, help="ignore slowdowns smaller than this")
+    parser.add_argument('--no-confirm', dest='confirm', action='store_false',
+                        help="report slowdowns without re-measuring them first")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    info = run_info()
+    results, skipped = [], []
+    print(f"{'days':>6}{'symbols':>9}{'rows':>11}  " + ''.join(f"{s:>15}" for s in
+          ['csv_load', 'to_datetime', 'daily_resample', 'daily_box', 'backtest', 'write_results', 'bot_tick']))
+    for days in args.days:
+        for symbols in args.symbols:
+            if days * symbols > args.max_symbol_days:
+                skipped.append(f"{symbols} x {days}d")
+                continue
+            stages = measure(days, symbols, args.repeat)
+            results += stages.values()
+            print(f"{days:>6}{symbols:>9}{stages['csv_load']['rows']:>11}  "
+                  + ''.join(f"{t['seconds'] * 1000:>13.1f}ms" for t in stages.values()))
+    if skipped:
+        print(f"⚠️ Skipped {', '.join(skipped)} (symbols x days over --max-symbol-days {args.max_symbol_days})")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"{info['commit'] or 'run'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'info': info, 'results': results}, f, indent=2)
+    print(f"\n✅ Saved {len(results)} timings to {output}")
+
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        slower = compare(results, baseline, args.threshold, args.min_ms / 1000)
+        if slower and args.confirm:
+            # A real regression is slow again when measured anew; a noisy sample rarely is
+            combos = sorted({(r['days'], r['symbols']) for r in slower})
+            print(f"⏳ Re-measuring {len(combos)} combination(s) to confirm {len(slower)} slowdown(s)")
+            again = [r for days, symbols in combos for r in measure(days, symbols, args.repeat).values()]
+            confirmed = {(r['stage'], r['days'], r['symbols'])
+                         for r in compare(again, baseline, args.threshold, args.min_ms / 1000)}
+            slower = [r for r in slower if (r['stage'], r['days'], r['symbols']) in confirmed]
+        if not slower:
+            print(f"✅ No stage more than {args.threshold * 100:.0f}% slower than {', '.join(args.compare)}")
+            return
+        print(f"❌ {len(slower)} regression(s) against {', '.join(args.compare)}:")
+        for r in slower:
+            print(f"   {r['stage']:<15} {r['days']:>4}d x {r['symbols']:<3} "
+                  f"{r['baseline'] * 1000:.1f}ms -> {r['seconds'] * 1000:.1f}ms (+{r['change %']:.0f}%)")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Trade-record output: the old list-of-dicts -> DataFrame -> to_csv path versus
+trade_log.TradeLog streaming the same rows to CSV and to the binary '.trades' store.
+Each writer runs in a fresh forked process, which reports its wall time and how far
+its peak RSS grew; the files are read back and compared.
+
+Run from the repo root:  python -m benchmarks.bench_trade_log [--rows 100000 1000000]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from execution import TRADE_COLUMNS
+from trade_log import TradeLog, load_trades
+
+COLUMNS = None              # Trades of the current run, inherited by the forked writers
+BLOCK = 4096                # Rows a backtest hands over at once in the streaming runs
+REASONS = np.array(['Take Profit', 'Stop Loss', 'Skipped (Too Small)', 'Aborted (Slippage)'], dtype=object)
+
+
+def synthetic_trades(n, seed=0):
+    rng = np.random.default_rng(seed)
+    entry_time = np.datetime64('2024-01-01', 'ns') + np.cumsum(rng.integers(1, 50, n)) * np.timedelta64(5, 'm')
+    entry = 5 + rng.random(n)
+    return {
+        'Entry Time': entry_time,
+        'Exit Time': entry_time + rng.integers(1, 20, n) * np.timedelta64(5, 'm'),
+        'Reason': REASONS[rng.integers(0, len(REASONS), n)],
+        'Qty': np.round(rng.uniform(1, 100, n), 1),
+        'Entry': entry,
+        'Exit': entry * (1 + rng.normal(0, 0.005, n)),
+        'Fees': rng.random(n) * 0.01,
+        'P&L': rng.normal(0, 0.1, n),
+        'Balance': 1000 + np.cumsum(rng.normal(0, 0.1, n)),
+    }
+
+
+def blocks(columns, n):
+    for lo in range(0, n, BLOCK):
+        yield {name: values[lo:lo + BLOCK] for name, values in columns.items()}
+
+
+def legacy(columns, n, path):
+    rows = []
+    for block in blocks(columns, n):
+        for i in range(len(block['Qty'])):
+            rows.append({name: values[i] for name, values in block.items()})
+    pd.DataFrame(rows, columns=list(TRADE_COLUMNS)).to_csv(path, index=False)
+
+
+def streamed(columns, n, path):
+    with TradeLog(TRADE_COLUMNS, path) as log:
+        for block in blocks(columns, n):
+            log.extend(**block)
+
+
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024     # ru_maxrss is KiB on Linux
+
+
+def child(fn, n, path):
+    before = peak_rss()
+    start = time.perf_counter()
+    fn(COLUMNS, n, path)
+    return time.perf_counter() - start, peak_rss() - before
+
+
+def measure(fn, n, path):
+    """
+    Runs one writer in a forked child (inheriting COLUMNS) so peaks do not mix.
+    """
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('fork')) as pool:
+        return pool.submit(child, fn, n, path).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trade log output benchmark")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    global COLUMNS
+    print(f"{'rows':>10}  {'writer':<22}{'seconds':>9}{'+RSS MB':>10}{'file MB':>10}")
+    for n in args.rows:
+        COLUMNS = synthetic_trades(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = [('dicts + to_csv', legacy, os.path.join(tmp, 'legacy.csv')),
+                    ('TradeLog csv', streamed, os.path.join(tmp, 'stream.csv')),
+                    ('TradeLog .trades', streamed, os.path.join(tmp, 'stream.trades'))]
+            for label, fn, path in runs:
+                elapsed, peak = measure(fn, n, path)
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) \
+                    if os.path.isdir(path) else os.path.getsize(path)
+                print(f"{n:>10}  {label:<22}{elapsed:>9.2f}{peak / 2**20:>10.1f}{size / 2**20:>10.1f}")
+
+            dates = ['Entry Time', 'Exit Time']
+            ref = pd.read_csv(runs[0][2], parse_dates=dates)
+            pd.testing.assert_frame_equal(pd.read_csv(runs[1][2], parse_dates=dates), ref)
+            pd.testing.assert_frame_equal(load_trades(runs[2][2]), ref, check_exact=False)
+        print(f"{'':>10}  ✅ all three files hold the same {n} trades")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from candle_check import TF_MS, validate
+from daily_box import DAY_MS
+
+# --- CONSTANTS ---
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+COLUMNS_SUFFIX = '.candles'
+WEEK_MS = 7 * DAY_MS
+WEEK_OFFSET_MS = 4 * DAY_MS      # Epoch day 0 is a Thursday; UTC weeks start on Monday
+
+
+# --- LOADING ---
+def candles_from_ohlcv(ohlcv):
+    """
+    Builds a candle DataFrame from a ccxt fetch_ohlcv() list.
+    The frame keeps the int64 millisecond 'timestamp' column and is indexed by UTC datetime.
+    Candles are checked, sorted and left with one row per timestamp (candle_check.validate()).
+    """
+    df = pd.DataFrame(ohlcv, columns=CANDLE_COLUMNS)
+    df['timestamp'] = df['timestamp'].astype('int64')
+    df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('datetime', inplace=True)
+    return validate(df, 'fetched candles')
+
+
+def load_candles(path):
+    """
+    Loads a CSV written by the fetch_data scripts (stringified 'timestamp' column),
+    or a '.candles' column directory written by save_candle_columns().
+    Returns the same layout as candles_from_ohlcv(), checked, sorted and deduplicated.
+    """
+    if path.rstrip('/\\').endswith(COLUMNS_SUFFIX):
+        return validate(candles_from_columns(load_candle_columns(path)), path)
+    df = pd.read_csv(path)
+    dt = pd.to_datetime(df['timestamp'])
+    df['timestamp'] = dt.values.astype('datetime64[ms]').astype('int64')
+    df['datetime'] = dt
+    df.set_index('datetime', inplace=True)
+    return validate(df, path)
+
+
+# --- BINARY COLUMN STORE ---
+def save_candle_columns(df, path):
+    """
+    Writes candles as one .npy file per column inside a '<name>.candles' directory:
+    int64 ms 'timestamp' and float64 open/high/low/close/volume.
+    Each file is written to a temp name and renamed, so readers never see a torn column.
+    """
+    os.makedirs(path, exist_ok=True)
+    for col in CANDLE_COLUMNS:
+        dtype = np.int64 if col == 'timestamp' else np.float64
+        tmp = os.path.join(path, f"{col}.tmp.npy")
+        np.save(tmp, np.ascontiguousarray(df[col].values, dtype=dtype))
+        os.replace(tmp, os.path.join(path, f"{col}.npy"))
+
+
+def load_candle_columns(path, mmap=True):
+    """
+    Opens a '.candles' directory and returns {column: array}.
+    With mmap=True the arrays are read-only memory maps, so opening costs no parsing
+    and only the pages a backtest touches are read from disk.
+    """
+    mode = 'r' if mmap else None
+    return {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode=mode) for col in CANDLE_COLUMNS}
+
+
+def candles_from_columns(columns):
+    """
+    Builds the candle DataFrame of candles_from_ohlcv() from a column dict.
+    The datetime index comes straight from the int64 timestamps (no string parsing) and
+    the column arrays are used as-is, so memory-mapped columns are not copied (and stay
+    read-only: .copy() the frame before editing it in place).
+    """
+    ts = np.asarray(columns['timestamp'], dtype=np.int64)
+    index = pd.DatetimeIndex(ts.astype('datetime64[ms]').astype('datetime64[ns]'), name='datetime')
+    return pd.DataFrame({col: np.asarray(columns[col]) for col in CANDLE_COLUMNS}, index=index, copy=False)
+
+
+def to_daily_candles(df, complete=False):
+    """
+    Aggregates 5m candles into UTC daily candles (open/high/low/close/volume).
+    Days without any candle are dropped, like a daily fetch_ohlcv() would.
+    complete=True blanks the high/low of days missing 5m candles, so backtest_daily()
+    builds no box from them (the next day is a NO TRADE day).
+    """
+    daily = df.resample('1D').agg({
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'volume': 'sum',
+    })
+    if complete:
+        partial = df['open'].resample('1D').count() < DAY_MS // TF_MS
+        daily.loc[partial, ['high', 'low']] = np.nan
+    return daily.dropna(subset=['open'])
+
+
+# --- BOX PERIODS ---
+def period_ms(period):
+    """
+    Box period ('4h', '12h', '1D', '1W', ...) -> (length ms, offset ms).
+    Periods are aligned to UTC midnight; whole weeks start on Monday.
+    """
+    length = int(pd.Timedelta(period) / pd.Timedelta(milliseconds=1))
+    if length <= 0:
+        raise ValueError(f"box period must be positive: {period!r}")
+    offset = WEEK_OFFSET_MS if length % WEEK_MS == 0 else 0
+    return length, offset
+
+
+def _box_per_bar(periods, period_high, period_low, period_of_bar, same_day, full=None):
+    """
+    Spreads per-period extremes over the bars: each bar gets the high/low of the period
+    before its own (NaN when that period has no candles), or with same_day its own
+    period's, dropping the last period. `full` (bool per period) also drops the periods
+    that are missing candles.
+    """
+    n = len(period_of_bar)
+    high_box = np.full(n, np.nan)
+    low_box = np.full(n, np.nan)
+    if n == 0:
+        return high_box, low_box
+    if same_day:
+        src_of_period = np.arange(len(periods))
+        period_ok = periods < periods[-1]
+    else:
+        # Map each period to the slot of the period before it (if it exists)
+        src_of_period = np.searchsorted(periods, periods - 1)
+        period_ok = periods[np.minimum(src_of_period, len(periods) - 1)] == periods - 1
+    if full is not None:
+        period_ok = period_ok & full[np.minimum(src_of_period, len(periods) - 1)]
+
+    bar_ok = period_ok[period_of_bar]
+    src = src_of_period[period_of_bar][bar_ok]
+    high_box[bar_ok] = period_high[src]
+    low_box[bar_ok] = period_low[src]
+    return high_box, low_box
+
+
+def _extremes(bucket, highs, lows, counts=None):
+    """
+    Sorted bucket ids -> (bucket of each run, run high, run low, run of each element,
+    candles per run). `counts` gives the candles each element stands for (default 1).
+    """
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    sizes = np.diff(np.r_[starts, len(bucket)])
+    run_of = np.repeat(np.arange(len(starts)), sizes)
+    if counts is not None:
+        sizes = np.add.reduceat(counts, starts)
+    return bucket[starts], np.maximum.reduceat(highs, starts), np.minimum.reduceat(lows, starts), run_of, sizes
+
+
+def previous_period_box(timestamps, highs, lows, period='1D', same_day=False, complete=False):
+    """
+    Returns (high_box, low_box) arrays aligned with the candles: the high/low of the
+    previous box period (see period_ms()), or NaN when that period has no candles.
+    same_day=True uses each candle's own period instead (see previous_day_box()).
+    complete=True also gives NaN when that period is missing 5m candles (partial first
+    day, fetch gaps), like the live DailyBox does. Timestamps must be unique.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    if len(timestamps) == 0:
+        return np.full(0, np.nan), np.full(0, np.nan)
+    length, offset = period_ms(period)
+    periods, period_high, period_low, period_of_bar, counts = _extremes((timestamps - offset) // length, highs, lows)
+    full = counts >= length // TF_MS if complete else None
+    return _box_per_bar(periods, period_high, period_low, period_of_bar, same_day, full)
+
+
+def previous_day_box(timestamps, highs, lows, same_day=False):
+    """
+    Returns (high_box, low_box) arrays aligned with the candles: the high/low of the
+    previous UTC calendar day, or NaN when that day has no candles.
+    Same result as resample('1D') + shift(1), computed with sorted-array ops.
+
+    same_day=True reproduces the resample/shift/join in box_theory_5m.py, whose
+    shifted 'date' column makes every candle use its own day's high/low as the box
+    (the last day is dropped).
+    """
+    return previous_period_box(timestamps, highs, lows, '1D', same_day)
+
+
+class BoxIndex:
+    """
+    Boxes of any period for one 5m series, without resampling or refetching.
+    Built once: the bars are reduced to `base` buckets (1h), and every period that is
+    a whole number of base buckets (4h, 12h, 1D, 1W, ...) is aggregated from those
+    few rows instead of the bars; other periods fall back to the bars. Results are
+    cached per (period, same_day, complete), so many periods are evaluated off one pass.
+    """
+
+    def __init__(self, timestamps, highs, lows, base='1h'):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.base_ms = period_ms(base)[0]
+        if len(self.timestamps):
+            self.base, self.base_high, self.base_low, self.base_of_bar, self.base_count = _extremes(
+                self.timestamps // self.base_ms, self.highs, self.lows)
+        self._boxes = {}
+
+    @classmethod
+    def from_frame(cls, df, base='1h'):
+        return cls(df['timestamp'].values, df['high'].values, df['low'].values, base)
+
+    def box(self, period='1D', same_day=False, complete=False):
+        """
+        (high_box, low_box) per bar, same values as previous_period_box().
+        """
+        key = (period, same_day, complete)
+        if key not in self._boxes:
+            self._boxes[key] = self._compute(period, same_day, complete)
+        return self._boxes[key]
+
+    def _compute(self, period, same_day, complete):
+        length, offset = period_ms(period)
+        if len(self.timestamps) == 0 or length % self.base_ms or offset % self.base_ms:
+            return previous_period_box(self.timestamps, self.highs, self.lows, period, same_day, complete)
+        periods, period_high, period_low, period_of_base, counts = _extremes(
+            (self.base * self.base_ms - offset) // length, self.base_high, self.base_low, self.base_count)
+        full = counts >= length // TF_MS if complete else None
+        return _box_per_bar(periods, period_high, period_low, period_of_base[self.base_of_bar], same_day, full)
+
+
+def box_frame(df, same_day=False, period='1D', index=None, complete=False):
+    """
+    Attaches 'high_box'/'low_box' to 5m candles and keeps only rows that have a
+    box (the rows box_theory_5m.py iterates over). `index` is an optional BoxIndex
+    of `df`, reused when several box periods are tried on the same candles.
+    complete=True drops the rows whose box period is missing candles.
+    """
+    if index is not None:
+        high_box, low_box = index.box(period, same_day, complete)
+    else:
+        high_box, low_box = previous_period_box(df['timestamp'].values, df['high'].values,
+                                                df['low'].values, period, same_day, complete)
+    keep = ~np.isnan(high_box)
+    out = df[keep].copy()
+    out['high_box'] = high_box[keep]
+    out['low_box'] = low_box[keep]
+    return out
+
+
+def thresholds(high_box, low_box, top_threshold, bottom_threshold):
+    """
+    Returns the (top, bottom) price levels of a box for the given thresholds.
+    """
+    range_ = high_box - low_box
+    top = low_box + top_threshold * range_
+    bottom = low_box + bottom_threshold * range_
+    return top, bottom
+
+
+# --- ENTRY STATE MACHINE ---
+def select_entries(signal):
+    """
+    Resolves the enter-then-exit state machine of box_theory_5m.py.
+    A signal bar opens a position only when the bar before it was not an entry,
+    because that bar is spent closing the previous trade. Within every run of
+    consecutive signal bars the entries are therefore the 1st, 3rd, 5th, ... bar.
+    An entry on the final bar has no exit bar and is dropped.
+    Works along the last axis, so a stack of signal rows (one per parameter set)
+    is resolved in one call.
+    """
+    signal = np.asarray(signal, dtype=bool)
+    n = signal.shape[-1] if signal.ndim else 0
+    if n == 0:
+        return signal.copy()
+    idx = np.arange(n)
+    last_false = np.maximum.accumulate(np.where(signal, -1, idx), axis=-1)
+    entry = signal & ((idx - last_false - 1) % 2 == 0)
+    entry[..., -1] = False
+    return entry
+
+
+# --- BACKTESTS ---
+def backtest_5m(df, top_threshold=0.9, bottom_threshold=0.1, same_day=False, period='1D', index=None,
+                complete=False):
+    """
+    Vectorized version of the box_theory_5m.py loop.
+    Enters at the open of a bar that opens at/above the top (SHORT) or at/below the
+    bottom (LONG) of the box and exits at the close of the next bar.
+    The box is the previous `period` (default the previous UTC day), see box_frame().
+    Returns a DataFrame with Timestamp, Signal, Entry, Exit, P&L.
+    """
+    boxed = box_frame(df, same_day=same_day, period=period, index=index, complete=complete)
+    open_ = boxed['open'].values
+    close = boxed['close'].values
+    top, bottom = thresholds(boxed['high_box'].values, boxed['low_box'].values,
+                             top_threshold, bottom_threshold)
+
+    short = open_ >= top
+    long_ = ~short & (open_ <= bottom)
+    entry_idx = np.flatnonzero(select_entries(short | long_))
+    exit_idx = entry_idx + 1
+
+    is_long = long_[entry_idx]
+    entry_price = open_[entry_idx]
+    exit_price = close[exit_idx]
+    pnl = np.where(is_long, exit_price - entry_price, entry_price - exit_price)
+
+    return pd.DataFrame({
+        'Timestamp': boxed.index[exit_idx],
+        'Signal': np.where(is_long, 'LONG', 'SHORT').astype(object),
+        'Entry': entry_price,
+        'Exit': exit_price,
+        'P&L': pnl,
+    })
+
+
+def backtest_daily(df, top_threshold=0.9, bottom_threshold=0.1, trade_size=1):
+    """
+    Vectorized version of backtest_box_theory() in box_theory_backtest.py.
+    Uses the previous daily candle as the box, trades at today's open and exits at
+    today's close. Returns (trades DataFrame incl. NO TRADE days, cumulative P&L).
+    """
+    if len(df) < 2:
+        empty = pd.DataFrame(columns=['Date', 'Signal', 'Entry', 'Exit', 'Daily P&L'])
+        return empty, 0.0
+
+    high = df['high'].values
+    low = df['low'].values
+    open_ = df['open'].values[1:]
+    close = df['close'].values[1:]
+    threshold_sell, threshold_buy = thresholds(high[:-1], low[:-1], top_threshold, bottom_threshold)
+
+    sell = open_ >= threshold_sell
+    buy = ~sell & (open_ <= threshold_buy)
+    pl = np.where(sell, (open_ - close) * trade_size,
+                  np.where(buy, (close - open_) * trade_size, 0.0))
+    signal = np.where(sell, 'SELL', np.where(buy, 'BUY', 'NO TRADE')).astype(object)
+
+    trades = pd.DataFrame({
+        'Date': df.index[1:].strftime('%Y-%m-%d'),
+        'Signal': signal,
+        'Entry': open_,
+        'Exit': close,
+        'Daily P&L': pl,
+    })
+    cumulative_pl = float(np.cumsum(np.r_[0.0, pl])[-1])
+    return trades, cumulative_pl
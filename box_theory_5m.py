@@ -1,6 +1,9 @@
 import ccxt
-import pandas as pd
-from datetime import datetime
+
+from box_engine import BoxIndex, backtest_5m, candles_from_ohlcv
+from execution import apply_costs
+from profiling import OFF, Profiler
+from trade_log import save_trades
 
 # Parameters
 symbol = 'SOL/USDT'
@@ -9,69 +12,59 @@ lookback_days = 5
 top_threshold = 0.9
 bottom_threshold = 0.1
 trade_size = 1
+same_day_box = True  # Box = the candle's own UTC day, as the original resample/shift/join computed it
+box_period = '1D'    # Box length: '4h', '12h', '1D', '1W', ... (aggregated from the 5m candles)
+complete_boxes = False  # True: no box from periods missing candles (partial first day, fetch gaps)
+fee_rate = 0.0       # Taker fee per fill, e.g. 0.001 (execution.py); 0 keeps the frictionless results
+slippage = 0.0       # Fill vs. the candle open/close, e.g. 0.0005
+output_file = "box_theory_5m_trades.csv"     # '.trades' suffix for the binary column store
+profile = False      # Print wall/CPU/memory per stage (see profiling.py)
+profile_file = None  # Also save that breakdown as JSON
+cprofile_file = None  # cProfile dump of the signal stage, e.g. "box_theory_5m.prof"
 
-# Set up exchange
-exchange = ccxt.binance()
-
-# Fetch 5m data
-since = exchange.milliseconds() - lookback_days * 24 * 60 * 60 * 1000
-ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since)
-df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-df.set_index('datetime', inplace=True)
 
-# Get daily high/low boxes from 1D resample
-daily_boxes = df.resample('1D').agg({'high': 'max', 'low': 'min'})
-daily_boxes['date'] = daily_boxes.index.date
-box_lookup = daily_boxes.shift(1).dropna().set_index('date')
+def fetch_5m_data(profiler=OFF):
+    # Set up exchange
+    exchange = ccxt.binance()
 
-df['date'] = df.index.date
-df = df[df['date'].isin(box_lookup.index)]
-df = df.join(box_lookup, on='date', rsuffix='_box')
-df.dropna(subset=['high_box', 'low_box'], inplace=True)
+    # Fetch 5m data
+    with profiler.stage('fetch'):
+        since = exchange.milliseconds() - lookback_days * 24 * 60 * 60 * 1000
+        ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since)
+    with profiler.stage('frame'):
+        return candles_from_ohlcv(ohlcv)
 
-# Apply the box theory logic
-trades = []
-in_position = False
 
-for i, row in df.iterrows():
-    open_price = row['open']
-    close_price = row['close']
-    high_box = row['high_box']
-    low_box = row['low_box']
-    range_ = high_box - low_box
+def run_backtest(df, profiler=OFF):
+    # Apply the box theory logic (box, thresholds and one-bar hold as array ops). When
+    # profiling, the box is computed in its own stage and handed to backtest_5m() through
+    # an index; otherwise backtest_5m() computes it without the extra pass.
+    index = None
+    if profiler.enabled:
+        with profiler.stage('box'):
+            index = BoxIndex.from_frame(df, base=box_period)
+            index.box(box_period, same_day_box, complete_boxes)
+    with profiler.stage('signals', hot=True):
+        trades = backtest_5m(df, top_threshold, bottom_threshold, same_day=same_day_box, period=box_period,
+                             index=index, complete=complete_boxes)
+    # Price both fills like a market order and pay the fees (adds a 'Fees' column)
+    if not (fee_rate or slippage):
+        return trades
+    with profiler.stage('costs'):
+        return apply_costs(trades, fee_rate, slippage, trade_size)
 
-    top = low_box + top_threshold * range_
-    bottom = low_box + bottom_threshold * range_
 
-    signal = 'NO TRADE'
-    pnl = 0.0
+def main():
+    profiler = Profiler(profile or bool(profile_file or cprofile_file), cprofile_file)
+    df = fetch_5m_data(profiler)
+    results_df = run_backtest(df, profiler)
 
-    if not in_position:
-        if open_price >= top:
-            signal = 'SELL'
-            entry_price = open_price
-            in_position = 'SHORT'
-        elif open_price <= bottom:
-            signal = 'BUY'
-            entry_price = open_price
-            in_position = 'LONG'
-    else:
-        if in_position == 'LONG':
-            pnl = close_price - entry_price
-        elif in_position == 'SHORT':
-            pnl = entry_price - close_price
+    # Save results
+    with profiler.stage('save'):
+        save_trades(results_df, output_file)
+    print(f"Saved: {output_file}")
+    profiler.finish(profile_file)
 
-        trades.append({
-            'Timestamp': i,
-            'Signal': in_position,
-            'Entry': entry_price,
-            'Exit': close_price,
-            'P&L': pnl
-        })
-        in_position = False
 
-# Save results
-results_df = pd.DataFrame(trades)
-results_df.to_csv("box_theory_5m_trades.csv", index=False)
-print("Saved: box_theory_5m_trades.csv")
+if __name__ == '__main__':
+    main()
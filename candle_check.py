@@ -0,0 +1,89 @@
+"""
+Integrity checks for 5m candle series: unsorted or duplicate timestamps, missing
+candles and days that do not hold all their candles. Everything is a few passes of
+array ops over the int64 timestamps, so load_candles() runs validate() on every load.
+The stores themselves are repaired by fetch_data/ohlcv_store.repair_store(), which
+uses the same dedupe() and missing_ranges().
+"""
+import numpy as np
+
+from daily_box import DAY_MS
+
+# --- CONSTANTS ---
+TF_MS = 5 * 60 * 1000
+
+
+def dedupe(df):
+    """
+    Candle frame sorted by 'timestamp' with one row per timestamp (the last one, i.e. the
+    most recent fetch). An already clean frame is returned as is after a single diff.
+    The one duplicate rule of the repo: load_candles() and the fetch_data store repair
+    both go through it.
+    """
+    ts = df['timestamp'].values
+    if len(ts) < 2 or (np.diff(ts) > 0).all():
+        return df
+    order = np.argsort(ts, kind='stable')
+    ts = ts[order]
+    keep = np.r_[ts[1:] != ts[:-1], True]
+    return df.iloc[order[keep]]
+
+
+def missing_ranges(timestamps, tf_ms=TF_MS):
+    """
+    Sorted unique timestamps -> (since, until) int64 arrays: the candles since, since +
+    tf_ms, ..., until - tf_ms are missing. Only gaps between the first and last candle.
+    """
+    ts = np.asarray(timestamps, dtype=np.int64)
+    gap = np.flatnonzero(np.diff(ts) > tf_ms)
+    return ts[gap] + tf_ms, ts[gap + 1]
+
+
+def incomplete_periods(timestamps, length=DAY_MS, offset=0, tf_ms=TF_MS):
+    """
+    Sorted unique timestamps -> start (ms) of every period (UTC day by default) holding
+    fewer than length // tf_ms candles, the partial first and last day included.
+    """
+    periods = (np.asarray(timestamps, dtype=np.int64) - offset) // length
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    counts = np.diff(np.r_[starts, len(periods)])
+    return periods[starts][counts < length // tf_ms] * length + offset
+
+
+def check_candles(timestamps, tf_ms=TF_MS):
+    """
+    Integrity report of a candle series (any order) as a dict: candles, unsorted steps,
+    duplicate timestamps, gaps, missing candles and the incomplete UTC days.
+    """
+    ts = np.asarray(timestamps, dtype=np.int64)
+    steps = np.diff(ts)
+    unsorted = int((steps < 0).sum())
+    duplicates = int((steps == 0).sum())
+    if unsorted:
+        ts = np.unique(ts)
+        duplicates = len(timestamps) - len(ts)
+    elif duplicates:
+        ts = ts[np.r_[True, steps > 0]]
+    since, until = missing_ranges(ts, tf_ms)
+    return {
+        'candles': len(timestamps),
+        'unsorted': unsorted,
+        'duplicates': duplicates,
+        'gaps': len(since),
+        'missing': int(((until - since) // tf_ms).sum()),
+        'incomplete_days': incomplete_periods(ts, tf_ms=tf_ms),
+    }
+
+
+def validate(df, source='candles'):
+    """
+    Runs check_candles() on a freshly loaded candle frame and returns its dedupe().
+    Prints a warning naming `source` when the series was out of order, held duplicates
+    or has gaps. The partial first and last day every store has are not reported.
+    """
+    report = check_candles(df['timestamp'].values)
+    if report['unsorted'] or report['duplicates'] or report['gaps']:
+        print(f"⚠️ {source}: {report['unsorted']} out of order, {report['duplicates']} duplicates, "
+              f"{report['missing']} candles missing in {report['gaps']} gaps "
+              f"({len(report['incomplete_days'])} incomplete days)")
+    return dedupe(df)
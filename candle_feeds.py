@@ -0,0 +1,149 @@
+import asyncio
+import heapq
+import queue
+import threading
+import time
+
+
+class CandleFeed:
+    """
+    Iterable of (symbol, closed candle) pairs; candles are [timestamp, open, high, low,
+    close, volume] with ms timestamps. Every candle is yielded exactly once per symbol,
+    right after it closes.
+    Subclasses implement __iter__() and pass raw candle lists through closed().
+    """
+
+    def __init__(self):
+        self.last_ts = {}
+
+    def closed(self, symbol, candles, forming_ts=None):
+        """
+        Returns the candles of `symbol` not yielded yet that are older than the forming
+        candle (forming_ts = timestamp of the candle still open, None when all are closed).
+        """
+        out = []
+        last = self.last_ts.get(symbol)
+        for candle in sorted(candles, key=lambda c: c[0]):
+            ts = candle[0]
+            if forming_ts is not None and ts >= forming_ts:
+                break
+            if last is None or ts > last:
+                out.append(list(candle))
+                last = ts
+        if last is not None:
+            self.last_ts[symbol] = last
+        return out
+
+    def __iter__(self):
+        raise NotImplementedError
+
+
+class ReplayFeed(CandleFeed):
+    """
+    Replays {symbol: candles} (e.g. from fetch_data CSVs) as if each candle had just
+    closed, all symbols merged in time order.
+    """
+
+    def __init__(self, candles_by_symbol):
+        super().__init__()
+        self.candles_by_symbol = candles_by_symbol
+
+    def __iter__(self):
+        streams = [[(c[0], symbol, c) for c in self.closed(symbol, candles)]
+                   for symbol, candles in self.candles_by_symbol.items()]
+        for _, symbol, candle in heapq.merge(*streams, key=lambda item: item[0]):
+            yield symbol, candle
+
+
+class PollingFeed(CandleFeed):
+    """
+    REST fallback: wakes up `delay` seconds after each candle close (aligned to the
+    exchange clock, not a fixed 300s timer) and fetches only the last few candles of
+    every symbol.
+    """
+
+    def __init__(self, exchange, symbols, timeframe, delay=2.0):
+        super().__init__()
+        self.exchange = exchange
+        self.symbols = symbols
+        self.timeframe = timeframe
+        self.tf_ms = exchange.parse_timeframe(timeframe) * 1000
+        self.delay = delay
+
+    def __iter__(self):
+        while True:
+            now = self.exchange.milliseconds()
+            next_close = (now // self.tf_ms + 1) * self.tf_ms
+            time.sleep((next_close - now) / 1000 + self.delay)
+            for symbol in self.symbols:
+                try:
+                    candles = self.exchange.fetch_ohlcv(symbol, self.timeframe, limit=3)
+                except Exception as e:
+                    print(f"⚠️ Feed error ({symbol}): {e}")
+                    continue
+                forming = [c[0] for c in candles if c[0] + self.tf_ms > self.exchange.milliseconds()]
+                first = symbol not in self.last_ts
+                fresh = self.closed(symbol, candles, min(forming) if forming else None)
+                # On start only the candle that just closed is new, older ones were missed
+                for candle in fresh[-1:] if first else fresh:
+                    yield symbol, candle
+
+
+class WebsocketFeed(CandleFeed):
+    """
+    Streams klines of every symbol with ccxt.pro watch_ohlcv() over one client on a
+    background thread. A candle is closed once the stream reports a newer one, so each
+    candle is handed to the consumer within a second of its close. The consumer
+    iterates synchronously and the streams keep buffering while it works.
+    Network errors reconnect; anything else (a bad symbol, rejected keys, a failed
+    ccxt.pro import) stops the stream and is raised from the consumer's loop.
+    """
+
+    def __init__(self, symbols, timeframe, config=None):
+        super().__init__()
+        self.symbols = symbols
+        self.timeframe = timeframe
+        self.config = config or {}
+        self.queue = queue.Queue()
+
+    async def _watch(self, exchange, symbol, fatal):
+        while True:
+            try:
+                candles = await exchange.watch_ohlcv(symbol, self.timeframe)
+            except fatal:
+                raise
+            except Exception as e:
+                print(f"⚠️ Feed error ({symbol}): {e}, reconnecting")
+                await asyncio.sleep(1)
+                continue
+            if symbol not in self.last_ts:
+                # Candles cached at connect time closed before we started
+                self.last_ts[symbol] = candles[-1][0] - 1
+            for candle in self.closed(symbol, candles, candles[-1][0]):
+                self.queue.put((symbol, candle))
+
+    async def _stream(self):
+        import ccxt.pro
+
+        # Retrying cannot fix these
+        fatal = (ccxt.AuthenticationError, ccxt.BadRequest, ccxt.NotSupported)
+        exchange = ccxt.pro.binance(self.config)
+        try:
+            await asyncio.gather(*(self._watch(exchange, s, fatal) for s in self.symbols))
+        finally:
+            await exchange.close()
+
+    def _run(self):
+        try:
+            asyncio.run(self._stream())
+        except BaseException as e:
+            self.queue.put(e)
+
+    def __iter__(self):
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+        while True:
+            item = self.queue.get()
+            if isinstance(item, BaseException):
+                raise item
+            yield item
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import os
+import time
+
+from box_engine import COLUMNS_SUFFIX, load_candles, save_candle_columns
+
+# --- CONFIGURATION PARAMETERS ---
+data_glob = os.path.join('fetch_data', 'Results', '*.csv')
+
+
+def convert_file(path):
+    """
+    'X_5m_full.csv' -> 'X_5m_full.candles/' next to it. Returns (output path, rows).
+    """
+    df = load_candles(path)
+    out = os.path.splitext(path)[0] + COLUMNS_SUFFIX
+    save_candle_columns(df, out)
+    return out, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert fetch_data candle CSVs to memory-mappable .candles stores")
+    parser.add_argument('--data', default=data_glob, help="glob of candle CSV files")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.data))
+    if not paths:
+        print(f"❌ No files match {args.data}")
+        return
+
+    start = time.perf_counter()
+    for path in paths:
+        out, rows = convert_file(path)
+        print(f"✅ {path} -> {out} ({rows} candles)")
+    print(f"\nConverted {len(paths)} files in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
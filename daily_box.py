@@ -0,0 +1,51 @@
+"""
+The live bot's box: pure Python, so near_bot.py starts without importing pandas.
+box_engine.py shares its DAY_MS.
+"""
+
+# --- CONSTANTS ---
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class DailyBox:
+    """
+    Previous-UTC-day high/low maintained one closed candle at a time, for the live bot.
+    Keeps a running high/low for the current day; when a candle of the next day arrives
+    that running range becomes the box, so the rollover costs nothing. O(1) per candle.
+    The box is empty (ready is False) until a full previous day has been seen, and after
+    a day without candles.
+    """
+
+    def __init__(self):
+        self.day = None
+        self.last_ts = None
+        self.partial = False
+        self.day_high = self.day_low = None
+        self.high = self.low = None
+
+    @property
+    def ready(self):
+        return self.high is not None
+
+    def update(self, candle):
+        """
+        Adds a closed [ts, open, high, low, close, volume] candle. Candles at or before
+        the last one seen are ignored, so seeding and the live feed may overlap.
+        """
+        ts, high, low = candle[0], candle[2], candle[3]
+        if self.last_ts is not None and ts <= self.last_ts:
+            return
+        day = ts // DAY_MS
+        if day != self.day:
+            if self.day is not None and day == self.day + 1 and not self.partial:
+                self.high, self.low = self.day_high, self.day_low
+            else:
+                self.high = self.low = None
+            # Only the first day seen can have started before our first candle
+            self.partial = self.day is None and ts % DAY_MS != 0
+            self.day = day
+            self.day_high, self.day_low = high, low
+        else:
+            self.day_high = max(self.day_high, high)
+            self.day_low = min(self.day_low, low)
+        self.last_ts = ts
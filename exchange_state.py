@@ -0,0 +1,44 @@
+import threading
+import time
+
+
+class ExchangeSnapshot:
+    """
+    Short-lived cache of the account state the bot reads on every candle.
+    fetch_balance() is called at most once per `ttl` seconds; invalidate() drops the
+    cache after one of our own orders fills, so the next read sees the new balances.
+    Thread-safe, so the symbols of one LiveEngine share a single snapshot.
+    Real fetches are timed into `metrics` (a metrics.Metrics) when given.
+    """
+
+    def __init__(self, exchange, ttl=5.0, clock=time.monotonic, metrics=None):
+        self.exchange = exchange
+        self.ttl = ttl
+        self.clock = clock
+        self.metrics = metrics
+        self._balance = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def balance(self):
+        """
+        Raw ccxt fetch_balance() result, refetched only when older than ttl.
+        """
+        with self._lock:
+            now = self.clock()
+            if self._balance is None or now - self._fetched_at > self.ttl:
+                start = time.perf_counter()
+                self._balance = self.exchange.fetch_balance()
+                if self.metrics is not None:
+                    self.metrics.observe('balance_fetch', time.perf_counter() - start)
+                self._fetched_at = now
+            return self._balance
+
+    def total(self, currency):
+        return float(self.balance()['total'].get(currency) or 0.0)
+
+    def free(self, currency):
+        return float(self.balance()['free'].get(currency) or 0.0)
+
+    def invalidate(self):
+        self._balance = None
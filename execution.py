@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import time
+
+import numpy as np
+
+from fill_rules import (bottom_threshold, fee_rate, fill_price, max_slippage, min_notional, net_pnl,  # noqa: F401
+                        qty_precision, risk_pct, size_order, slippage, stop_loss_pct, take_profit_pct)
+from profiling import OFF, add_arguments, from_args
+
+# --- CONFIGURATION PARAMETERS ---
+data_file = os.path.join('fetch_data', 'Results', 'NEAR_USDT_5m_full.csv')
+start_balance = 1000.0      # USDT
+complete_boxes = True       # No box from a day missing candles, like the live DailyBox
+
+# box_engine and trade_log (both load pandas) are imported inside the backtest functions.
+# The live bot's sizing and fill rules are in fill_rules.py. 'text' is trade_log.TEXT.
+TRADE_COLUMNS = {'Entry Time': 'datetime64[ns]', 'Exit Time': 'datetime64[ns]', 'Reason': 'text', 'Qty': float,
+                 'Entry': float, 'Exit': float, 'Fees': float, 'P&L': float, 'Balance': float}
+
+
+def apply_costs(trades, fee_rate=fee_rate, slippage=slippage, trade_size=1):
+    """
+    Re-prices a backtest_5m() trade list (LONG/SHORT, one unit) with slippage on both
+    fills and fees on both sides. Adds a 'Fees' column; 'P&L' becomes net.
+    """
+    out = trades.copy()
+    is_long = (out['Signal'] == 'LONG').values
+    entry = out['Entry'].values
+    exit_ = out['Exit'].values
+    out['Entry'] = np.where(is_long, entry * (1 + slippage), entry * (1 - slippage))
+    out['Exit'] = np.where(is_long, exit_ * (1 - slippage), exit_ * (1 + slippage))
+    out['Fees'] = fee_rate * (out['Entry'] + out['Exit']) * trade_size
+    gross = np.where(is_long, out['Exit'] - out['Entry'], out['Entry'] - out['Exit']) * trade_size
+    out['P&L'] = gross - out['Fees']
+    return out
+
+
+# --- EXITS ---
+def first_exit(open_, high, low, close, start, tp_price, sl_price, intrabar=True, chunk=256):
+    """
+    First bar from `start` on where a long hits its take profit or stop loss.
+    Returns (bar, reference exit price, reason); the last close when neither is hit.
+    intrabar=True checks high/low: a bar that opens past a level exits at its open, a bar
+    whose range holds both levels is assumed to hit the stop first. intrabar=False
+    checks closes only, like live_engine.py.
+    The scan looks at growing slices, so a whole backtest touches each bar about once.
+    """
+    n = len(close)
+    a = start
+    while a < n:
+        b = min(a + chunk, n)
+        if intrabar:
+            hit = (high[a:b] >= tp_price) | (low[a:b] <= sl_price)
+        else:
+            hit = (close[a:b] >= tp_price) | (close[a:b] <= sl_price)
+        if hit.any():
+            j = a + int(hit.argmax())
+            if not intrabar:
+                return j, close[j], 'Take Profit' if close[j] >= tp_price else 'Stop Loss'
+            if open_[j] >= tp_price:
+                return j, open_[j], 'Take Profit'
+            if open_[j] <= sl_price:
+                return j, open_[j], 'Stop Loss'
+            if low[j] <= sl_price:
+                return j, sl_price, 'Stop Loss'
+            return j, tp_price, 'Take Profit'
+        a = b
+        chunk *= 2
+    return n - 1, close[n - 1], 'End of Data'
+
+
+# --- SIMULATION ---
+def simulate_long(df, signal, balance=start_balance, risk_pct=risk_pct, stop_loss_pct=stop_loss_pct,
+                  take_profit_pct=take_profit_pct, fee_rate=fee_rate, slippage=slippage,
+                  precision=None, intrabar=True):
+    """
+    Trades the near_bot.py long on the bars where `signal` is True, one position at a time:
+    the market buy goes out after the signal candle closes (filled at its close plus
+    slippage), sized from the running balance. A signal is skipped when the order would
+    be under min_notional and aborted when the fill is more than max_slippage away from
+    the candle open the bot sized on (the live bot aborts after the fill, the simulator
+    does not buy). TP/SL are set from the fill price, exits pay slippage, both fills pay fees.
+    precision=None sizes with qty_precision() of the first close, fixed for the whole run.
+    Returns (trades DataFrame incl. skipped/aborted signals, final balance).
+    """
+    open_ = df['open'].values
+    high = df['high'].values
+    low = df['low'].values
+    close = df['close'].values
+    index = df.index.values
+    entries = np.flatnonzero(signal)
+    if precision is None and len(close):
+        precision = qty_precision(close[0])
+
+    from trade_log import TradeLog
+
+    trades = TradeLog(TRADE_COLUMNS)
+    k = 0
+    while k < len(entries):
+        e = entries[k]
+        o = open_[e]
+        qty = float(size_order(balance, o, risk_pct, stop_loss_pct, precision))
+        entry_price = fill_price(close[e], 'buy', slippage)
+        if qty * o < min_notional or abs(entry_price - o) / o > max_slippage:
+            reason = 'Skipped (Too Small)' if qty * o < min_notional else 'Aborted (Slippage)'
+            trades.append(**{'Entry Time': index[e], 'Exit Time': index[e], 'Reason': reason, 'Qty': 0.0,
+                             'Entry': o, 'Exit': o, 'Fees': 0.0, 'P&L': 0.0, 'Balance': balance})
+            k += 1
+        else:
+            tp_price = entry_price * (1 + take_profit_pct)
+            sl_price = entry_price * (1 - stop_loss_pct)
+            x, ref, reason = first_exit(open_, high, low, close, e + 1, tp_price, sl_price, intrabar)
+            exit_price = fill_price(ref, 'sell', slippage)
+            pnl = net_pnl(entry_price, exit_price, qty, fee_rate)
+            balance += pnl
+            trades.append(**{'Entry Time': index[e], 'Exit Time': index[x], 'Reason': reason, 'Qty': qty,
+                             'Entry': entry_price, 'Exit': exit_price,
+                             'Fees': fee_rate * (entry_price + exit_price) * qty, 'P&L': pnl, 'Balance': balance})
+            # The exit candle is checked for entries while the position is still open
+            k = np.searchsorted(entries, x, side='right')
+
+    return trades.frame(), balance
+
+
+def near_bot_signal(boxed, bottom_threshold=bottom_threshold):
+    """
+    near_bot.py entry: candle opened in the bottom `bottom_threshold` of the previous-day
+    box and closed green. `boxed` is a box_frame() result.
+    """
+    o = boxed['open'].values
+    entry_zone = boxed['low_box'].values + bottom_threshold * (boxed['high_box'].values - boxed['low_box'].values)
+    return (o <= entry_zone) & (boxed['close'].values > o)
+
+
+def backtest_near_bot(df, bottom_threshold=bottom_threshold, complete=complete_boxes, profiler=OFF, **kwargs):
+    """
+    Backtests the live bot's rules on 5m candles (previous-day box, see box_frame()).
+    Keyword arguments go to simulate_long().
+    """
+    from box_engine import box_frame
+
+    with profiler.stage('box'):
+        boxed = box_frame(df, complete=complete)
+        signal = near_bot_signal(boxed, bottom_threshold)
+    with profiler.stage('simulate', hot=True):
+        return simulate_long(boxed, signal, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="near_bot.py rules with fees, slippage and TP/SL fills")
+    parser.add_argument('--data', default=data_file)
+    parser.add_argument('--balance', type=float, default=start_balance)
+    parser.add_argument('--fee', type=float, default=fee_rate)
+    parser.add_argument('--slippage', type=float, default=slippage)
+    parser.add_argument('--exits', choices=['intrabar', 'close'], default='intrabar',
+                        help="TP/SL from candle high/low, or from closes like the live bot")
+    parser.add_argument('--output', default=os.path.join('Results', 'execution_trades.csv'),
+                        help="CSV, or a binary column store when the name ends in .trades")
+    add_arguments(parser)
+    args = parser.parse_args()
+    profiler = from_args(args)
+
+    with profiler.stage('import'):
+        from box_engine import load_candles
+        from trade_log import save_trades
+
+    with profiler.stage('load'):
+        df = load_candles(args.data)
+    start = time.perf_counter()
+    trades, balance = backtest_near_bot(df, balance=args.balance, fee_rate=args.fee, slippage=args.slippage,
+                                        intrabar=args.exits == 'intrabar', profiler=profiler)
+    elapsed = time.perf_counter() - start
+
+    filled = trades[trades['Qty'] > 0]
+    print(f"📊 {len(trades)} signals over {len(df)} candles in {elapsed * 1000:.1f}ms\n")
+    print(trades['Reason'].value_counts().to_string())
+    print(f"\nFees: {filled['Fees'].sum():.2f} USDT | Net P&L: {filled['P&L'].sum():.2f} USDT | "
+          f"Balance: {args.balance:.2f} -> {balance:.2f} USDT")
+
+    with profiler.stage('save'):
+        save_trades(trades, args.output)
+    print(f"\n✅ Saved trades to {args.output}")
+    profiler.finish(args.profile_output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+import os
+import time
+
+import ccxt
+import ccxt.async_support as ccxt_async
+
+from ohlcv_store import (append_candles, gap_pages, last_timestamp, limit, merge_gaps, missing_ranges, new_candles,
+                         read_store, store_path, stored_symbols)
+
+# === CONFIG ===
+timeframe = '5m'
+lookback_days = 14          # Only used the first time a symbol is stored
+weight_per_minute = 2400    # Binance allows 6000/min per IP, keep headroom for the bot
+request_weight = 2          # klines weight for 101-500 candles
+max_in_flight = 8           # Concurrent HTTP requests across all symbols
+retries = 5
+backoff = 1.0               # Seconds, doubled after every failed attempt
+
+
+# === SHARED RATE-LIMIT BUDGET ===
+class RateBudget:
+    """
+    Token bucket shared by every symbol and page of a run.
+    acquire() waits until the request weight fits in the budget; pause() stops all
+    requests for a while after the exchange reports a rate-limit hit.
+    """
+
+    def __init__(self, weight_per_minute=weight_per_minute, burst=None, max_in_flight=max_in_flight):
+        self.rate = weight_per_minute / 60
+        self.capacity = burst or max(request_weight, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+        self.slots = asyncio.Semaphore(max_in_flight)
+
+    async def acquire(self, weight=request_weight):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                await asyncio.sleep((weight - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+# === FETCHING ===
+async def fetch_page(exchange, budget, symbol, timeframe, since):
+    """
+    One fetch_ohlcv() call under the shared budget, retried with exponential backoff on
+    network and rate-limit errors. Other errors (bad symbol, auth) are raised at once.
+    """
+    for attempt in range(retries + 1):
+        async with budget.slots:
+            await budget.acquire()
+            try:
+                return await exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+            except ccxt.NetworkError as e:
+                if attempt == retries:
+                    raise
+                delay = backoff * 2 ** attempt
+                if isinstance(e, ccxt.DDoSProtection):
+                    budget.pause(delay)   # RateLimitExceeded: every task backs off
+                print(f"⚠️ {symbol} @ {since}: {type(e).__name__}, retry {attempt + 1}/{retries} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+async def update_symbol(exchange, budget, symbol, timeframe, lookback_days=lookback_days, path=None):
+    """
+    Async counterpart of ohlcv_store.update_symbol(). The missing window is split into
+    limit-sized pages that are all requested at once; pages are appended in time order
+    as soon as every earlier page is in, so a failure keeps the contiguous prefix and
+    the next run resumes after it. Returns the number of new candles.
+    """
+    path = path or store_path(symbol, timeframe)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    now = exchange.milliseconds()
+
+    last = last_timestamp(path)
+    since = last + tf_ms if last is not None else now - lookback_days * 24 * 60 * 60 * 1000
+    starts = range(since, now - tf_ms + 1, limit * tf_ms)
+    pages = [asyncio.ensure_future(fetch_page(exchange, budget, symbol, timeframe, s)) for s in starts]
+
+    added = 0
+    try:
+        for page in pages:
+            rows = new_candles(await page, last, now, tf_ms)
+            if rows:
+                append_candles(path, rows)
+                last = rows[-1][0]
+                added += len(rows)
+    finally:
+        for page in pages:
+            page.cancel()
+    return added
+
+
+async def repair_symbol(exchange, budget, symbol, timeframe, path=None):
+    """
+    Async counterpart of ohlcv_store.repair_store(): the pages covering the store's gaps
+    are requested at once, then merged in one rewrite. Returns the same dict.
+    """
+    path = path or store_path(symbol, timeframe)
+    if not os.path.exists(path):
+        return {'duplicates': 0, 'unsorted': 0, 'filled': 0, 'missing': 0}
+    last_timestamp(path)        # Cuts a torn last line
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    df, duplicates, unsorted = read_store(path)
+    ranges = missing_ranges(df['timestamp'].values, tf_ms)
+    pages = await asyncio.gather(*(fetch_page(exchange, budget, symbol, timeframe, s)
+                                   for s in gap_pages(ranges, tf_ms)))
+    filled, missing = merge_gaps(path, df, ranges, pages, tf_ms, dirty=bool(duplicates or unsorted))
+    return {'duplicates': duplicates, 'unsorted': unsorted, 'filled': filled, 'missing': missing}
+
+
+async def update_all(exchange, symbols, timeframe=timeframe, budget=None, lookback_days=lookback_days, root=None):
+    """
+    Updates every symbol concurrently under one budget.
+    Returns {symbol: new candles or the exception that stopped it}.
+    """
+    budget = budget or RateBudget()
+    paths = [store_path(s, timeframe, root) if root else None for s in symbols]
+    results = await asyncio.gather(
+        *(update_symbol(exchange, budget, s, timeframe, lookback_days, p) for s, p in zip(symbols, paths)),
+        return_exceptions=True,
+    )
+    return dict(zip(symbols, results))
+
+
+async def repair_all(exchange, symbols, timeframe=timeframe, budget=None, root=None):
+    """
+    Refetches the gaps of every store concurrently under one budget.
+    Returns {symbol: repair_symbol() dict or the exception that stopped it}.
+    """
+    budget = budget or RateBudget()
+    paths = [store_path(s, timeframe, root) if root else None for s in symbols]
+    results = await asyncio.gather(
+        *(repair_symbol(exchange, budget, s, timeframe, p) for s, p in zip(symbols, paths)),
+        return_exceptions=True,
+    )
+    return dict(zip(symbols, results))
+
+
+async def run(symbols, timeframe, repair=False):
+    exchange = ccxt_async.binance({'enableRateLimit': False})  # RateBudget does the throttling
+    try:
+        budget = RateBudget()
+        results = await update_all(exchange, symbols, timeframe, budget)
+        return results, (await repair_all(exchange, symbols, timeframe, budget) if repair else {})
+    finally:
+        await exchange.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh many OHLCV stores concurrently")
+    parser.add_argument('symbols', nargs='*', help="pairs like BTC/USDT (default: every stored pair)")
+    parser.add_argument('--timeframe', default=timeframe)
+    parser.add_argument('--repair', action='store_true', help="also refetch gaps and drop duplicate candles")
+    args = parser.parse_args()
+
+    symbols = args.symbols or stored_symbols(args.timeframe)
+    print(f"📥 Updating {len(symbols)} symbols ({args.timeframe})...")
+    start = time.perf_counter()
+    results, repairs = asyncio.run(run(symbols, args.timeframe, args.repair))
+    for symbol, added in results.items():
+        if isinstance(added, Exception):
+            print(f"❌ {symbol}: {added} (progress kept, rerun to resume)")
+        else:
+            print(f"✅ {symbol}: {added} new candles")
+    for symbol, fixed in repairs.items():
+        if isinstance(fixed, Exception):
+            print(f"❌ {symbol} repair: {fixed} (rerun to refetch the rest)")
+        elif fixed['missing']:
+            print(f"⚠️ {symbol}: {fixed['filled']} candles refilled, {fixed['duplicates']} duplicates dropped, "
+                  f"{fixed['missing']} missing on the exchange too")
+        elif fixed['filled'] or fixed['duplicates'] or fixed['unsorted']:
+            print(f"✅ {symbol}: {fixed['filled']} candles refilled, {fixed['duplicates']} duplicates dropped")
+    print(f"\nDone in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
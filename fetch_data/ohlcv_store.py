@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# The duplicate and gap rules are shared with load_candles() (candle_check.py, repo root)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from candle_check import dedupe, missing_ranges  # noqa: E402
+
+# --- CONSTANTS ---
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Results')
+limit = 500                 # Binance max candles per fetch_ohlcv() call
+
+
+def store_path(symbol, timeframe, root=STORE_DIR):
+    """
+    'BTC/USDT', '5m' -> '<root>/BTC_USDT_5m_full.csv' (the layout run_universe.py reads).
+    """
+    return os.path.join(root, f"{symbol.replace('/', '_')}_{timeframe}_full.csv")
+
+
+# --- READING THE STORE ---
+def _repair_tail(path):
+    """
+    Cuts a half-written last line (interrupted append) so the file ends on a full row.
+    """
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return
+        f.seek(max(0, size - 4096))
+        tail = f.read()
+        if tail.endswith(b'\n'):
+            return
+        cut = tail.rfind(b'\n')
+        f.truncate(size - len(tail) + cut + 1 if cut >= 0 else 0)
+
+
+def last_timestamp(path):
+    """
+    Returns the int64 ms timestamp of the last stored candle, or None for a missing/empty store.
+    Only the tail of the file is read, so this stays cheap on long histories.
+    """
+    if not os.path.exists(path):
+        return None
+    _repair_tail(path)
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        lines = f.read().splitlines()
+    if not lines:
+        return None
+    field = lines[-1].split(b',', 1)[0].decode()
+    if field == 'timestamp':
+        return None
+    return int(pd.Timestamp(field).value // 1_000_000)
+
+
+# --- WRITING THE STORE ---
+def append_candles(path, ohlcv):
+    """
+    Appends ccxt candles in the fetch_data CSV layout (stringified UTC 'timestamp').
+    The rows are rendered first and written with one write + fsync, so an interrupted
+    run leaves at most one partial line, which last_timestamp() cuts on the next run.
+    """
+    df = pd.DataFrame(ohlcv, columns=CANDLE_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    text = df.to_csv(index=False, header=new_file)
+    with open(path, 'a', newline='') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def stored_symbols(timeframe, root=STORE_DIR):
+    """
+    Lists the symbols that already have a store for this timeframe in root.
+    """
+    suffix = f"_{timeframe}_full.csv"
+    if not os.path.isdir(root):
+        return []
+    symbols = []
+    for name in sorted(os.listdir(root)):
+        base, _, quote = name[:-len(suffix)].rpartition('_')
+        if name.endswith(suffix) and base:
+            symbols.append(f"{base}/{quote}")
+    return symbols
+
+
+def new_candles(data, last, now, tf_ms):
+    """
+    Returns the candles of a fetched page that belong after the stored tail: sorted,
+    deduped by timestamp, newer than `last` and already closed at `now`.
+    """
+    floor = last if last is not None else -1
+    fresh = {}
+    for candle in data:
+        if floor < candle[0] and candle[0] + tf_ms <= now:
+            fresh[candle[0]] = candle
+    return [fresh[ts] for ts in sorted(fresh)]
+
+
+def update_symbol(exchange, symbol, timeframe, lookback_days=14, path=None):
+    """
+    Brings one symbol/timeframe store up to date and returns the number of new candles.
+    Fetching starts one candle after the last stored timestamp (or lookback_days ago for
+    a new store). Candles at or before the stored tail are dropped, so overlapping pages
+    never double-count, and the still-forming candle is never stored.
+    Each page is persisted as soon as it arrives, so an interrupted run resumes from the
+    last page written.
+    """
+    path = path or store_path(symbol, timeframe)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    now = exchange.milliseconds()
+
+    last = last_timestamp(path)
+    since = last + tf_ms if last is not None else now - lookback_days * 24 * 60 * 60 * 1000
+    added = 0
+
+    while since + tf_ms <= now:
+        print(f"Fetching {symbol} from: {datetime.utcfromtimestamp(since / 1000)}")
+        try:
+            data = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+        except Exception as e:
+            print(f"❌ Error: {e} (progress kept, rerun to resume)")
+            break
+        if not data:
+            break
+
+        rows = new_candles(data, last, now, tf_ms)
+        if rows:
+            append_candles(path, rows)
+            last = rows[-1][0]
+            added += len(rows)
+
+        next_since = data[-1][0] + tf_ms
+        if next_since <= since:
+            break
+        since = next_since
+        time.sleep(exchange.rateLimit / 1000)
+
+    return added
+
+
+# --- REPAIRING THE STORE ---
+def read_store(path):
+    """
+    Loads a store as a DataFrame with int64 ms timestamps, sorted, one row per timestamp
+    (candle_check.dedupe(): the last stored one). Returns (frame, duplicate rows dropped,
+    rows out of order).
+    """
+    df = pd.read_csv(path)
+    ts = pd.to_datetime(df['timestamp']).values.astype('datetime64[ms]').astype('int64')
+    df['timestamp'] = ts
+    unsorted = int((np.diff(ts) < 0).sum())
+    df = dedupe(df).reset_index(drop=True)
+    return df, len(ts) - len(df), unsorted
+
+
+def gap_pages(ranges, tf_ms):
+    """
+    `since` of every limit-sized fetch_ohlcv() page needed to cover the missing windows
+    (the (since, until) arrays of candle_check.missing_ranges()).
+    """
+    return [since for lo, hi in zip(*(r.tolist() for r in ranges)) for since in range(lo, hi, limit * tf_ms)]
+
+
+def merge_gaps(path, df, ranges, pages, tf_ms, dirty=False):
+    """
+    Adds the candles of the fetched `pages` that fall inside the missing `ranges`
+    (candle_check.missing_ranges()) to the read_store() frame and rewrites the store in
+    time order (temp file + rename) when candles were added or `dirty` (duplicates or
+    unsorted rows were dropped).
+    Returns (candles filled, candles still missing, e.g. exchange downtime).
+    """
+    lo, hi = ranges
+    fetched = pd.DataFrame([c for page in pages for c in page], columns=CANDLE_COLUMNS)
+    ts = fetched['timestamp'].values.astype(np.int64)
+    slot = np.searchsorted(lo, ts, side='right') - 1
+    inside = (slot >= 0) & (ts < hi[np.maximum(slot, 0)]) if len(lo) else np.zeros(len(ts), dtype=bool)
+    fill = dedupe(fetched[inside])
+    still_missing = int(((hi - lo) // tf_ms).sum()) - len(fill) if len(lo) else 0
+
+    if len(fill) or dirty:
+        out = pd.concat([df, fill], ignore_index=True).sort_values('timestamp', kind='stable')
+        out['timestamp'] = pd.to_datetime(out['timestamp'], unit='ms')
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', newline='') as f:
+            f.write(out.to_csv(index=False))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    return len(fill), still_missing
+
+
+def repair_store(exchange, symbol, timeframe, path=None):
+    """
+    Refetches only the candles missing inside a store (gaps left by a fetch loop that
+    stopped on an error), drops duplicate timestamps and restores time order.
+    Returns a dict with the duplicates and unsorted rows found, the candles filled and
+    the candles still missing (windows the exchange has no candles for).
+    """
+    path = path or store_path(symbol, timeframe)
+    if not os.path.exists(path):
+        return {'duplicates': 0, 'unsorted': 0, 'filled': 0, 'missing': 0}
+    _repair_tail(path)
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    df, duplicates, unsorted = read_store(path)
+    ranges = missing_ranges(df['timestamp'].values, tf_ms)
+
+    pages = []
+    for since in gap_pages(ranges, tf_ms):
+        print(f"Refetching {symbol} gap from: {datetime.utcfromtimestamp(since / 1000)}")
+        try:
+            pages.append(exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit))
+        except Exception as e:
+            print(f"❌ Error: {e} (rerun to refetch the rest)")
+            break
+        time.sleep(exchange.rateLimit / 1000)
+
+    filled, missing = merge_gaps(path, df, ranges, pages, tf_ms, dirty=bool(duplicates or unsorted))
+    return {'duplicates': duplicates, 'unsorted': unsorted, 'filled': filled, 'missing': missing}
@@ -0,0 +1,55 @@
+"""
+near_bot.py's sizing and fill rules: pure Python, so near_bot.py starts without
+importing numpy. live_engine.py uses them directly; execution.py re-exports them for
+the backtests.
+"""
+import math
+
+# --- LIVE BOT RULES (near_bot.py settings) ---
+risk_pct = 0.01
+stop_loss_pct = 0.005
+take_profit_pct = 0.01
+bottom_threshold = 0.1
+max_affordable = 0.98       # Never spend more than 98% of the USDT balance
+min_notional = 10           # Binance minimum notional is ~$5 for many pairs
+max_slippage = 0.01
+
+# --- FILL MODEL ---
+fee_rate = 0.001            # Binance spot taker fee per side
+slippage = 0.0005           # Market order fill vs. the last price
+
+
+def qty_precision(price):
+    """
+    Order quantity decimals a ~10 USDT order needs at `price` (BTC 5, NEAR 1, PEPE 0),
+    for backtests and the simulated exchange, which have no market metadata.
+    """
+    return max(0, math.ceil(math.log10(price)))
+
+
+def size_order(balance, price, risk_pct=risk_pct, stop_loss_pct=stop_loss_pct, precision=None):
+    """
+    near_bot.py sizing: risk `risk_pct` of the balance down to the stop, capped at 98% of
+    the balance, rounded to the exchange precision (half to even, like numpy.round).
+    precision=None takes qty_precision(price).
+    """
+    if precision is None:
+        precision = qty_precision(price)
+    raw_qty = balance * risk_pct / (price * stop_loss_pct)
+    max_qty_affordable = balance * max_affordable / price
+    scale = 10 ** precision
+    return round(min(raw_qty, max_qty_affordable) * scale) / scale
+
+
+def fill_price(price, side, slippage=slippage):
+    """
+    Price a market order is filled at when the last price is `price`.
+    """
+    return price * (1 + slippage) if side == 'buy' else price * (1 - slippage)
+
+
+def net_pnl(entry, exit_, qty, fee_rate=fee_rate):
+    """
+    P&L of a long after paying `fee_rate` on both fills.
+    """
+    return (exit_ - entry) * qty - fee_rate * (entry + exit_) * qty
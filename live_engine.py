@@ -0,0 +1,420 @@
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from daily_box import DAY_MS, DailyBox
+from exchange_state import ExchangeSnapshot
+from fill_rules import (bottom_threshold, fill_price, max_slippage, min_notional, net_pnl, risk_pct,
+                        size_order, stop_loss_pct, take_profit_pct)
+from metrics import Metrics
+
+# === DEFAULTS (sizing and fill rules live in fill_rules.py) ===
+min_exit_gain = 1           # USDT
+
+
+class SymbolTrader:
+    """
+    near_bot.py's strategy for one pair: previous-day box, long entry in the bottom of
+    the box on a green candle, TP/SL exit on candle closes.
+    All exchange access goes through the engine's shared client and account snapshot.
+    """
+
+    def __init__(self, engine, symbol, tagged=False):
+        self.engine = engine
+        self.symbol = symbol
+        # Log lines name the pair only when several share the log, so a single-symbol
+        # run writes near_bot.py's logs.txt lines unchanged (replay.py diffs against them)
+        self.tag = f"{symbol} " if tagged else ''
+        self.base, self.quote = symbol.split('/')
+        market = engine.exchange.markets[symbol]
+        self.qty_precision = market['precision']['amount']
+        # Exchange minimum order value when the market metadata has one, never below our own
+        self.min_notional = max(min_notional, ((market.get('limits') or {}).get('cost') or {}).get('min') or 0)
+        self.box = DailyBox()  # previous-day high/low, updated with every closed candle
+        self.open_position = None  # or dict with entry_price, qty, entry_time
+
+    # --- DATA ---
+    def fetch_5m_ohlcv(self):
+        # Closed candles since yesterday 00:00 UTC (at most 576, one request)
+        exchange = self.engine.exchange
+        now = exchange.milliseconds()
+        since = (now // DAY_MS - 1) * DAY_MS
+        with self.engine.metrics.span('candle_fetch'):
+            ohlcv = exchange.fetch_ohlcv(self.symbol, self.engine.timeframe, since=since, limit=1000)
+        return [c for c in ohlcv if c[0] + self.engine.tf_ms <= now]
+
+    def seed_box(self):
+        # One history fetch at startup, the feed keeps the box current afterwards
+        for candle in self.fetch_5m_ohlcv():
+            self.box.update(candle)
+
+    def get_balance(self):
+        return self.engine.account.total(self.quote)
+
+    def set_position(self, position, reason):
+        """
+        Changes the open position and journals it (when the engine has a journal)
+        before the tick goes on.
+        """
+        self.open_position = position
+        if self.engine.journal is not None:
+            self.engine.journal.record(self.symbol, position, reason)
+
+    # --- ORDERS ---
+    def place_market_order(self, qty, simulated_price, last_price=None):
+        engine = self.engine
+        try:
+            if engine.dry_run:
+                # fill_rules.py fill model: the last close plus slippage
+                entry_price = fill_price(last_price or simulated_price, 'buy')
+                print(f"[SIMULATION] Buying {qty} {self.base} @ {entry_price:.4f} {self.quote} (Dry Run)")
+            else:
+                print(f"[TRADE] Executing LIVE BUY for {qty} {self.base}")
+                with engine.metrics.span('order_buy'):
+                    order = engine.exchange.create_market_buy_order(self.symbol, qty)
+                engine.metrics.count('orders')
+                engine.account.invalidate()
+                entry_price = float(order['average'] or order['price'])
+            slippage = abs(entry_price - simulated_price) / simulated_price
+            if slippage > max_slippage:
+                msg = f"❌ {self.tag}Trade Aborted — Slippage too high: {slippage * 100:.2f}%"
+                print(msg)
+                logging.warning(msg)
+                engine.notify("❌ Trade Aborted (Slippage)", msg)
+                return None
+            usdt_balance = self.get_balance()
+
+            log_message = (
+                f"{'[SIMULATED] BUY' if engine.dry_run else 'BUY executed'} — "
+                f"Qty: {qty} {self.base} @ {entry_price:.4f} {self.quote} | "
+                f"Balance: {usdt_balance:.2f} {self.quote}"
+            )
+            print(log_message)
+            logging.info(log_message)
+            return entry_price
+        except Exception as e:
+            engine.metrics.count('api_errors')
+            print(f"⚠️ Error placing order: {e}")
+            logging.error(f"{self.tag}Order failed — {e}")
+
+    # --- CANDLE HANDLING ---
+    def on_candle(self, candle, queued=None):
+        """
+        Handles one closed candle: box update, entry check, then exit check.
+        `queued` is the perf_counter() at submit, for the queue wait metric.
+        """
+        engine = self.engine
+        metrics = engine.metrics
+        if queued is not None:
+            metrics.observe('queue_wait', time.perf_counter() - queued)
+        # How long after its close the candle reached us (exchange clock)
+        metrics.observe('candle_delay', max(0, engine.exchange.milliseconds() - candle[0] - engine.tf_ms) / 1000)
+        metrics.count('ticks')
+        with metrics.span('tick'):
+            with metrics.span('box_update'):
+                self.box.update(candle)
+            self.check_entry(candle)
+            self.check_exit(candle)
+
+    def check_entry(self, candle):
+        """
+        Opens a position when the closed candle opened in the entry zone and closed higher.
+        """
+        engine = self.engine
+        try:
+            if not self.box.ready:
+                print(f"⏳ {self.symbol}: no complete previous UTC day yet, waiting for the box.")
+                return
+            prev_high, prev_low = self.box.high, self.box.low
+
+            usdt_balance = self.get_balance()
+            print(f"💰 Current Balance: {usdt_balance:.2f} {self.quote}")
+            ts, o, h, l, c, v = candle
+            print(f"📊 {self.symbol} {datetime.utcfromtimestamp(ts/1000)} - Open: {o}, Close: {c}")
+
+            # Calculate entry zone and market context
+            box_range = prev_high - prev_low
+            entry_zone = prev_low + engine.bottom_threshold * box_range
+
+            print(f"\n--- MARKET CONTEXT ({self.symbol}) ---")
+            print(f"Time: {datetime.utcfromtimestamp(ts/1000)}")
+            print(f"Box High: {prev_high:.3f}, Box Low: {prev_low:.3f}")
+            print(f"Entry Zone Threshold: <= {entry_zone:.3f}")
+            print(f"Candle - Open: {o:.3f}, Close: {c:.3f}")
+            print("-----------------------")
+
+            # Show simulated P&L only during dry runs
+            if engine.dry_run and self.open_position:
+                entry_price = self.open_position['entry_price']
+                qty = self.open_position['qty']
+                pnl = (c - entry_price) * qty
+                print(f"📈 Simulated P&L: {pnl:.2f} {self.quote} since entry @ {entry_price:.4f}")
+
+            # Evaluate entry conditions only if no current position
+            if not self.open_position and o <= entry_zone and c > o:
+                engine.metrics.count('signals')
+                # Sizing and ordering read and spend the shared balance, one symbol at a time
+                with engine.order_lock:
+                    self.enter(candle, prev_high, prev_low, entry_zone)
+
+            else:
+                reason = "❌ No valid signal."
+                if o > entry_zone:
+                    reason += f" (Open {o:.3f} > Entry Zone {entry_zone:.3f})"
+                elif c <= o:
+                    reason += f" (Close {c:.3f} <= Open {o:.3f})"
+
+                print(reason)
+                engine.metrics.count('rejects')
+                logging.info(
+                    f"REJECTED — {self.tag}{datetime.utcfromtimestamp(ts/1000)} | Open: {o:.3f}, Close: {c:.3f}, Entry Zone: <= {entry_zone:.3f} | Reason: {reason}"
+                )
+
+        except Exception as e:
+            engine.metrics.count('api_errors')
+            print(f"⚠️ Error: {e}")
+            engine.notify("⚠️ Bot Error", f"{self.symbol}: {e}")
+
+    def enter(self, candle, prev_high, prev_low, entry_zone):
+        engine = self.engine
+        ts, o, h, l, c, v = candle
+        usdt_balance = self.get_balance()
+        risk_amount = usdt_balance * engine.risk_pct
+
+        # Risk-based size capped at 98% of the balance (same rule as the backtests)
+        qty = float(size_order(usdt_balance, o, engine.risk_pct, engine.stop_loss_pct, self.qty_precision))
+
+        # Abort if quantity is too low to be traded
+        if qty * o < self.min_notional:
+            message = (
+                f"❌ Order Skipped — Qty too low: {qty} {self.base} @ {o:.4f} {self.quote}\n"
+                f"Total Value: {qty * o:.2f} {self.quote}"
+            )
+            print(message)
+            logging.warning(message)
+            engine.notify("❌ Order Skipped (Too Small)", message)
+            return
+
+        print(f"\n✅ Entry signal detected on {self.symbol}!")
+        print(f"💰 Balance: {usdt_balance:.2f} {self.quote}")
+        print(f"🎯 Risk: {risk_amount:.2f}, Qty: {qty} {self.base}")
+
+        summary = (
+            f"--- {self.tag}TRADE SUMMARY ---\n"
+            f"Time: {datetime.utcfromtimestamp(ts/1000)}\n"
+            f"Box High: {prev_high:.3f}, Box Low: {prev_low:.3f}, Entry Zone: <= {entry_zone:.3f}\n"
+            f"Candle - Open: {o:.3f}, Close: {c:.3f}\n"
+            f"Risk: {risk_amount:.2f}, Qty: {qty} {self.base}\n"
+            f"Simulated Price: {o:.4f}\n"
+            f"----------------------"
+        )
+
+        print(summary)
+        logging.info(summary)
+
+        entry_price = self.place_market_order(qty, o, c)
+
+        # Journal the position, then alert: never in front of the order
+        if entry_price:
+            self.set_position({
+                'entry_price': entry_price,
+                'qty': qty,
+                'entry_time': datetime.utcfromtimestamp(ts/1000)
+            }, 'buy')
+            engine.notify("📈 Trade Executed", summary)
+
+    def check_exit(self, candle):
+        """
+        Take Profit / Stop Loss check of the open position against a closed candle.
+        """
+        engine = self.engine
+        ts, o, h, l, c, v = candle
+
+        # === CHECK FOR EXIT (Take Profit or Stop Loss) ===
+        if self.open_position:
+            entry_price = self.open_position['entry_price']
+            qty = self.open_position['qty']
+            entry_time = self.open_position['entry_time']
+
+            # Floor quantity to exchange precision
+            qty = math.floor(qty * (10 ** self.qty_precision)) / (10 ** self.qty_precision)
+
+            tp_price = entry_price * (1 + engine.take_profit_pct)
+            sl_price = entry_price * (1 - engine.stop_loss_pct)
+
+            # Estimate potential gain
+            potential_gain = abs(tp_price - entry_price) * qty
+            if potential_gain < min_exit_gain:
+                msg = f"❌ {self.tag}Exit Skipped — Potential gain ({potential_gain:.2f} {self.quote}) is below threshold."
+                print(msg)
+                logging.info(msg)
+                engine.notify("❌ Exit Skipped (Low Gain)", msg)
+                return
+
+            if c >= tp_price or c <= sl_price:
+                exit_reason = "🎯 Take Profit" if c >= tp_price else "🛑 Stop Loss"
+                free_base = 0.0
+
+                try:
+                    notional = qty * c
+                    if notional < self.min_notional:
+                        msg = f"❌ {self.tag}Sell Skipped — Notional value too low: {notional:.2f} {self.quote}"
+                        print(msg)
+                        logging.warning(msg)
+                        engine.notify("❌ Sell Skipped (Below Min Notional)", msg)
+                        return
+
+                    if engine.dry_run:
+                        exit_price = fill_price(c, 'sell')
+                        print(f"[SIMULATION] Selling {qty:.6f} {self.base} @ {exit_price:.4f} (Dry Run)")
+                    else:
+                        # Current free balance of the base asset
+                        free_base = engine.account.free(self.base)
+                        print(f"✅ Free {self.base} before sell: {free_base:.6f}, Attempting to sell: {qty:.6f}")
+                        logging.info(f"✅ Free {self.base} before sell: {free_base:.6f}, Attempting to sell: {qty:.6f}")
+
+                        print(f"🧪 Attempting to sell {qty:.6f} {self.base} @ {c:.4f}")
+                        with engine.metrics.span('order_sell'):
+                            order = engine.exchange.create_market_sell_order(self.symbol, qty)
+                        engine.metrics.count('orders')
+                        engine.account.invalidate()
+                        exit_price = float(order['average'] or order['price'])
+                    # After the taker fee on both fills
+                    pnl = net_pnl(entry_price, exit_price, qty)
+                    pnl_pct = ((exit_price - entry_price) / entry_price) * 100
+
+                    message = (
+                        f"--- {self.tag}TRADE CLOSED ---\n"
+                        f"{exit_reason}\n"
+                        f"Entry: {entry_price:.4f}, Exit: {exit_price:.4f}, Qty: {qty}\n"
+                        f"Realized P&L: {pnl:.2f} {self.quote} ({pnl_pct:.2f}%)\n"
+                        f"Entry Time: {entry_time}, Exit Time: {datetime.utcfromtimestamp(ts/1000)}\n"
+                        f"---------------------"
+                    )
+
+                    print(message)
+                    logging.info(message)
+                    engine.notify(exit_reason, message)
+
+                except Exception as e:
+                    engine.metrics.count('api_errors')
+                    error_msg = (
+                        f"⚠️ Failed to close {self.tag}position: {e}\n"
+                        f"Free {self.base}: {free_base:.6f}, Required Qty: {qty:.6f}"
+                    )
+                    print(error_msg)
+                    logging.error(error_msg)
+                    engine.notify("❌ Sell Failed", error_msg)
+                finally:
+                    self.set_position(None, exit_reason)
+
+
+class LiveEngine:
+    """
+    Trades many symbols from one process: one exchange client, one load_markets(),
+    one account snapshot and one SymbolTrader per pair.
+    Each symbol has its own single-thread queue, so its candles are handled in order
+    while the REST round trips of one pair never delay the others.
+    Every phase of a tick is timed into `metrics` (see metrics.py).
+    With a `journal` (position_journal.PositionJournal) open positions survive restarts:
+    they are restored here and checked against the exchange balances in seed().
+    """
+
+    def __init__(self, exchange, symbols, timeframe='5m', notify=None, dry_run=False,
+                 risk_pct=risk_pct, stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct,
+                 bottom_threshold=bottom_threshold, metrics=None, journal=None):
+        self.exchange = exchange
+        self.timeframe = timeframe
+        self.tf_ms = exchange.parse_timeframe(timeframe) * 1000
+        self._notify = notify or (lambda subject, body: None)
+        self.metrics = metrics or Metrics()
+        self.dry_run = dry_run
+        self.risk_pct = risk_pct
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+        self.bottom_threshold = bottom_threshold
+
+        if not exchange.markets:
+            exchange.load_markets()
+        # One fetch_balance() per tick, refreshed after our fills
+        self.account = ExchangeSnapshot(exchange, metrics=self.metrics)
+        self.order_lock = threading.Lock()
+        self.traders = {s: SymbolTrader(self, s, tagged=len(symbols) > 1) for s in symbols}
+        self.journal = journal
+        if journal is not None:
+            for symbol, trader in self.traders.items():
+                trader.open_position = journal.positions.get(symbol)
+        self.queues = {s: ThreadPoolExecutor(max_workers=1, thread_name_prefix=s.replace('/', '')) for s in symbols}
+
+    def notify(self, subject, body):
+        with self.metrics.span('notify'):
+            self._notify(subject, body)
+
+    def seed(self):
+        """
+        Seeds every trader's box (one history request per symbol, run concurrently).
+        """
+        futures = [self.queues[s].submit(t.seed_box) for s, t in self.traders.items() if t.box.day is None]
+        for future in futures:
+            future.result()
+        if self.journal is not None and not self.dry_run:
+            self.reconcile()
+
+    def reconcile(self):
+        """
+        Checks the restored positions against the exchange balances (one fetch_balance()
+        for every symbol). A position whose coins are gone (sold by hand, or the bot died
+        between its sell and the journal write) is dropped; one with fewer coins than
+        journaled is shrunk to what is held.
+        """
+        for symbol, trader in self.traders.items():
+            position = trader.open_position
+            if not position:
+                continue
+            held = self.account.total(trader.base)
+            if held * position['entry_price'] < trader.min_notional:
+                reason = "closed outside the bot"
+                trader.set_position(None, f"reconciled: {reason}")
+            elif held < position['qty']:
+                qty = math.floor(held * 10 ** trader.qty_precision) / 10 ** trader.qty_precision
+                reason = f"qty {position['qty']} -> {qty} {trader.base}"
+                trader.set_position({**position, 'qty': qty}, f"reconciled: {reason}")
+            else:
+                print(f"✅ Restored {symbol} position: {position['qty']} {trader.base} @ {position['entry_price']:.4f}")
+                continue
+            message = f"⚠️ {symbol} journaled position reconciled with the exchange: {reason} (held {held} {trader.base})"
+            print(message)
+            logging.warning(message)
+            self.notify("⚠️ Position Reconciled", message)
+
+    def submit(self, symbol, candle):
+        """
+        Queues a closed candle for its symbol and returns the future (None for unknown symbols).
+        """
+        trader = self.traders.get(symbol)
+        if trader is None:
+            return None
+        return self.queues[symbol].submit(trader.on_candle, candle, time.perf_counter())
+
+    def run(self, feed):
+        """
+        Seeds the boxes, then dispatches every (symbol, closed candle) from the feed.
+        """
+        self.seed()
+        try:
+            for symbol, candle in feed:
+                self.submit(symbol, candle)
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Waits for the queued candles to be handled and stops the symbol queues.
+        """
+        for queue in self.queues.values():
+            queue.shutdown(wait=True)
+        if self.journal is not None:
+            self.journal.close()
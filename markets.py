@@ -0,0 +1,93 @@
+"""
+Lazily built exchange client with an on-disk market cache. near_bot.py imports without
+ccxt or any network call, and restarts skip the load_markets() download while the
+cached precision / limits of the traded symbols are fresh.
+"""
+import json
+import os
+import threading
+import time
+
+# === DEFAULTS ===
+cache_file = 'markets.json'
+cache_ttl = 24 * 60 * 60        # Seconds before cached market metadata is downloaded again
+
+
+class MarketCache:
+    """
+    ccxt market dicts (ids, precision, limits incl. min notional) of the traded symbols,
+    kept in a JSON file. get() only answers when the file is younger than `ttl` and
+    holds every requested symbol.
+    """
+
+    def __init__(self, path=cache_file, ttl=cache_ttl, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+
+    def get(self, symbols):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        markets = data.get('markets', {})
+        if self.clock() - data.get('saved', 0) > self.ttl or any(s not in markets for s in symbols):
+            return None
+        return markets
+
+    def put(self, markets, symbols):
+        """
+        Saves the markets of `symbols`; temp file + rename, so a crash never leaves half a cache.
+        """
+        data = {'saved': self.clock(), 'markets': {s: markets[s] for s in symbols if s in markets}}
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️ Failed to write market cache: {e}")
+
+
+class LazyExchange:
+    """
+    Stands in for the ccxt client and builds it with `factory()` on first use (so ccxt
+    is imported then, not at import time). Every other attribute is the client's.
+    load_markets() fills the client from `cache` when it is fresh and only downloads
+    (refreshing the cache) when it is stale, misses a symbol, or reload=True.
+    """
+
+    def __init__(self, factory, symbols, cache=None):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+        self.symbols = list(symbols)
+        self.cache = cache or MarketCache()
+
+    @property
+    def built(self):
+        return self._client is not None
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def load_markets(self, reload=False):
+        client = self.client
+        markets = None if reload else self.cache.get(self.symbols)
+        if markets is not None:
+            client.set_markets(markets)
+            return client.markets
+        client.load_markets(reload)
+        self.cache.put(client.markets, self.symbols)
+        return client.markets
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.client, name)
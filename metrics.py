@@ -0,0 +1,178 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# === DEFAULTS ===
+buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+window = 1000               # Recent samples kept per span for percentiles
+prefix = 'box_bot'          # Metric name prefix in the Prometheus text format
+
+
+class _Span:
+    """
+    Times a `with` block into Metrics.observe(); a class, not a generator
+    context manager, because it runs several times per tick.
+    """
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_noop = _NoSpan()
+
+
+class Metrics:
+    """
+    In-process latency histograms and counters for the live bot.
+    span(name) times a block, observe(name, seconds) records a duration, count(name)
+    bumps a counter. Recording is a lock, a bisect and an append, so it can sit on the
+    tick path. Export with snapshot() / write() (JSON file) or serve() (Prometheus
+    text on http://host:port/metrics). enabled=False turns recording into a no-op.
+    """
+
+    def __init__(self, enabled=True, buckets=buckets, window=window):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.window = window
+        self.started = time.time()
+        self.counters = {}
+        self.spans = {}             # name -> [bucket counts (+inf last), count, sum, recent samples]
+        self.lock = threading.Lock()
+
+    # --- RECORDING ---
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            span = self.spans.get(name)
+            if span is None:
+                span = self.spans[name] = [[0] * (len(self.buckets) + 1), 0, 0.0, deque(maxlen=self.window)]
+            span[0][slot] += 1
+            span[1] += 1
+            span[2] += seconds
+            span[3].append(seconds)
+
+    def span(self, name):
+        return _Span(self, name) if self.enabled else _noop
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # --- EXPORT ---
+    def snapshot(self):
+        """
+        Counters plus, per span: count, sum, cumulative buckets and p50/p95/p99/max of
+        the last `window` samples.
+        """
+        with self.lock:
+            counters = dict(self.counters)
+            spans = {name: (list(b), n, total, sorted(recent)) for name, (b, n, total, recent) in self.spans.items()}
+        out = {'time': time.time(), 'uptime': time.time() - self.started, 'counters': counters, 'spans': {}}
+        for name, (counts, n, total, recent) in spans.items():
+            cumulative, running = {}, 0
+            for le, c in zip(list(self.buckets) + ['+Inf'], counts):
+                running += c
+                cumulative[str(le)] = running
+            out['spans'][name] = {
+                'count': n,
+                'sum': total,
+                'buckets': cumulative,
+                'p50': recent[int(0.50 * (len(recent) - 1))],
+                'p95': recent[int(0.95 * (len(recent) - 1))],
+                'p99': recent[int(0.99 * (len(recent) - 1))],
+                'max': recent[-1],
+            }
+        return out
+
+    def write(self, path):
+        """
+        Writes snapshot() as JSON; the temp file + rename keeps readers from seeing half a file.
+        """
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+    def prometheus(self):
+        """
+        snapshot() in the Prometheus text exposition format.
+        """
+        snap = self.snapshot()
+        lines = []
+        for name, value in sorted(snap['counters'].items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        for name, span in sorted(snap['spans'].items()):
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            lines += [f'{metric}_bucket{{le="{le}"}} {c}' for le, c in span['buckets'].items()]
+            lines += [f"{metric}_sum {span['sum']}", f"{metric}_count {span['count']}"]
+        return '\n'.join(lines) + '\n'
+
+    def start_writer(self, path, interval=15.0):
+        """
+        Rewrites the JSON file every `interval` seconds from a daemon thread.
+        """
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write(path)
+                except OSError as e:
+                    print(f"⚠️ Failed to write metrics: {e}")
+
+        thread = threading.Thread(target=loop, name='metrics-writer', daemon=True)
+        thread.start()
+        return thread
+
+    def serve(self, port, host='127.0.0.1'):
+        """
+        Serves the Prometheus text on http://host:port/metrics from a daemon thread.
+        Returns the server (shutdown() to stop it).
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer     # Only when serving
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
@@ -0,0 +1,195 @@
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+from logging.handlers import QueueHandler, QueueListener
+
+# === DEFAULTS ===
+burst_window = 60.0         # Seconds between two mails with the same subject, repeats are batched
+max_per_minute = 6          # Mails per minute across all subjects
+
+
+class EmailSender:
+    """
+    SMTP client that keeps one logged-in connection open and reconnects only when the
+    server has dropped it, instead of connecting, STARTTLS-ing and logging in per mail.
+    """
+
+    def __init__(self, host, port, user=None, password=None, to=None, starttls=True, timeout=10):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.to = to
+        self.starttls = starttls
+        self.timeout = timeout
+        self.server = None
+
+    @classmethod
+    def from_env(cls):
+        """
+        Reads EMAIL_HOST, EMAIL_PORT, EMAIL_USER, EMAIL_PASS and EMAIL_TO (near_bot.py's .env).
+        """
+        return cls(os.getenv("EMAIL_HOST"), int(os.getenv("EMAIL_PORT") or 587),
+                   os.getenv("EMAIL_USER"), os.getenv("EMAIL_PASS"), os.getenv("EMAIL_TO"))
+
+    def connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            server.starttls()
+        if self.password:
+            server.login(self.user, self.password)
+        self.server = server
+
+    def send(self, subject, body):
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.user
+        msg["To"] = self.to
+        msg.set_content(body)
+
+        for attempt in range(2):
+            if self.server is None:
+                self.connect()
+            try:
+                self.server.send_message(msg)
+                return
+            except (smtplib.SMTPServerDisconnected, OSError):
+                # Idle connection dropped by the server: reconnect once
+                self.server = None
+                if attempt:
+                    raise
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+
+class Notifier:
+    """
+    Background alert queue: notify() only enqueues, so a slow or unreachable mail server
+    never delays order placement. A worker thread sends through one `sender`.
+    A subject mailed less than `burst_window` seconds ago is held back and its repeats go
+    out as one digest ("⚠️ Bot Error (x12)"); at most `max_per_minute` mails are sent.
+    SMTP sends are timed into `metrics` (a metrics.Metrics) when given.
+    The worker starts with the first alert, so building a Notifier at import (near_bot.py)
+    starts no thread.
+    """
+
+    def __init__(self, sender, burst_window=burst_window, max_per_minute=max_per_minute,
+                 clock=time.monotonic, metrics=None):
+        self.sender = sender
+        self.metrics = metrics
+        self.burst_window = burst_window
+        self.max_per_minute = max_per_minute
+        self.clock = clock
+        self.queue = queue.SimpleQueue()
+        self.pending = {}           # subject -> bodies waiting for the next digest
+        self.last_sent = {}         # subject -> clock of its last mail
+        self.sent = deque()         # clock of every mail in the last minute
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def notify(self, subject, body):
+        if self.thread is None:
+            self._start()
+        self.queue.put((subject, body))
+
+    def close(self, timeout=None):
+        """
+        Sends everything still queued or held back, then stops the worker.
+        """
+        with self.lock:
+            if self.thread is None:     # Never alerted: nothing to send
+                self.sender.close()
+                return
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+    # --- WORKER ---
+    def _start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='notifier', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self._next_due())
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                subject, body = item
+                self.pending.setdefault(subject, []).append(body)
+            self._flush()
+        self._flush(force=True)
+        self.sender.close()
+
+    def _next_due(self):
+        # Seconds until a held-back subject may be mailed, None when nothing is pending
+        if not self.pending:
+            return None
+        now = self.clock()
+        due = min(self.last_sent.get(s, -self.burst_window) + self.burst_window for s in self.pending)
+        if len(self.sent) >= self.max_per_minute:
+            due = max(due, self.sent[0] + 60)
+        return max(due - now, 0.01)
+
+    def _flush(self, force=False):
+        for subject in list(self.pending):
+            now = self.clock()
+            while self.sent and now - self.sent[0] >= 60:
+                self.sent.popleft()
+            if not force:
+                if len(self.sent) >= self.max_per_minute:
+                    return
+                if now - self.last_sent.get(subject, -self.burst_window) < self.burst_window:
+                    continue
+            bodies = self.pending.pop(subject)
+            if len(bodies) > 1:
+                subject_line = f"{subject} (x{len(bodies)})"
+                body = "\n\n".join(bodies)
+            else:
+                subject_line, body = subject, bodies[0]
+            start = time.perf_counter()
+            try:
+                self.sender.send(subject_line, body)
+                print("📧 Email sent.")
+            except Exception as e:
+                print(f"⚠️ Failed to send email: {e}")
+                if self.metrics is not None:
+                    self.metrics.count('mail_errors')
+            if self.metrics is not None:
+                self.metrics.observe('smtp_send', time.perf_counter() - start)
+                self.metrics.count('mails')
+            self.last_sent[subject] = now
+            self.sent.append(now)
+
+
+def queue_logging(filename, fmt='%(asctime)s — %(message)s', datefmt='%Y-%m-%d %H:%M:%S',
+                  level=logging.INFO):
+    """
+    logging.basicConfig(filename=...) with the file writes moved to a listener thread:
+    logging.info() on the trading thread only enqueues the record.
+    Returns the started QueueListener (stop() it to flush on shutdown).
+    """
+    handler = logging.FileHandler(filename, mode='a', encoding='utf-8')
+    handler.setFormatter(logging.Formatter(fmt, datefmt))
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
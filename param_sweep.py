@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from box_engine import BoxIndex, box_frame, load_candles, select_entries
+from profiling import add_arguments, from_args
+
+# --- CONFIGURATION PARAMETERS ---
+data_file = os.path.join('fetch_data', 'Results', 'NEAR_USDT_5m_full.csv')
+risk_pct = 0.01             # Same risk sizing as near_bot.py
+max_affordable = 0.98       # near_bot.py never spends more than 98% of the balance
+top_range = (0.5, 1.0)      # top_threshold grid bounds
+bottom_range = (0.0, 0.5)   # bottom_threshold grid bounds
+take_profit_range = (0.002, 0.03)   # near_bot.py uses 1.01 -> 0.01
+stop_loss_range = (0.002, 0.03)     # near_bot.py uses 0.995 -> 0.005 (= stop_loss_pct)
+
+# Candle and box arrays shared by every parameter combination
+SweepData = namedtuple('SweepData', ['timestamp', 'open', 'high', 'low', 'close', 'low_box', 'box_range'])
+
+
+def prepare(df, same_day=False, period='1D', index=None, complete=False):
+    """
+    Computes the box (previous `period`, default the previous UTC day) once and returns
+    the arrays every sweep reuses. Only candles that have a box are kept (same rows as
+    backtest_5m()). Pass one BoxIndex of `df` when preparing several periods.
+    """
+    boxed = box_frame(df, same_day=same_day, period=period, index=index, complete=complete)
+    return SweepData(
+        timestamp=boxed['timestamp'].values,
+        open=boxed['open'].values,
+        high=boxed['high'].values,
+        low=boxed['low'].values,
+        close=boxed['close'].values,
+        low_box=boxed['low_box'].values,
+        box_range=boxed['high_box'].values - boxed['low_box'].values,
+    )
+
+
+# --- THRESHOLD SWEEP (box_theory_5m.py rules) ---
+def threshold_trades(data, tops, bottoms, batch=16):
+    """
+    Runs the one-bar-hold backtest of backtest_5m() for every (top, bottom) pair.
+    Signals are broadcast as a (tops, bottoms, candles) cube and resolved with one
+    select_entries() call per batch of tops, which bounds memory on long histories.
+    Yields (tops of the batch, entry, above, pnl, ret) with entry/pnl/ret shaped
+    (T, B, candles) and above (T, 1, candles).
+    """
+    tops = np.asarray(tops, dtype=np.float64)
+    bottoms = np.asarray(bottoms, dtype=np.float64)
+    o = data.open
+    # P&L of a LONG entered at this open and closed at the next bar's close
+    move = np.r_[data.close[1:] - o[:-1], 0.0]
+    ret = move / o
+    below = o <= data.low_box + bottoms[:, None] * data.box_range      # (B, N)
+
+    for start in range(0, len(tops), batch):
+        t = tops[start:start + batch]
+        above = (o >= data.low_box + t[:, None] * data.box_range)[:, None, :]   # (T, 1, N)
+        entry = select_entries(above | below[None, :, :])                   # (T, B, N)
+        sign = np.where(above, -1.0, 1.0)
+        yield t, entry, above, np.where(entry, sign * move, 0.0), np.where(entry, sign * ret, 0.0)
+
+
+def sweep_thresholds(data, tops, bottoms, batch=16):
+    """
+    Summary of threshold_trades() over the whole history, one row per combination.
+    """
+    bottoms = np.asarray(bottoms, dtype=np.float64)
+    frames = []
+    for t, entry, above, pnl, ret in threshold_trades(data, tops, bottoms, batch):
+        frames.append(pd.DataFrame({
+            'top_threshold': np.repeat(t, len(bottoms)),
+            'bottom_threshold': np.tile(bottoms, len(t)),
+            'Trades': entry.sum(axis=-1).ravel(),
+            'Shorts': (entry & above).sum(axis=-1).ravel(),
+            'Cumulative P&L': pnl.sum(axis=-1).ravel(),
+            'Return %': (ret.sum(axis=-1) * 100).ravel(),
+            'Wins': (pnl > 0).sum(axis=-1).ravel(),
+        }))
+
+    results = pd.concat(frames, ignore_index=True)
+    results['Hit Rate'] = results['Wins'] / results['Trades'].where(results['Trades'] > 0)
+    return results.drop(columns='Wins')
+
+
+# --- EXIT SWEEP (near_bot.py rules) ---
+def first_exit_bars(data, entries, take_profits, stop_losses, window=2048, cells=1 << 20):
+    """
+    For every candidate entry bar, finds the first later bar whose close reaches each
+    take-profit level and each stop-loss level (len(close) when never reached).
+    Looks `window` bars ahead with running max/min and one searchsorted per row; rows
+    with a level still unreached look again with the window doubled. Blocks of rows are
+    sized to `cells` values, so memory stays flat however long the history is.
+    """
+    close = data.close
+    n = len(close)
+    entries = np.asarray(entries)
+    tp_mult = 1 + np.asarray(take_profits, dtype=np.float64)
+    sl_mult = 1 - np.asarray(stop_losses, dtype=np.float64)
+    first_tp = np.full((len(entries), len(tp_mult)), n)
+    first_sl = np.full((len(entries), len(sl_mult)), n)
+
+    pending = np.arange(len(entries))
+    while len(pending):
+        ahead = np.arange(1, window + 1)
+        block = max(1, cells // window)
+        unresolved = []
+        for start in range(0, len(pending), block):
+            rows = pending[start:start + block]
+            bars = entries[rows][:, None] + ahead
+            inside = bars < n
+            later = close[np.minimum(bars, n - 1)]
+            run_max = np.maximum.accumulate(np.where(inside, later, -np.inf), axis=1)
+            run_min = np.minimum.accumulate(np.where(inside, later, np.inf), axis=1)
+            for k, row in enumerate(rows):
+                entry_bar = entries[row]
+                entry_price = close[entry_bar]
+                tp = np.searchsorted(run_max[k], entry_price * tp_mult, side='left')
+                sl = np.searchsorted(-run_min[k], -(entry_price * sl_mult), side='left')
+                first_tp[row] = np.where(tp < window, entry_bar + 1 + tp, n)
+                first_sl[row] = np.where(sl < window, entry_bar + 1 + sl, n)
+                if entry_bar + window + 1 < n and (tp.max() == window or sl.max() == window):
+                    unresolved.append(row)
+        pending = np.asarray(unresolved, dtype=np.int64)
+        window *= 2
+    return first_tp, first_sl
+
+
+def sweep_exits(data, take_profits, stop_losses, bottom_threshold=0.1, risk_pct=risk_pct):
+    """
+    Sweeps take-profit / stop-loss levels for the near_bot.py long entry
+    (open <= entry zone and close > open, filled at the signal candle's close).
+    A trade exits at the first close at/above TP or at/below SL, or at the last candle.
+    Equity compounds with the bot's sizing: min(risk_pct / stop_loss_pct, 98%) of the balance.
+    All (TP, SL) pairs advance through their trade chains together, one trade per step.
+    """
+    take_profits = np.asarray(take_profits, dtype=np.float64)
+    stop_losses = np.asarray(stop_losses, dtype=np.float64)
+    o, c = data.open, data.close
+    n = len(c)
+    entry_zone = data.low_box + bottom_threshold * data.box_range
+    entries = np.flatnonzero((o <= entry_zone) & (c > o))
+
+    ti, si = np.meshgrid(np.arange(len(take_profits)), np.arange(len(stop_losses)), indexing='ij')
+    ti, si = ti.ravel(), si.ravel()
+    combos = len(ti)
+    trades = np.zeros(combos, dtype=np.int64)
+    wins = np.zeros(combos, dtype=np.int64)
+    sum_ret = np.zeros(combos)
+    equity = np.ones(combos)
+    fraction = np.minimum(risk_pct / stop_losses, max_affordable)[si]
+
+    if len(entries):
+        first_tp, first_sl = first_exit_bars(data, entries, take_profits, stop_losses)
+        # next_entry[bar] = first candidate entry strictly after that bar
+        next_entry = np.searchsorted(entries, np.arange(n), side='right')
+        cur = np.zeros(combos, dtype=np.int64)
+        active = np.flatnonzero(cur < len(entries))
+        while len(active):
+            k = cur[active]
+            exit_bar = np.minimum(np.minimum(first_tp[k, ti[active]], first_sl[k, si[active]]), n - 1)
+            r = c[exit_bar] / c[entries[k]] - 1
+            trades[active] += 1
+            wins[active] += r > 0
+            sum_ret[active] += r
+            equity[active] *= 1 + fraction[active] * r
+            cur[active] = next_entry[exit_bar]
+            active = active[cur[active] < len(entries)]
+
+    results = pd.DataFrame({
+        'bottom_threshold': bottom_threshold,
+        'take_profit_pct': take_profits[ti],
+        'stop_loss_pct': stop_losses[si],
+        'Trades': trades,
+        'Hit Rate': np.where(trades > 0, wins / np.maximum(trades, 1), np.nan),
+        'Return %': sum_ret * 100,
+        'Equity Return %': (equity - 1) * 100,
+    })
+    return results
+
+
+def rank(results, by, top=20):
+    """
+    Sorts a sweep table by one metric (best first) and returns the top rows.
+    """
+    return results.sort_values(by, ascending=False).head(top).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid search over box-theory parameters")
+    parser.add_argument('--data', default=data_file)
+    parser.add_argument('--mode', choices=['thresholds', 'exits'], default='thresholds')
+    parser.add_argument('--steps', type=int, default=50, help="grid points per parameter")
+    parser.add_argument('--bottom', type=float, default=0.1, help="entry zone for --mode exits")
+    parser.add_argument('--same-day', action='store_true', help="use box_theory_5m.py's same-day box")
+    parser.add_argument('--period', nargs='+', default=['1D'], help="box period(s), e.g. 4h 12h 1D 1W")
+    parser.add_argument('--complete-boxes', action='store_true', help="no box from periods missing candles")
+    parser.add_argument('--rank-by', default=None)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--output', default=None)
+    add_arguments(parser)
+    args = parser.parse_args()
+    profiler = from_args(args)
+
+    with profiler.stage('load'):
+        df = load_candles(args.data)
+    start = time.perf_counter()
+    with profiler.stage('box'):
+        index = BoxIndex.from_frame(df)     # Every box period is aggregated from this one 5m series
+    tables = []
+    for period in args.period:
+        with profiler.stage('box'):
+            data = prepare(df, same_day=args.same_day, period=period, index=index, complete=args.complete_boxes)
+        with profiler.stage('sweep', hot=True):
+            if args.mode == 'thresholds':
+                results = sweep_thresholds(data, np.linspace(*top_range, args.steps),
+                                           np.linspace(*bottom_range, args.steps))
+            else:
+                results = sweep_exits(data, np.linspace(*take_profit_range, args.steps),
+                                      np.linspace(*stop_loss_range, args.steps), bottom_threshold=args.bottom)
+        if len(args.period) > 1:
+            results.insert(0, 'period', period)
+        tables.append(results)
+    results = pd.concat(tables, ignore_index=True)
+    rank_by = args.rank_by or ('Return %' if args.mode == 'thresholds' else 'Equity Return %')
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 {len(results)} combinations over {len(df)} candles in {elapsed:.2f}s\n")
+    print(rank(results, rank_by, args.top).to_string(index=False))
+
+    output = args.output or os.path.join('Results', f"param_sweep_{args.mode}.csv")
+    with profiler.stage('save'):
+        results.sort_values(rank_by, ascending=False).to_csv(output, index=False)
+    print(f"\n✅ Saved ranked results to {output}")
+    profiler.finish(args.profile_output)
+
+
+if __name__ == '__main__':
+    main()
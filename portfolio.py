@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import heapq
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from box_engine import load_candles, previous_period_box
+from execution import (TRADE_COLUMNS, bottom_threshold, complete_boxes, fee_rate, fill_price, first_exit,
+                       max_slippage, min_notional, qty_precision, risk_pct, size_order, slippage, start_balance,
+                       stop_loss_pct, take_profit_pct)
+from profiling import OFF, add_arguments, from_args
+from run_universe import symbol_from_path
+from trade_log import TEXT, TradeLog, save_trades
+
+# --- CONFIGURATION PARAMETERS ---
+data_glob = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+trades_file = os.path.join('Results', 'portfolio_trades.csv')
+equity_file = os.path.join('Results', 'portfolio_equity.csv')
+max_positions = 5           # Open positions at once across all pairs (None for no cap)
+
+
+# --- ALIGNED GRID ---
+def align(frames):
+    """
+    {symbol: candle frame} -> (timestamps, {column: (T, S) array}, rows) on the union of
+    all 5m timestamps; NaN where a symbol has no candle. rows[s] maps each of symbol s's
+    own candles to its grid row.
+    """
+    timestamps = np.unique(np.concatenate([df['timestamp'].values for df in frames.values()]))
+    rows = [np.searchsorted(timestamps, df['timestamp'].values) for df in frames.values()]
+    grid = {}
+    for col in ('open', 'high', 'low', 'close'):
+        values = np.full((len(timestamps), len(frames)), np.nan)
+        for s, df in enumerate(frames.values()):
+            values[rows[s], s] = df[col].values
+        grid[col] = values
+    return timestamps, grid, rows
+
+
+def forward_fill(values):
+    """
+    Last non-NaN value down each column (leading NaNs stay NaN).
+    """
+    idx = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return values[idx, np.arange(values.shape[1])]
+
+
+# --- CANDIDATE TRADES ---
+def candidates(frames, rows, bottom_threshold=bottom_threshold, slippage=slippage, complete=complete_boxes):
+    """
+    Every near_bot.py signal of every symbol, as a dict of arrays (grid row, symbol,
+    bar in the symbol's own frame, signal open, slipped entry) sorted by grid row then
+    symbol. Exits are left to the capital pass, which only resolves the signals it takes.
+    """
+    out = {k: [] for k in ('row', 'symbol', 'bar', 'open', 'entry')}
+    for s, df in enumerate(frames.values()):
+        ts, o, h, l, c = (df[col].values for col in ('timestamp', 'open', 'high', 'low', 'close'))
+        high_box, low_box = previous_period_box(ts, h, l, complete=complete)
+        bars = np.flatnonzero((o <= low_box + bottom_threshold * (high_box - low_box)) & (c > o))
+        out['row'].append(rows[s][bars])
+        out['symbol'].append(np.full(len(bars), s))
+        out['bar'].append(bars)
+        out['open'].append(o[bars])
+        out['entry'].append(fill_price(c[bars], 'buy', slippage))
+    arrays = {k: np.concatenate(v) if v else np.array([]) for k, v in out.items()}
+    order = np.lexsort((arrays['symbol'], arrays['row']))
+    return {k: v[order] for k, v in arrays.items()}
+
+
+# --- PORTFOLIO SIMULATION ---
+def simulate_portfolio(frames, balance=start_balance, max_positions=max_positions, risk_pct=risk_pct,
+                       stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct,
+                       bottom_threshold=bottom_threshold, fee_rate=fee_rate, slippage=slippage, intrabar=True,
+                       complete=complete_boxes, profiler=OFF):
+    """
+    The live bot trading every symbol of `frames` ({symbol: candle frame}) from one
+    USDT balance: each signal is sized with risk_pct of the cash not tied up in open
+    positions (execution.size_order), skipped under min_notional, aborted past
+    max_slippage, and skipped while `max_positions` positions are open. A pair is not
+    re-entered before its exit candle has passed. A trade's Balance is the cash left
+    right after its entry.
+    Returns (trades DataFrame incl. skipped signals, equity DataFrame per grid row).
+    """
+    symbols = list(frames)
+    with profiler.stage('align'):
+        timestamps, grid, rows = align(frames)
+    with profiler.stage('signals'):
+        cand = candidates(frames, rows, bottom_threshold, slippage, complete)
+    ohlc = [tuple(df[col].values for col in ('open', 'high', 'low', 'close')) for df in frames.values()]
+    precision = [qty_precision(df['close'].values[0]) for df in frames.values()]
+    times = timestamps.astype('datetime64[ms]').astype('datetime64[ns]')
+
+    n_rows, n_symbols = len(timestamps), len(symbols)
+    held = np.zeros((n_rows + 1, n_symbols))       # Qty changes per row (cumsum -> holdings)
+    cash_flow = np.zeros(n_rows + 1)               # Cash changes per row (cumsum -> cash)
+    busy_until = np.full(n_symbols, -1)            # Exit row of each pair's open position
+    open_exits = []                                # Heap of (exit row, proceeds)
+    cash = balance
+    trades = TradeLog({'Symbol': TEXT, **TRADE_COLUMNS})
+
+    with profiler.stage('capital', hot=True):
+        for t, s, bar, o, entry in zip(*(cand[k].tolist() for k in cand)):
+            while open_exits and open_exits[0][0] <= t:
+                cash += heapq.heappop(open_exits)[1]
+            if busy_until[s] >= t:
+                continue
+            row = {'Symbol': symbols[s], 'Entry Time': times[t], 'Exit Time': times[t], 'Qty': 0.0, 'Entry': o,
+                   'Exit': o, 'Fees': 0.0, 'P&L': 0.0}
+            if max_positions is not None and len(open_exits) >= max_positions:
+                trades.append(**row, Reason='Skipped (Max Positions)', Balance=cash)
+                continue
+            qty = float(size_order(cash, o, risk_pct, stop_loss_pct, precision[s]))
+            if qty * o < min_notional:
+                trades.append(**row, Reason='Skipped (Too Small)', Balance=cash)
+            elif abs(entry - o) / o > max_slippage:
+                trades.append(**row, Reason='Aborted (Slippage)', Balance=cash)
+            else:
+                # Fills depend only on prices, so the exit is resolved once the entry is taken
+                x, ref, reason = first_exit(*ohlc[s], bar + 1, entry * (1 + take_profit_pct),
+                                            entry * (1 - stop_loss_pct), intrabar)
+                x, exit_ = rows[s][x], fill_price(ref, 'sell', slippage)
+                cost = qty * entry * (1 + fee_rate)
+                proceeds = qty * exit_ * (1 - fee_rate)
+                cash -= cost
+                heapq.heappush(open_exits, (x, proceeds))
+                busy_until[s] = x
+                held[t, s] += qty
+                held[x, s] -= qty
+                cash_flow[t] -= cost
+                cash_flow[x] += proceeds
+                row.update({'Exit Time': times[x], 'Qty': qty, 'Entry': entry, 'Exit': exit_,
+                            'Fees': fee_rate * (entry + exit_) * qty, 'P&L': proceeds - cost})
+                trades.append(**row, Reason=reason, Balance=cash)
+
+    # Mark to market at every close: cash plus open positions at their last price
+    with profiler.stage('equity'):
+        holdings = np.cumsum(held[:-1], axis=0)
+        cash_curve = balance + np.cumsum(cash_flow[:-1])
+        positions = np.nansum(holdings * forward_fill(grid['close']), axis=1)
+        equity = cash_curve + positions
+        equity_df = pd.DataFrame({
+            'Timestamp': times,
+            'Cash': cash_curve,
+            'Positions': positions,
+            'Equity': equity,
+            'Drawdown %': (equity / np.maximum.accumulate(equity) - 1) * 100,
+            'Open Positions': np.count_nonzero(holdings > 0, axis=1),
+        })
+        return trades.frame(), equity_df
+
+
+def summarize(trades, equity, balance):
+    filled = trades[trades['Qty'] > 0]
+    return {
+        'Trades': len(filled),
+        'Skipped': int((trades['Qty'] == 0).sum()),
+        'Hit Rate': float((filled['P&L'] > 0).mean()) if len(filled) else 0.0,
+        'Fees': float(filled['Fees'].sum()),
+        'Final Equity': float(equity['Equity'].iloc[-1]) if len(equity) else balance,
+        'Return %': (float(equity['Equity'].iloc[-1]) / balance - 1) * 100 if len(equity) else 0.0,
+        'Max Drawdown %': float(equity['Drawdown %'].min()) if len(equity) else 0.0,
+        'Max Open': int(equity['Open Positions'].max()) if len(equity) else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="near_bot.py rules over every pair with one shared balance")
+    parser.add_argument('--data', default=data_glob, help="glob of candle files (.csv or .candles)")
+    parser.add_argument('--balance', type=float, default=start_balance)
+    parser.add_argument('--max-positions', type=int, default=max_positions, help="0 for no cap")
+    parser.add_argument('--fee', type=float, default=fee_rate)
+    parser.add_argument('--slippage', type=float, default=slippage)
+    parser.add_argument('--exits', choices=['intrabar', 'close'], default='intrabar')
+    parser.add_argument('--trades', default=trades_file, help="CSV, or a binary store when it ends in .trades")
+    parser.add_argument('--equity', default=equity_file)
+    add_arguments(parser)
+    args = parser.parse_args()
+    profiler = from_args(args)
+
+    paths = sorted(glob.glob(args.data))
+    if not paths:
+        print(f"❌ No files match {args.data}")
+        return
+    with profiler.stage('load'):
+        frames = {symbol_from_path(p): load_candles(p) for p in paths}
+
+    start = time.perf_counter()
+    trades, equity = simulate_portfolio(frames, args.balance, args.max_positions or None, fee_rate=args.fee,
+                                        slippage=args.slippage, intrabar=args.exits == 'intrabar', profiler=profiler)
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 {len(frames)} pairs, {len(equity)} aligned 5m rows, {len(trades)} signals in {elapsed:.2f}s\n")
+    for key, value in summarize(trades, equity, args.balance).items():
+        print(f"   {key:<15} {value:.2f}" if isinstance(value, float) else f"   {key:<15} {value}")
+    per_symbol = trades[trades['Qty'] > 0].groupby('Symbol')['P&L'].agg(['count', 'sum'])
+    print(f"\n{per_symbol.rename(columns={'count': 'Trades', 'sum': 'Net P&L'}).to_string()}")
+
+    with profiler.stage('save'):
+        save_trades(trades, args.trades)
+        equity.to_csv(args.equity, index=False)
+    print(f"\n✅ Saved {args.trades} and {args.equity}")
+    profiler.finish(args.profile_output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Append-only journal of the live bot's open positions, so a restarted bot knows what it
+holds. One JSON line per position change (entry or exit), flushed and fsynced before
+the tick moves on; ticks without a trade write nothing. The journal is rewritten to
+just the open positions at startup and every `compact_after` records, so restoring
+reads a bounded number of lines however long the bot has run.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+# === DEFAULTS ===
+journal_file = 'positions.jsonl'
+compact_after = 1000        # Records appended before the journal is compacted
+
+
+def encode(position):
+    if position is None:
+        return None
+    out = dict(position)
+    if isinstance(out.get('entry_time'), datetime):
+        out['entry_time'] = out['entry_time'].isoformat()
+    return out
+
+
+def decode(position):
+    if position is None:
+        return None
+    out = dict(position)
+    if isinstance(out.get('entry_time'), str):
+        out['entry_time'] = datetime.fromisoformat(out['entry_time'])
+    return out
+
+
+class PositionJournal:
+    """
+    `positions` is {symbol: open position dict} as restored from `path` and kept
+    current by record(). sync=False skips the fsync (the OS still gets every line).
+    A torn last line from a crash mid-write is ignored.
+    """
+
+    def __init__(self, path=journal_file, sync=True, compact_after=compact_after):
+        self.path = path
+        self.sync = sync
+        self.compact_after = compact_after
+        self.lock = threading.Lock()
+        self.positions = {}
+        self.restored_lines = self._load()
+        self.file = None
+        self.appended = 0
+        self._compact()
+
+    def _load(self):
+        lines = 0
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    lines += 1
+                    self._apply(entry['symbol'], decode(entry['position']))
+        except FileNotFoundError:
+            pass
+        return lines
+
+    def _apply(self, symbol, position):
+        if position is None:
+            self.positions.pop(symbol, None)
+        else:
+            self.positions[symbol] = position
+
+    def _write(self, f, line):
+        f.write(line)
+        f.flush()
+        if self.sync:
+            os.fsync(f.fileno())
+
+    def _compact(self):
+        """
+        Rewrites the journal as one line per open position (temp file + rename).
+        """
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            lines = [json.dumps({'symbol': s, 'position': encode(p), 'reason': 'open', 'time': int(time.time() * 1000)})
+                     for s, p in self.positions.items()]
+            self._write(f, ''.join(line + '\n' for line in lines))
+        os.replace(tmp, self.path)
+        if self.file is not None:
+            self.file.close()
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.appended = 0
+
+    # --- RECORDING ---
+    def record(self, symbol, position, reason=''):
+        """
+        Journals `symbol`'s new state: its open position dict, or None once it is closed.
+        Returns after the line is on disk.
+        """
+        line = json.dumps({'symbol': symbol, 'position': encode(position), 'reason': reason,
+                           'time': int(time.time() * 1000)}) + '\n'
+        with self.lock:
+            self._apply(symbol, position)
+            self._write(self.file, line)
+            self.appended += 1
+            if self.appended >= self.compact_after:
+                self._compact()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,243 @@
+"""
+Opt-in per-stage profiling for the backtest scripts. stage(name) times a `with` block:
+wall time, CPU time (this process and its finished workers) and where the process memory
+high-water mark stood; trace_memory=True adds each stage's own tracemalloc peak (slower).
+Stages marked hot run under cProfile when `cprofile_file` is set. The breakdown is
+printed by report() and saved as JSON by write(). Profiler(enabled=False) hands out a
+shared no-op context manager, so instrumented scripts cost nothing when it is off.
+"""
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:         # Windows: no peak RSS
+    resource = None
+
+# === DEFAULTS ===
+top_functions = 15          # cProfile rows printed by report()
+
+
+def peak_rss_mb():
+    """
+    High-water mark of the process resident memory in MB (None where unavailable).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10     # bytes on macOS, KB elsewhere
+
+
+def cpu_seconds():
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def _mb(value, width):
+    return f"{value:>{width}.1f}" if value is not None else f"{'-':>{width}}"
+
+
+class _Stage:
+    """
+    One timed `with` block of Profiler.stage(); nested stages are named 'outer/inner'.
+    """
+    __slots__ = ('profiler', 'name', 'hot', 'wall', 'cpu', 'rss', 'traced')
+
+    def __init__(self, profiler, name, hot):
+        self.profiler = profiler
+        self.name = name
+        self.hot = hot
+
+    def __enter__(self):
+        p = self.profiler
+        p.stack.append(self.name)
+        p.stages.setdefault('/'.join(p.stack), None)      # Listed in the order stages start
+        if p.trace_memory:
+            self.traced = p.push_traced()
+        if self.hot and p.cprofile is not None:
+            p.hot_depth += 1
+            if p.hot_depth == 1:
+                p.cprofile.enable()
+        self.rss = peak_rss_mb()
+        self.cpu = cpu_seconds()
+        self.wall = time.perf_counter()
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = cpu_seconds() - self.cpu
+        p = self.profiler
+        if self.hot and p.cprofile is not None:
+            p.hot_depth -= 1
+            if p.hot_depth == 0:
+                p.cprofile.disable()
+        rss = peak_rss_mb()
+        traced = (p.pop_traced() - self.traced) / 2**20 if p.trace_memory else None
+        p.record('/'.join(p.stack), wall, cpu, rss, rss - self.rss if rss is not None else None, traced)
+        p.stack.pop()
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_noop = _NoStage()
+
+
+class Profiler:
+    """
+    Per-stage wall/CPU/memory breakdown of one script run. Stages that run several
+    times are summed; memory columns keep their maximum. process_peak_mb is the whole
+    process's RSS high-water mark when the stage ended (it never falls, so a later stage
+    shows at least the peak of an earlier one) and peak_raised_mb how much the stage
+    raised it. traced_mb, with trace_memory, is the stage's own peak of Python allocations.
+    """
+
+    def __init__(self, enabled=True, cprofile_file=None, trace_memory=False):
+        self.enabled = enabled
+        self.cprofile_file = cprofile_file
+        self.trace_memory = enabled and trace_memory
+        self.cprofile = None
+        self.hot_depth = 0
+        self.stack = []
+        self.traced_peaks = []      # tracemalloc peak of every open stage
+        self.stages = {}            # name -> {'calls', 'wall', 'cpu', 'process_peak_mb', 'peak_raised_mb', 'traced_mb'}
+        self.started = time.perf_counter()
+        if enabled and cprofile_file:
+            import cProfile
+
+            self.cprofile = cProfile.Profile()
+        if self.trace_memory:
+            import tracemalloc
+
+            tracemalloc.start()
+
+    def stage(self, name, hot=False):
+        """
+        Context manager timing a block as stage `name`; hot=True also runs it under
+        cProfile when the profiler was given a cprofile_file.
+        """
+        return _Stage(self, name, hot) if self.enabled else _noop
+
+    def push_traced(self):
+        """
+        Starts a tracemalloc peak for a new stage (the enclosing stage keeps its own).
+        Returns the traced bytes now.
+        """
+        import tracemalloc
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self.traced_peaks:
+            self.traced_peaks[-1] = max(self.traced_peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self.traced_peaks.append(current)
+        return current
+
+    def pop_traced(self):
+        """
+        Ends the innermost stage's tracemalloc peak and returns it (bytes).
+        """
+        import tracemalloc
+
+        peak = max(self.traced_peaks.pop(), tracemalloc.get_traced_memory()[1])
+        if self.traced_peaks:
+            self.traced_peaks[-1] = max(self.traced_peaks[-1], peak)
+        return peak
+
+    def record(self, name, wall, cpu, process_peak_mb=None, peak_raised_mb=None, traced_mb=None):
+        s = self.stages.get(name)
+        if s is None:
+            s = self.stages[name] = {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'process_peak_mb': None,
+                                     'peak_raised_mb': None, 'traced_mb': None}
+        s['calls'] += 1
+        s['wall'] += wall
+        s['cpu'] += cpu
+        for key, value in (('process_peak_mb', process_peak_mb), ('peak_raised_mb', peak_raised_mb),
+                           ('traced_mb', traced_mb)):
+            if value is not None:
+                s[key] = value if s[key] is None else max(s[key], value)
+
+    # --- EXPORT ---
+    def snapshot(self):
+        return {'time': time.time(), 'total_wall': time.perf_counter() - self.started,
+                'stages': {name: dict(s) for name, s in self.stages.items() if s is not None}}
+
+    def report(self):
+        """
+        The stage table (in the order stages first ran), plus the top cProfile
+        functions of the hot stages. 'proc peak MB' is the process high-water mark, not
+        the stage's own use; that is 'traced MB', with trace_memory.
+        """
+        total = time.perf_counter() - self.started
+        lines = [f"{'stage':<28}{'calls':>6}{'wall s':>10}{'% run':>7}{'cpu s':>10}{'proc peak MB':>14}"
+                 f"{'raised MB':>11}" + (f"{'traced MB':>11}" if self.trace_memory else '')]
+        for name, s in self.stages.items():
+            if s is None:           # Still running
+                continue
+            label = '  ' * name.count('/') + name.rsplit('/', 1)[-1]
+            lines.append(f"{label:<28}{s['calls']:>6}{s['wall']:>10.3f}{s['wall'] / total * 100 if total else 0:>7.1f}"
+                         f"{s['cpu']:>10.3f}{_mb(s['process_peak_mb'], 14)}{_mb(s['peak_raised_mb'], 11)}"
+                         + (_mb(s['traced_mb'], 11) if self.trace_memory else ''))
+        other = total - sum(s['wall'] for name, s in self.stages.items() if s is not None and '/' not in name)
+        lines.append(f"{'other':<28}{'':>6}{other:>10.3f}{other / total * 100 if total else 0:>7.1f}")
+        lines.append(f"{'total run':<28}{'':>6}{total:>10.3f}")
+        if self.cprofile is not None:
+            import io
+            import pstats
+
+            out = io.StringIO()
+            pstats.Stats(self.cprofile, stream=out).sort_stats('cumulative').print_stats(top_functions)
+            lines += ['', out.getvalue().strip()]
+        return '\n'.join(lines)
+
+    def write(self, path):
+        """
+        Writes snapshot() as JSON; the temp file + rename keeps readers from seeing half a file.
+        """
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+    def finish(self, output=None):
+        """
+        Prints the report, saves it to `output` (JSON) and the cProfile dump to
+        cprofile_file (pstats format, e.g. for snakeviz). Nothing when disabled.
+        """
+        if not self.enabled:
+            return
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(self.cprofile_file)
+        print(f"\n📊 Profile\n{self.report()}")
+        if output:
+            self.write(output)
+            print(f"✅ Saved profile to {output}")
+        if self.cprofile is not None:
+            print(f"✅ Saved cProfile dump to {self.cprofile_file}")
+
+
+OFF = Profiler(enabled=False)       # Default of the functions that take a profiler
+
+
+# --- COMMAND LINE ---
+def add_arguments(parser):
+    """
+    Adds --profile, --profile-output, --cprofile and --trace-memory to a script's parser.
+    """
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true', help="print wall/CPU/memory per stage")
+    group.add_argument('--profile-output', default=None, help="also save the breakdown as JSON (implies --profile)")
+    group.add_argument('--cprofile', default=None, help="cProfile dump of the hot stages (implies --profile)")
+    group.add_argument('--trace-memory', action='store_true', help="tracemalloc peak per stage (slower)")
+
+
+def from_args(args):
+    enabled = args.profile or bool(args.profile_output or args.cprofile or args.trace_memory)
+    return Profiler(enabled, args.cprofile, args.trace_memory)
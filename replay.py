@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import difflib
+import glob
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+from candle_feeds import ReplayFeed
+from exchange_state import ExchangeSnapshot
+from execution import fee_rate, slippage
+from live_engine import LiveEngine
+from profiling import add_arguments, from_args
+from run_universe import symbol_from_path
+from sim_exchange import SimExchange, candles_from_file
+
+# --- CONFIGURATION PARAMETERS ---
+data_glob = os.path.join('fetch_data', 'Results', 'NEAR_USDT_5m_full.csv')
+log_file = os.path.join('Results', 'replay_logs.txt')
+timeframe = '5m'
+start_usdt = 1000.0
+log_format = '%(asctime)s — %(message)s'     # near_bot.py's logs.txt layout
+log_datefmt = '%Y-%m-%d %H:%M:%S'
+CANDLE_TIME = re.compile(r'\d{4}-\d\d-\d\d \d\d:\d\d:\d\d')     # datetime.utcfromtimestamp() in a message
+
+
+class ReplayClockFormatter(logging.Formatter):
+    """
+    Stamps log records with the simulated exchange clock instead of the wall clock,
+    so replayed lines carry the time the live bot would have written them.
+    """
+
+    def __init__(self, exchange, fmt=log_format, datefmt=log_datefmt):
+        super().__init__(fmt, datefmt)
+        self.exchange = exchange
+
+    def formatTime(self, record, datefmt=None):
+        return datetime.utcfromtimestamp(self.exchange.now / 1000).strftime(datefmt or self.datefmt)
+
+
+# --- REPLAY ---
+def replay(candles, log_path=log_file, usdt=start_usdt, start=None, slippage=slippage, fee_rate=fee_rate,
+           dry_run=False, verbose=False):
+    """
+    Runs live_engine's decision code (the code near_bot.run_bot() runs) over
+    {symbol: candles} against a SimExchange, one closed candle at a time and as fast as
+    the CPU allows. The exchange clock jumps to each candle's close before it is handled.
+    Log lines go to `log_path` in logs.txt format, stamped with the simulated clock.
+    `start` (ms) is when the bot is switched on: its box is seeded from the history
+    before it, like at a real start. Returns (exchange, alerts, seconds).
+    """
+    exchange = SimExchange(candles, usdt, slippage=slippage, fee_rate=fee_rate)
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    exchange.now = start if start is not None else exchange.now
+
+    handler = logging.FileHandler(log_path, mode='w', encoding='utf-8')
+    handler.setFormatter(ReplayClockFormatter(exchange))
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.INFO)
+    root.addHandler(handler)
+
+    alerts = []
+    engine = LiveEngine(exchange, list(candles), timeframe, dry_run=dry_run,
+                        notify=lambda subject, body: alerts.append((exchange.now, subject)))
+    # Balance TTL follows the replayed clock
+    engine.account = ExchangeSnapshot(exchange, clock=lambda: exchange.now / 1000, metrics=engine.metrics)
+    feed = ReplayFeed({s: [c for c in rows if c[0] >= exchange.now] for s, rows in candles.items()})
+
+    began = time.perf_counter()
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, \
+                contextlib.redirect_stdout(None if verbose else devnull):
+            engine.seed()
+            for symbol, candle in feed:
+                exchange.now = candle[0] + tf_ms
+                engine.submit(symbol, candle).result()
+            engine.close()
+    finally:
+        root.removeHandler(handler)
+        root.setLevel(level)
+        handler.close()
+    return exchange, alerts, time.perf_counter() - began
+
+
+# --- LOG DIFF ---
+def read_log(path):
+    """
+    Parses a logs.txt-style file into [(datetime, message)]; lines without a timestamp
+    continue the previous (multi-line) message.
+    """
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            stamp, sep, message = line.partition(' — ')
+            try:
+                when = datetime.strptime(stamp, log_datefmt) if sep else None
+            except ValueError:
+                when = None
+            if when is not None:
+                entries.append((when, message))
+            elif entries:
+                entries[-1] = (entries[-1][0], entries[-1][1] + '\n' + line)
+    return entries
+
+
+def candle_times(entries):
+    """
+    [(log time, message)] -> [(candle time, message)]. The candle a message is about is
+    the last time written in it (REJECTED, TRADE SUMMARY, TRADE CLOSED's exit time); the
+    lines without one (BUY executed, Free ... before sell) belong to the candle of the
+    line before. Leading messages that follow no candle get None.
+    """
+    out, candle = [], None
+    for _, message in entries:
+        found = CANDLE_TIME.findall(message)
+        if found:
+            candle = datetime.strptime(found[-1], log_datefmt)
+        out.append((candle, message))
+    return out
+
+
+def compare_logs(live_path, replay_path, context=3):
+    """
+    Diffs the messages (timestamps dropped) of a live log and a replay log over the
+    candles both cover. The window comes from the candle time in the messages, not the
+    line stamps: logs.txt is stamped with the bot's local wall clock, the replay with
+    the simulated candle close. Returns (messages compared, matching messages, unified
+    diff lines); nothing is compared when the logs share no candle.
+    """
+    live, replayed = candle_times(read_log(live_path)), candle_times(read_log(replay_path))
+    live_times = [t for t, _ in live if t is not None]
+    replay_times = [t for t, _ in replayed if t is not None]
+    if not live_times or not replay_times:
+        return 0, 0, []
+    lo = max(min(live_times), min(replay_times))
+    hi = min(max(live_times), max(replay_times))
+    a = [m for t, m in live if t is not None and lo <= t <= hi]
+    b = [m for t, m in replayed if t is not None and lo <= t <= hi]
+    if not a and not b:
+        return 0, 0, []
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    same = sum(block.size for block in matcher.get_matching_blocks())
+    diff = list(difflib.unified_diff(a, b, live_path, replay_path, n=context, lineterm=''))
+    return max(len(a), len(b)), same, diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay stored candles through the live bot's decision code")
+    parser.add_argument('--data', default=data_glob, help="glob of candle files, one symbol each")
+    parser.add_argument('--start', default=None, help="UTC date/time the bot is switched on (default: first candle)")
+    parser.add_argument('--usdt', type=float, default=start_usdt)
+    parser.add_argument('--fee', type=float, default=fee_rate)
+    parser.add_argument('--slippage', type=float, default=slippage)
+    parser.add_argument('--dry-run', action='store_true', help="replay near_bot's DRY_RUN mode")
+    parser.add_argument('--log', default=log_file)
+    parser.add_argument('--compare', default=None, help="logs.txt of a real run to diff against")
+    parser.add_argument('--verbose', action='store_true', help="show the bot's console output")
+    add_arguments(parser)
+    args = parser.parse_args()
+    profiler = from_args(args)
+
+    paths = sorted(glob.glob(args.data))
+    if not paths:
+        print(f"❌ No files match {args.data}")
+        return
+    with profiler.stage('load'):
+        candles = {symbol_from_path(p): candles_from_file(p) for p in paths}
+    start = None
+    if args.start:
+        start = int(datetime.fromisoformat(args.start).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+    with profiler.stage('replay'):     # Not hot: the engine handles candles on its worker threads
+        exchange, alerts, elapsed = replay(candles, args.log, args.usdt, start, args.slippage, args.fee,
+                                           args.dry_run, args.verbose)
+
+    n = sum(1 for rows in candles.values() for c in rows if start is None or c[0] >= start)
+    buys = sum(1 for o in exchange.orders if o['side'] == 'buy')
+    print(f"📊 Replayed {n} candles of {len(candles)} symbol(s) in {elapsed:.2f}s")
+    print(f"   {buys} buys, {len(exchange.orders) - buys} sells, {len(alerts)} alerts, "
+          f"balances: {', '.join(f'{k} {v:.4f}' for k, v in exchange.balances.items() if v)}")
+    print(f"✅ Log written to {args.log}")
+
+    if args.compare:
+        with profiler.stage('compare'):
+            compared, same, diff = compare_logs(args.compare, args.log)
+        if not compared:
+            print(f"❌ {args.compare} and {args.log} share no candle, nothing compared")
+        elif not diff:
+            print(f"✅ {same} messages identical to {args.compare}")
+        else:
+            print(f"⚠️ {same} of {compared} messages match, differences:\n" + '\n'.join(diff[:200]))
+    profiler.finish(args.profile_output)
+    if args.compare and (not compared or diff):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+import argparse
+import contextlib
+import functools
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from box_engine import load_candles
+from box_theory_5m import run_backtest
+from profiling import add_arguments, from_args
+from trade_log import TEXT, TradeLog, log_columns
+
+# --- CONFIGURATION PARAMETERS ---
+data_glob = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+output_file = os.path.join('Results', 'universe_summary.csv')
+
+
+def symbol_from_path(path):
+    """
+    'fetch_data/Results/BTC_USDT_5m_full.csv' (or '.candles') -> 'BTC/USDT'
+    """
+    name = os.path.splitext(os.path.basename(path.rstrip('/\\')))[0].replace('_5m_full', '')
+    base, _, quote = name.rpartition('_')
+    return f"{base}/{quote}" if base else name
+
+
+def backtest_file(path, with_trades=False):
+    """
+    Runs the box_theory_5m.py backtest on one local CSV.
+    Returns the summary row, plus the trade DataFrame when `with_trades` (its numpy
+    columns pickle compactly; otherwise nothing but the summary crosses the pool).
+    """
+    df = load_candles(path)
+    trades = run_backtest(df)
+    pnl = trades['P&L']
+    summary = {
+        'Symbol': symbol_from_path(path),
+        'Candles': len(df),
+        'Trades': len(trades),
+        'Longs': int((trades['Signal'] == 'LONG').sum()),
+        'Shorts': int((trades['Signal'] == 'SHORT').sum()),
+        'Cumulative P&L': float(pnl.sum()),
+        'Return %': float((pnl / trades['Entry']).sum() * 100),
+        'Hit Rate': float((pnl > 0).mean()) if len(trades) else 0.0,
+    }
+    return (summary, trades) if with_trades else summary
+
+
+def run_universe(paths, workers=None, trades_path=None):
+    """
+    Backtests every file in a process pool (one task per symbol) and returns the
+    summary DataFrame sorted by symbol. With `trades_path` every symbol's trades are
+    streamed into one trade log (trade_log.py) as its task finishes.
+    """
+    workers = workers or os.cpu_count() or 1
+    task = functools.partial(backtest_file, with_trades=trades_path is not None)
+    with contextlib.ExitStack() as stack:
+        if workers == 1:
+            results = map(task, paths)
+        else:
+            results = stack.enter_context(ProcessPoolExecutor(max_workers=workers)).map(task, paths)
+        if trades_path is None:
+            rows = list(results)
+        else:
+            rows, log = [], None
+            for summary, trades in results:
+                if log is None:
+                    log = stack.enter_context(TradeLog({'Symbol': TEXT, **log_columns(trades)}, trades_path))
+                log.extend(Symbol=summary['Symbol'], **{name: trades[name].values for name in trades.columns})
+                rows.append(summary)
+    return pd.DataFrame(rows).sort_values('Symbol').reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Box-theory backtest over every local *_5m_full.csv")
+    parser.add_argument('--data', default=data_glob, help="glob of candle files (.csv or .candles)")
+    parser.add_argument('--workers', type=int, default=None, help="pool size (default: CPU count)")
+    parser.add_argument('--output', default=output_file)
+    parser.add_argument('--trades', default=None,
+                        help="also stream every trade to this CSV (or binary store if it ends in .trades)")
+    add_arguments(parser)
+    args = parser.parse_args()
+    profiler = from_args(args)
+
+    paths = sorted(glob.glob(args.data))
+    if not paths:
+        print(f"❌ No files match {args.data}")
+        return
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"📊 Backtesting {len(paths)} symbols with {workers} worker(s)...")
+    start = time.perf_counter()
+    with profiler.stage('backtest', hot=True):      # cProfile sees the workers only with --workers 1
+        summary = run_universe(paths, workers, args.trades)
+    elapsed = time.perf_counter() - start
+
+    print(summary.to_string(index=False))
+    with profiler.stage('save'):
+        summary.to_csv(args.output, index=False)
+    print(f"\n✅ Saved {args.output} ({elapsed:.2f}s wall time)")
+    profiler.finish(args.profile_output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from daily_box import DAY_MS
+from execution import bottom_threshold
+
+# --- CONFIGURATION PARAMETERS ---
+data_glob = os.path.join('fetch_data', 'Results', '*_5m_full.csv')
+output_file = os.path.join('Results', 'scan.csv')
+workers = 8                 # Concurrent kline requests (box rebuild, --confirm)
+confirm_top = 10            # Closest pairs whose last closed 5m candle is checked with the bot's rule
+
+
+class BoxCache:
+    """
+    Previous-UTC-day high/low of many symbols. The boxes only change at midnight, so
+    they are fetched once per day and every later scan costs a single fetch_tickers()
+    call. The first scan of a day is not batched: Binance has no bulk endpoint for the
+    previous UTC day's range (its multi-symbol tickers are rolling 24h windows), so it
+    sends one 1d kline request per symbol (limit=2, weight 2, `workers` at a time).
+    For 500 pairs that is 500 requests and weight 1000 of the 6000/min budget.
+    """
+
+    def __init__(self, exchange, symbols, workers=workers):
+        self.exchange = exchange
+        self.symbols = list(symbols)
+        self.workers = workers
+        self.day = None
+        self.high = self.low = None
+
+    def _box(self, symbol, day):
+        for ts, o, h, l, c, v in self.exchange.fetch_ohlcv(symbol, '1d', since=(day - 1) * DAY_MS, limit=2):
+            if ts == (day - 1) * DAY_MS:
+                return h, l
+        return np.nan, np.nan
+
+    def boxes(self):
+        """
+        Returns (high, low) arrays aligned with `symbols` (NaN where yesterday has no candle).
+        """
+        day = self.exchange.milliseconds() // DAY_MS
+        if day != self.day:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                rows = list(pool.map(lambda s: self._box(s, day), self.symbols))
+            self.high, self.low = (np.array(col, dtype=np.float64) for col in zip(*rows))
+            self.day = day
+        return self.high, self.low
+
+
+def scan(exchange, cache, bottom_threshold=bottom_threshold):
+    """
+    Ranks every symbol of `cache` by how far its last price is above near_bot.py's
+    entry zone (low + bottom_threshold * box range), closest first; a negative
+    distance means the price is inside the zone. One batched ticker request, the rest
+    is array math over all symbols at once.
+    The bot tests a closed 5m candle's open (and a green close), not the last price;
+    the last price is where the next candle will open, so it ranks the pairs about to
+    signal. confirm() applies the bot's exact rule to the top of the table.
+    """
+    high, low = cache.boxes()
+    tickers = exchange.fetch_tickers(cache.symbols)
+    price = np.array([(tickers.get(s) or {}).get('last') or np.nan for s in cache.symbols], dtype=np.float64)
+
+    box_range = high - low
+    entry_zone = low + bottom_threshold * box_range
+    distance = (price - entry_zone) / price * 100
+    position = np.divide(price - low, box_range, out=np.full_like(price, np.nan), where=box_range > 0)
+
+    order = np.argsort(distance, kind='stable')     # NaN (no box / no price) sorts last
+    return pd.DataFrame({
+        'Symbol': np.array(cache.symbols, dtype=object)[order],
+        'Price': price[order],
+        'Box Low': low[order],
+        'Box High': high[order],
+        'Entry Zone': entry_zone[order],
+        'Distance %': distance[order],
+        'Box Position': position[order],
+        'In Zone': (price <= entry_zone)[order],
+    })
+
+
+def last_closed(exchange, symbol, timeframe='5m'):
+    """
+    The symbol's last closed candle (ccxt list), or None.
+    """
+    now = exchange.milliseconds()
+    tf_ms = exchange.parse_timeframe(timeframe) * 1000
+    closed = [c for c in exchange.fetch_ohlcv(symbol, timeframe, since=now - 3 * tf_ms, limit=3)
+              if c[0] + tf_ms <= now]
+    return closed[-1] if closed else None
+
+
+def confirm(exchange, table, top=confirm_top, workers=workers):
+    """
+    Adds the last closed 5m candle of the `top` closest pairs of a scan() table and
+    near_bot.py's own entry test on it: 'Signal' is True when that candle opened in
+    the entry zone and closed above its open. One kline request per checked pair;
+    the other rows get NaN / False.
+    """
+    out = table.copy()
+    out['Candle Open'] = out['Candle Close'] = np.nan
+    out['Signal'] = False
+    head = list(out['Symbol'].values[:top])
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        candles = list(pool.map(lambda s: last_closed(exchange, s), head))
+    for row, candle in enumerate(candles):
+        if candle is not None:
+            out.iloc[row, out.columns.get_indexer(['Candle Open', 'Candle Close'])] = candle[1], candle[4]
+    o, c = out['Candle Open'].values, out['Candle Close'].values
+    out['Signal'] = (o <= out['Entry Zone'].values) & (c > o)
+    return out
+
+
+def sim_exchange(pattern):
+    """
+    Local stand-in: a SimExchange over the candle files, its clock at the last close.
+    """
+    from run_universe import symbol_from_path
+    from sim_exchange import TF_MS, SimExchange, candles_from_file
+
+    candles = {symbol_from_path(p): candles_from_file(p) for p in sorted(glob.glob(pattern))}
+    exchange = SimExchange(candles)
+    exchange.now = max(rows[-1][0] for rows in candles.values()) + TF_MS
+    return exchange
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank pairs by distance to near_bot.py's entry zone")
+    parser.add_argument('--symbols', nargs='+', default=None, help="default: every local candle file's pair")
+    parser.add_argument('--sim', action='store_true', help="scan the local candle files instead of Binance")
+    parser.add_argument('--data', default=data_glob)
+    parser.add_argument('--bottom', type=float, default=bottom_threshold)
+    parser.add_argument('--watch', type=float, default=None, help="rescan every N seconds")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--confirm', type=int, default=confirm_top,
+                        help="check the bot's candle rule on the N closest pairs (N kline requests, 0 to skip)")
+    parser.add_argument('--output', default=output_file)
+    args = parser.parse_args()
+
+    if args.sim:
+        exchange = sim_exchange(args.data)
+    else:
+        import ccxt
+
+        exchange = ccxt.binance({'enableRateLimit': True, 'options': {'defaultType': 'spot'}})
+    if args.symbols:
+        symbols = args.symbols
+    else:
+        from run_universe import symbol_from_path
+
+        symbols = [symbol_from_path(p) for p in sorted(glob.glob(args.data))]
+    if not symbols:
+        print(f"❌ No symbols given and no files match {args.data}")
+        return
+
+    cache = BoxCache(exchange, symbols)
+    while True:
+        start = time.perf_counter()
+        table = scan(exchange, cache, args.bottom)
+        if args.confirm:
+            table = confirm(exchange, table, args.confirm)
+        elapsed = time.perf_counter() - start
+        print(f"\n📊 {len(symbols)} pairs scanned in {elapsed * 1000:.0f} ms, "
+              f"{int(table['In Zone'].sum())} in the entry zone"
+              + (f", {int(table['Signal'].sum())} with a closed-candle signal" if args.confirm else ''))
+        print(table.head(args.top).to_string(index=False))
+        table.to_csv(args.output, index=False)
+        if args.watch is None:
+            break
+        time.sleep(args.watch)
+    print(f"\n✅ Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Offline stand-in for the sync ccxt.binance client used by near_bot.py / live_engine.py.
+Serves candles from local histories, fills market orders at the last closed price
+(plus optional slippage and fees from execution.py's model), keeps balances (rejecting
+orders they cannot cover) and counts every REST call with its Binance request weight.
+"""
+import bisect
+import threading
+import time
+
+import ccxt
+
+from box_engine import load_candles
+from execution import fill_price, qty_precision
+
+# Binance spot request weights of the endpoints the bot uses
+WEIGHTS = {
+    'load_markets': 20,
+    'fetch_balance': 20,
+    'fetch_ohlcv': 2,
+    'fetch_tickers': 80,        # 24hr ticker of every symbol in one request
+    'create_market_buy_order': 1,
+    'create_market_sell_order': 1,
+}
+TF_MS = 5 * 60 * 1000
+
+
+def aggregate(rows, tf_ms):
+    """
+    Sorted 5m candles -> candles of `tf_ms` (open of the first, high/low, close of the
+    last, summed volume); the last one may still be forming, like on the exchange.
+    """
+    out = []
+    for ts, o, h, l, c, v in rows:
+        start = ts - ts % tf_ms
+        if out and out[-1][0] == start:
+            bar = out[-1]
+            bar[2] = max(bar[2], h)
+            bar[3] = min(bar[3], l)
+            bar[4] = c
+            bar[5] += v
+        else:
+            out.append([start, o, h, l, c, v])
+    return out
+
+
+def candles_from_file(path):
+    """
+    fetch_data CSV (or .candles store) -> list of ccxt [ts, o, h, l, c, v] candles.
+    """
+    df = load_candles(path)
+    prices = df[['open', 'high', 'low', 'close', 'volume']].values.tolist()
+    return [[int(ts), *row] for ts, row in zip(df['timestamp'].values, prices)]
+
+
+class SimExchange:
+    """
+    `candles` is {symbol: candle list}. Set `now` (ms) to move the exchange clock through
+    the histories; `latency` adds a simulated round trip (seconds) to every call.
+    amount_precision=None gives each market the decimals a ~10 USDT order needs
+    (BTC 5, NEAR 1, PEPE 0). Fees are charged in the quote currency.
+    """
+    rateLimit = 50
+
+    def __init__(self, candles, usdt=1000.0, amount_precision=None, latency=0.0, slippage=0.0, fee_rate=0.0):
+        self.candles = candles
+        self.now = min(c[0][0] for c in candles.values())
+        self.latency = latency
+        self.slippage = slippage
+        self.fee_rate = fee_rate
+        self.balances = {'USDT': usdt}
+        self.markets = {}           # Filled by load_markets(), like ccxt
+        self._markets = {}
+        self._times = {}
+        for symbol, rows in candles.items():
+            base, quote = symbol.split('/')
+            self.balances.setdefault(base, 0.0)
+            self.balances.setdefault(quote, 0.0)
+            precision = amount_precision
+            if precision is None:
+                precision = qty_precision(rows[0][4])
+            self._markets[symbol] = {'precision': {'amount': precision}}
+            self._times[symbol] = [c[0] for c in rows]
+        self.calls = {}
+        self.orders = []
+        self.lock = threading.Lock()
+
+    def _count(self, name):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def weight(self):
+        return sum(WEIGHTS.get(name, 1) * n for name, n in self.calls.items())
+
+    def milliseconds(self):
+        return self.now
+
+    def parse_timeframe(self, timeframe):
+        return ccxt.Exchange.parse_timeframe(timeframe)
+
+    def load_markets(self, reload=False):
+        self._count('load_markets')
+        self.markets = self._markets
+        return self.markets
+
+    def set_markets(self, markets):
+        self.markets = markets
+
+    def _visible(self, symbol, before):
+        # Number of candles opened at or before `before` (histories are sorted)
+        return bisect.bisect_right(self._times[symbol], before)
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=500):
+        self._count('fetch_ohlcv')
+        end = self._visible(symbol, self.now)
+        tf_ms = self.parse_timeframe(timeframe) * 1000
+        if tf_ms == TF_MS:
+            rows = self.candles[symbol][:end]
+        else:
+            # Higher timeframes are built from the 5m history (only the span asked for)
+            first = since if since is not None else (self.now // tf_ms - limit + 1) * tf_ms
+            rows = aggregate(self.candles[symbol][self._visible(symbol, first - 1):end], tf_ms)
+        if since is not None:
+            return [list(c) for c in rows if c[0] >= since][:limit]
+        return [list(c) for c in rows[-limit:]]
+
+    def fetch_balance(self):
+        self._count('fetch_balance')
+        with self.lock:
+            return {
+                'total': dict(self.balances),
+                'free': dict(self.balances),
+            }
+
+    def last_price(self, symbol):
+        return self.candles[symbol][self._visible(symbol, self.now - TF_MS) - 1][4]
+
+    def fetch_tickers(self, symbols=None):
+        self._count('fetch_tickers')
+        out = {}
+        for symbol in symbols or self.candles:
+            if symbol in self.candles and self._visible(symbol, self.now - TF_MS):
+                price = self.last_price(symbol)
+                out[symbol] = {'symbol': symbol, 'timestamp': self.now, 'last': price, 'close': price}
+        return out
+
+    def _fill(self, symbol, side, amount):
+        base, quote = symbol.split('/')
+        price = fill_price(self.last_price(symbol), side, self.slippage)
+        fee = amount * price * self.fee_rate
+        sign = 1 if side == 'buy' else -1
+        with self.lock:
+            if amount <= 0:
+                raise ccxt.InvalidOrder(f"amount {amount} must be positive")
+            spend = (base, amount) if side == 'sell' else (quote, amount * price + fee)
+            if self.balances[spend[0]] < spend[1]:
+                raise ccxt.InsufficientFunds(f"{spend[0]} balance {self.balances[spend[0]]} < {spend[1]}")
+            self.balances[base] += sign * amount
+            self.balances[quote] -= sign * amount * price + fee
+            order = {'symbol': symbol, 'side': side, 'amount': amount, 'filled': amount,
+                     'price': price, 'average': price, 'timestamp': self.now,
+                     'fee': {'cost': fee, 'currency': quote}}
+            self.orders.append(order)
+        return order
+
+    def create_market_buy_order(self, symbol, amount):
+        self._count('create_market_buy_order')
+        return self._fill(symbol, 'buy', amount)
+
+    def create_market_sell_order(self, symbol, amount):
+        self._count('create_market_sell_order')
+        return self._fill(symbol, 'sell', amount)
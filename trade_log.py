@@ -0,0 +1,218 @@
+"""
+Columnar trade records for the backtests. Rows go into preallocated per-column numpy
+buffers and are streamed to disk a chunk at a time, so memory stays at one chunk
+however long the history. Output is CSV, or a binary column store when the path ends
+in '.trades' (one raw array per column plus a JSON schema).
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# --- CONSTANTS ---
+TRADES_SUFFIX = '.trades'
+SCHEMA_FILE = 'columns.json'
+TEXT = 'text'               # Column kind for labels (Signal, Reason, Symbol): stored as uint16 codes
+MAX_LABELS = np.iinfo(np.uint16).max + 1     # Distinct labels one TEXT column can hold
+chunk_rows = 65536          # Rows buffered per column before a write
+
+
+def is_binary(path):
+    return path.rstrip('/\\').endswith(TRADES_SUFFIX)
+
+
+class TradeLog:
+    """
+    `columns` is {name: numpy dtype or TEXT}, in output order.
+    append(**row) adds one row, extend(**arrays) adds many (scalars are broadcast).
+    With a `path` a full buffer is written out and reused; without one the buffer
+    grows and frame() returns everything. close() (or the with block) writes the rest.
+    """
+
+    def __init__(self, columns, path=None, chunk_rows=chunk_rows):
+        self.columns = dict(columns)
+        self.path = path
+        self.binary = path is not None and is_binary(path)
+        self.capacity = chunk_rows
+        self.size = 0               # Rows in the buffer
+        self.written = 0            # Rows already on disk
+        self.started = False        # CSV header written
+        self.labels = {name: {} for name, kind in self.columns.items() if kind == TEXT}
+        self.buffers = {name: np.zeros(chunk_rows, np.uint16 if kind == TEXT else kind)
+                        for name, kind in self.columns.items()}
+        if path is None:
+            return
+        if self.binary:
+            os.makedirs(path, exist_ok=True)
+            for i in range(len(self.columns)):
+                open(self._column_file(i), 'wb').close()
+        else:
+            open(path, 'w', encoding='utf-8').close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.written + self.size
+
+    # --- RECORDING ---
+    def append(self, **row):
+        """
+        Adds one row; every column must be given.
+        """
+        if row.keys() != self.columns.keys():
+            self._bad_columns(row)
+        if self.size == self.capacity:
+            self._full()
+        i = self.size
+        for name, value in row.items():
+            labels = self.labels.get(name)
+            if labels is not None:
+                code = labels.get(value)
+                value = self._new_label(name, value) if code is None else code
+            self.buffers[name][i] = value
+        self.size += 1
+
+    def extend(self, **arrays):
+        """
+        Adds a block of rows given as equal-length arrays; scalars fill the whole block.
+        Every column must be given.
+        """
+        if arrays.keys() != self.columns.keys():
+            self._bad_columns(arrays)
+        n = max((len(v) for v in arrays.values() if np.ndim(v)), default=0)
+        arrays = {name: self._encode(name, v, n) for name, v in arrays.items()}
+        done = 0
+        while done < n:
+            if self.size == self.capacity:
+                self._full()
+            take = min(n - done, self.capacity - self.size)
+            for name, values in arrays.items():
+                self.buffers[name][self.size:self.size + take] = values[done:done + take]
+            self.size += take
+            done += take
+
+    def _bad_columns(self, given):
+        # Buffers are reused after a flush, so a missing column would repeat an old row's value
+        missing = [name for name in self.columns if name not in given]
+        unknown = [name for name in given if name not in self.columns]
+        raise ValueError(f"TradeLog rows need every column: missing {missing}, unknown {unknown}")
+
+    def _encode(self, name, values, n):
+        values = np.broadcast_to(np.asarray(values), (n,))
+        labels = self.labels.get(name)
+        if labels is None:
+            return values
+        uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+        codes = np.array([labels[u] if u in labels else self._new_label(name, u) for u in uniques], dtype=np.uint16)
+        return codes[inverse]
+
+    def _new_label(self, name, value):
+        labels = self.labels[name]
+        if len(labels) == MAX_LABELS:
+            raise ValueError(f"Column {name!r} has more than {MAX_LABELS} distinct labels (uint16 codes); "
+                             f"store it as a numeric column instead")
+        labels[value] = code = len(labels)
+        return code
+
+    def _full(self):
+        if self.path is not None:
+            self.flush()
+            return
+        for name in self.buffers:
+            self.buffers[name] = np.resize(self.buffers[name], self.capacity * 2)
+        self.capacity *= 2
+
+    # --- OUTPUT ---
+    def _decoded(self, stop):
+        out = {}
+        for name, kind in self.columns.items():
+            values = self.buffers[name][:stop]
+            if kind == TEXT:
+                values = np.array(list(self.labels[name]), dtype=object)[values]
+            out[name] = values
+        return pd.DataFrame(out, columns=list(self.columns))
+
+    def frame(self):
+        """
+        The buffered rows as a DataFrame (the whole log when it has no path).
+        """
+        return self._decoded(self.size)
+
+    def flush(self):
+        if self.path is None:
+            return
+        if self.binary:
+            for i, name in enumerate(self.columns):
+                with open(self._column_file(i), 'ab') as f:
+                    self.buffers[name][:self.size].tofile(f)
+            self.written += self.size
+            self._write_schema()
+        else:
+            if self.size or not self.started:
+                self._decoded(self.size).to_csv(self.path, mode='a', header=not self.started, index=False)
+                self.started = True
+            self.written += self.size
+        self.size = 0
+
+    def close(self):
+        self.flush()
+
+    def _column_file(self, i):
+        return os.path.join(self.path, f"c{i}.bin")
+
+    def _write_schema(self):
+        schema = {
+            'rows': self.written,
+            'columns': [{'name': name, 'file': os.path.basename(self._column_file(i)),
+                         'dtype': np.dtype(np.uint16 if kind == TEXT else kind).str,
+                         'labels': list(self.labels[name]) if kind == TEXT else None}
+                        for i, (name, kind) in enumerate(self.columns.items())],
+        }
+        tmp = os.path.join(self.path, f"{SCHEMA_FILE}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(schema, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, SCHEMA_FILE))
+
+
+# --- FILES ---
+def log_columns(df):
+    """
+    TradeLog column spec of a trade DataFrame (non-numeric, non-datetime columns become TEXT).
+    """
+    return {name: dtype if dtype.kind in 'biufmM' else TEXT for name, dtype in df.dtypes.items()}
+
+
+def save_trades(df, path, chunk_rows=chunk_rows):
+    """
+    Writes a trade DataFrame as CSV, or as a binary column store when `path` ends in
+    '.trades'.
+    """
+    with TradeLog(log_columns(df), path, chunk_rows) as log:
+        log.extend(**{name: df[name].values for name in df.columns})
+
+
+def load_trades(path, mmap=False):
+    """
+    Reads a file written by TradeLog / save_trades() back into a DataFrame.
+    """
+    if not is_binary(path):
+        return pd.read_csv(path)
+    with open(os.path.join(path, SCHEMA_FILE), encoding='utf-8') as f:
+        schema = json.load(f)
+    out = {}
+    for col in schema['columns']:
+        file = os.path.join(path, col['file'])
+        dtype = np.dtype(col['dtype'])
+        if mmap and schema['rows']:
+            values = np.memmap(file, dtype=dtype, mode='r', shape=(schema['rows'],))
+        else:
+            values = np.fromfile(file, dtype=dtype, count=schema['rows'])
+        if col['labels'] is not None:
+            values = np.array(col['labels'], dtype=object)[values]
+        out[col['name']] = values
+    return pd.DataFrame(out, columns=[c['name'] for c in schema['columns']])
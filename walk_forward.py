@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from box_engine import DAY_MS, backtest_daily, load_candles, to_daily_candles
+from param_sweep import bottom_range, prepare, threshold_trades, top_range
+from profiling import add_arguments, from_args
+
+# --- CONFIGURATION PARAMETERS ---
+data_file = os.path.join('fetch_data', 'Results', 'NEAR_USDT_5m_full.csv')
+train_days = 7              # Days the thresholds are picked on
+test_days = 2               # Days they are then traded on (also the default step)
+rank_by = 'Return %'        # Train metric that picks the thresholds
+
+STAT_COLUMNS = ['Trades', 'Shorts', 'Cumulative P&L', 'Return %', 'Wins']
+
+
+# --- PER-DAY STATS (computed once per history) ---
+def daily_threshold_stats(data, tops, bottoms, batch=16):
+    """
+    Runs the one-bar-hold backtest once over the whole history for every (top, bottom)
+    pair and sums each trade into the UTC day of its entry bar.
+    Returns (first_day, {stat: prefix sums shaped (combos, days + 1)}), so the totals of
+    any window of whole days are one subtraction, whatever the number of windows.
+    The strategy runs continuously across window edges, like the live bot does.
+    """
+    day = data.timestamp // DAY_MS
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    first_day = int(day[0])
+    slots = day[starts] - first_day
+    n_days = int(slots[-1]) + 1
+
+    per_day = {name: [] for name in STAT_COLUMNS}
+    for t, entry, above, pnl, ret in threshold_trades(data, tops, bottoms, batch):
+        combos = entry.shape[0] * entry.shape[1]
+        bars = {
+            'Trades': entry,
+            'Shorts': entry & above,
+            'Cumulative P&L': pnl,
+            'Return %': ret * 100,
+            'Wins': pnl > 0,
+        }
+        for name, values in bars.items():
+            # Days without candles stay at zero
+            sums = np.zeros((combos, n_days))
+            sums[:, slots] = np.add.reduceat(values.reshape(combos, -1), starts, axis=-1, dtype=np.float64)
+            per_day[name].append(sums)
+
+    prefix = {}
+    for name, chunks in per_day.items():
+        sums = np.concatenate(chunks)
+        prefix[name] = np.concatenate([np.zeros((len(sums), 1)), np.cumsum(sums, axis=1)], axis=1)
+    return first_day, prefix
+
+
+def window_stats(prefix, start, end):
+    """
+    Totals of days [start, end) (slots from the first day) for every combination.
+    """
+    stats = {name: p[:, end] - p[:, start] for name, p in prefix.items()}
+    trades = stats['Trades']
+    stats['Hit Rate'] = np.where(trades > 0, stats.pop('Wins') / np.maximum(trades, 1), np.nan)
+    return stats
+
+
+def day_windows(n_days, train_days, test_days, step_days=None):
+    """
+    Yields (train_start, test_start, test_end) day slots of every full train/test window.
+    """
+    step_days = step_days or test_days
+    start = 0
+    while start + train_days + test_days <= n_days:
+        yield start, start + train_days, start + train_days + test_days
+        start += step_days
+
+
+# --- WALK-FORWARD ---
+def walk_forward(data, tops, bottoms, train_days=train_days, test_days=test_days, step_days=None,
+                 rank_by=rank_by, daily=None):
+    """
+    Slides train/test windows of whole UTC days over the history. Each window picks the
+    (top, bottom) pair with the best train `rank_by` and reports how it did on the test
+    days. The box and the per-day stats of every pair are computed once; a window only
+    subtracts two prefix sums.
+    With `daily` (to_daily_candles() of the same history), each test window is also run
+    through backtest_daily() with the chosen thresholds.
+    Returns one row per window.
+    """
+    tops = np.asarray(tops, dtype=np.float64)
+    bottoms = np.asarray(bottoms, dtype=np.float64)
+    top_of = np.repeat(tops, len(bottoms))
+    bottom_of = np.tile(bottoms, len(tops))
+    first_day, prefix = daily_threshold_stats(data, tops, bottoms)
+    n_days = prefix['Trades'].shape[1] - 1
+    if daily is not None:
+        daily_days = daily.index.values.astype('datetime64[D]').astype(np.int64)
+
+    rows = []
+    for train_start, test_start, test_end in day_windows(n_days, train_days, test_days, step_days):
+        train = window_stats(prefix, train_start, test_start)
+        scores = train[rank_by]
+        if np.all(np.isnan(scores)):
+            continue
+        best = int(np.nanargmax(scores))
+        test = window_stats(prefix, test_start, test_end)
+
+        row = {
+            'Train Start': pd.Timestamp((first_day + train_start) * DAY_MS, unit='ms'),
+            'Test Start': pd.Timestamp((first_day + test_start) * DAY_MS, unit='ms'),
+            'Test End': pd.Timestamp((first_day + test_end) * DAY_MS, unit='ms'),
+            'top_threshold': top_of[best],
+            'bottom_threshold': bottom_of[best],
+            f'Train {rank_by}': scores[best],
+        }
+        row.update({name: values[best] for name, values in test.items()})
+
+        if daily is not None:
+            # Test days plus the day before them, whose candle is the first box
+            lo, hi = np.searchsorted(daily_days, [first_day + test_start - 1, first_day + test_end])
+            trades, cumulative_pl = backtest_daily(daily.iloc[lo:hi], top_of[best], bottom_of[best])
+            row['Daily Trades'] = int((trades['Signal'] != 'NO TRADE').sum())
+            row['Daily P&L'] = cumulative_pl
+        rows.append(row)
+
+    results = pd.DataFrame(rows)
+    if len(results):
+        results[['Trades', 'Shorts']] = results[['Trades', 'Shorts']].astype(int)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward box-threshold backtest")
+    parser.add_argument('--data', default=data_file)
+    parser.add_argument('--train-days', type=int, default=train_days)
+    parser.add_argument('--test-days', type=int, default=test_days)
+    parser.add_argument('--step-days', type=int, default=None, help="window step (default: --test-days)")
+    parser.add_argument('--steps', type=int, default=20, help="grid points per threshold")
+    parser.add_argument('--rank-by', default=rank_by)
+    parser.add_argument('--complete-boxes', action='store_true', help="no box from days missing candles")
+    parser.add_argument('--output', default=os.path.join('Results', 'walk_forward.csv'))
+    add_arguments(parser)
+    args = parser.parse_args()
+    profiler = from_args(args)
+
+    with profiler.stage('load'):
+        df = load_candles(args.data)
+    start = time.perf_counter()
+    with profiler.stage('box'):
+        data = prepare(df, complete=args.complete_boxes)
+    with profiler.stage('daily_resample'):
+        daily = to_daily_candles(df, complete=args.complete_boxes)
+    with profiler.stage('walk_forward', hot=True):
+        results = walk_forward(data, np.linspace(*top_range, args.steps), np.linspace(*bottom_range, args.steps),
+                               args.train_days, args.test_days, args.step_days, args.rank_by, daily)
+    elapsed = time.perf_counter() - start
+
+    if results.empty:
+        print(f"❌ Not enough history for one {args.train_days}+{args.test_days} day window")
+        return
+
+    print(f"📊 {len(results)} windows over {len(data.open)} candles in {elapsed:.2f}s\n")
+    print(results.to_string(index=False))
+    print(f"\nTest total: {results['Trades'].sum()} trades, Return {results['Return %'].sum():.2f}%, "
+          f"P&L {results['Cumulative P&L'].sum():.4f} | daily P&L {results['Daily P&L'].sum():.4f}")
+
+    with profiler.stage('save'):
+        results.to_csv(args.output, index=False)
+    print(f"\n✅ Saved window results to {args.output}")
+    profiler.finish(args.profile_output)
+
+
+if __name__ == '__main__':
+    main()